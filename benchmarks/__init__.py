@@ -0,0 +1,10 @@
+"""
+Benchmarks for the data loading and API hot paths
+
+    python -m benchmarks.run                      # 1x, 10x, 100x -> benchmarks/baseline.json
+    python -m benchmarks.run --scales 1,10 --compare benchmarks/baseline.json
+
+synthetic.py generates option-price, review and coupon CSVs shaped like the
+crawler output at a multiple of today's data size; run.py times each stage
+on them and records throughput and peak memory.
+"""
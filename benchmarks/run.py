@@ -0,0 +1,306 @@
+"""
+Benchmark runner
+
+    python -m benchmarks.run [--scales 1,10,100] [--repeat 3]
+                             [--output benchmarks/baseline.json]
+                             [--compare benchmarks/baseline.json]
+
+Without --compare the results become the new baseline.json; with it they go
+to latest.json and stages more than --threshold times slower than the
+baseline are reported (exit status 1).
+
+Each scale runs in a fresh worker process on its own synthetic data tree, so
+module state, caches and peak RSS do not leak between scales. Every stage
+records its best time over --repeat runs, items per second, and the peak
+Python allocation (tracemalloc, measured in a separate untimed run).
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT = os.path.join(PROJECT_ROOT, 'benchmarks', 'baseline.json')
+# Where results go when comparing, so the baseline itself is kept
+COMPARE_OUTPUT = os.path.join(PROJECT_ROOT, 'benchmarks', 'latest.json')
+REVIEW_CATEGORIES = ('roll', 'puzzle', 'pet')
+# Stages slower than the baseline by more than this factor are flagged
+REGRESSION_THRESHOLD = 1.25
+
+
+@contextlib.contextmanager
+def _quiet():
+    """
+    Keep the loaders' log messages below ERROR out of timed runs
+
+    The 'followscope' handler holds on to the original sys.stdout, so
+    redirecting stdout would not silence it; its level is raised instead.
+    """
+    from src.log import ROOT_LOGGER
+    logger = logging.getLogger(ROOT_LOGGER)
+    level = logger.level
+    logger.setLevel(logging.ERROR)
+    try:
+        yield
+    finally:
+        logger.setLevel(level)
+
+
+def measure(func, repeat, setup=None):
+    """
+    Time func (best of repeat) and its peak allocation
+
+    Args:
+        func: Callable returning the number of items it processed
+        repeat: Timed runs
+        setup: Optional callable run (untimed) before every run
+
+    Returns:
+        Stage result dict
+    """
+    times = []
+    items = 0
+    for _ in range(repeat):
+        if setup:
+            setup()
+        with _quiet():
+            started = time.perf_counter()
+            items = func()
+            times.append(time.perf_counter() - started)
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        with _quiet():
+            func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    best = min(times)
+    return {
+        'seconds': round(best, 6),
+        'mean_seconds': round(sum(times) / len(times), 6),
+        'items': items,
+        'items_per_second': round(items / best, 1) if best > 0 else None,
+        'peak_memory_bytes': peak
+    }
+
+
+def run_worker(scale, data_root, repeat):
+    """Run every stage on one generated data tree; returns the result dict"""
+    # The app reads its paths at import time
+    os.environ['FOLLOWSCOPE_DATA_ROOT'] = data_root
+    os.environ['FOLLOWSCOPE_LAZY_STARTUP'] = '1'
+    os.environ['FOLLOWSCOPE_WARM_UP'] = '0'
+    os.environ.setdefault('FOLLOWSCOPE_LOG_LEVEL', 'WARNING')
+    sys.path.insert(0, PROJECT_ROOT)
+    sys.path.insert(0, os.path.join(PROJECT_ROOT, 'web_app'))
+
+    from src.parser import process_raw_data
+    from src.parse_cache import ParseCache
+    from src.review_analyzer import ReviewAnalyzer
+    from src.review_cache import ReviewColumnCache
+
+    products_path = os.path.join(data_root, 'products')
+    reviews_path = os.path.join(data_root, 'reviews')
+    scratch = os.path.join(data_root, 'cache', 'bench')
+    stages = {}
+
+    # Product parsing: cold (every file parsed) and warm (parse cache hits)
+    parse_cache_dir = os.path.join(scratch, 'parsed')
+
+    def clear_parse_cache():
+        shutil.rmtree(parse_cache_dir, ignore_errors=True)
+
+    def parse_cold():
+        return len(process_raw_data(products_path, {}, cache=ParseCache(parse_cache_dir)))
+
+    stages['parse_cold'] = measure(parse_cold, repeat, setup=clear_parse_cache)
+    with _quiet():
+        parse_cold()
+    stages['parse_warm'] = measure(parse_cold, repeat)
+
+    # Review loading: CSVs read and encoded (cold) or from the column cache (warm)
+    review_cache_dir = os.path.join(scratch, 'reviews')
+
+    def clear_review_cache():
+        shutil.rmtree(review_cache_dir, ignore_errors=True)
+
+    def load_reviews():
+        analyzer = ReviewAnalyzer(reviews_path, column_cache=ReviewColumnCache(review_cache_dir))
+        return sum(len(frame) for frames in analyzer.review_data.values() for frame in frames.values())
+
+    stages['review_load_cold'] = measure(load_reviews, repeat, setup=clear_review_cache)
+    with _quiet():
+        load_reviews()
+    stages['review_load_warm'] = measure(load_reviews, repeat)
+
+    with _quiet():
+        analyzer = ReviewAnalyzer(reviews_path, column_cache=ReviewColumnCache(review_cache_dir))
+
+    def review_growth():
+        calls = 0
+        for category in REVIEW_CATEGORIES:
+            for days in (7, 30, 90):
+                analyzer.calculate_review_growth_rate(category, days)
+                calls += 1
+        return calls
+
+    stages['review_growth'] = measure(review_growth, repeat)
+
+    # App hot paths
+    with _quiet():
+        import app as web_app
+    client = web_app.app.test_client()
+
+    def load_coupons():
+        web_app.load_coupon_data()
+        return len(web_app.coupon_store)
+
+    stages['coupon_load'] = measure(load_coupons, repeat)
+
+    with _quiet():
+        web_app.datasets.ensure('products')
+
+    def api_data(query):
+        def request():
+            response = client.get(f"/api/data{query}")
+            if response.status_code != 200:
+                raise RuntimeError(f"/api/data{query} returned {response.status_code}")
+            body = response.get_json()
+            return len(body['items'] if isinstance(body, dict) else body)
+        return request
+
+    # Serialization proper (response cache emptied first), then cache hits
+    clear_responses = web_app.response_cache.clear
+    stages['api_data_full'] = measure(api_data(''), repeat, setup=clear_responses)
+    stages['api_data_page'] = measure(api_data('?page_size=100'), repeat, setup=clear_responses)
+    stages['api_data_full_cached'] = measure(api_data(''), repeat)
+
+    return {
+        'stages': stages,
+        'max_rss_bytes': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    }
+
+
+def run_scale(scale, repeat, seed, keep_data=None):
+    """Generate data for one scale and benchmark it in a worker process"""
+    from benchmarks.synthetic import generate_dataset
+
+    data_root = keep_data or tempfile.mkdtemp(prefix=f'followscope-bench-{scale}x-')
+    try:
+        started = time.perf_counter()
+        dataset = generate_dataset(data_root, scale=scale, seed=seed)
+        print(f"[{scale}x] generated {dataset['product_options']} options, {dataset['reviews']} reviews, "
+              f"{dataset['coupons']} coupons in {time.perf_counter() - started:.1f}s")
+
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.run', '--worker',
+             '--data', data_root, '--scale', str(scale), '--repeat', str(repeat)],
+            cwd=PROJECT_ROOT, capture_output=True, text=True
+        )
+        if output.returncode != 0:
+            raise RuntimeError(f"Worker for {scale}x failed:\n{output.stderr}")
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+        result['dataset'] = dataset
+        return result
+    finally:
+        if keep_data is None:
+            shutil.rmtree(data_root, ignore_errors=True)
+
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """Print stage times against a baseline; returns the number of regressions"""
+    regressions = 0
+    print(f"\n{'scale':>6} {'stage':<18} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for scale, result in results['scales'].items():
+        base_stages = baseline.get('scales', {}).get(scale, {}).get('stages', {})
+        for name, stage in result['stages'].items():
+            base = base_stages.get(name)
+            if base is None or not base['seconds']:
+                print(f"{scale + 'x':>6} {name:<18} {'-':>10} {stage['seconds']:>10.4f} {'new':>7}")
+                continue
+            ratio = stage['seconds'] / base['seconds']
+            flag = ''
+            if ratio > threshold:
+                flag = '  SLOWER'
+                regressions += 1
+            elif ratio < 1 / threshold:
+                flag = '  faster'
+            print(f"{scale + 'x':>6} {name:<18} {base['seconds']:>10.4f} {stage['seconds']:>10.4f} "
+                  f"{ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='FollowScope benchmarks')
+    parser.add_argument('--scales', default='1,10,100', help='Comma-separated data size multiples')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per stage (best is kept)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Where to write the results JSON '
+                        '(default: baseline.json, or latest.json with --compare)')
+    parser.add_argument('--compare', help='Baseline JSON to compare the results against')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help='Slowdown factor reported as a regression')
+    parser.add_argument('--keep-data', help='Generate into this directory and keep it (single scale)')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--data', help=argparse.SUPPRESS)
+    parser.add_argument('--scale', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.scale, args.data, args.repeat)))
+        return 0
+
+    scales = [int(scale) for scale in args.scales.split(',') if scale.strip()]
+    output = args.output or (COMPARE_OUTPUT if args.compare else DEFAULT_OUTPUT)
+    baseline = None
+    if args.compare:
+        # Read first: --output may name the same file
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    if args.keep_data and len(scales) != 1:
+        parser.error('--keep-data needs a single scale')
+
+    results = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'seed': args.seed,
+        'scales': {}
+    }
+    for scale in scales:
+        result = run_scale(scale, args.repeat, args.seed, keep_data=args.keep_data)
+        results['scales'][str(scale)] = result
+        for name, stage in result['stages'].items():
+            print(f"[{scale}x] {name:<18} {stage['seconds']:>9.4f}s  {stage['items']:>9} items  "
+                  f"{stage['items_per_second'] or 0:>12.0f}/s  peak {stage['peak_memory_bytes'] / 1e6:>8.1f} MB")
+
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"Results written to {output}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{regressions} stage(s) slower than {args.threshold}x the baseline")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
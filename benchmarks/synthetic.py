@@ -0,0 +1,303 @@
+"""
+Synthetic FollowScope data at a multiple of today's size
+
+The option-price files follow the layouts the crawler produces for each
+category (2-stage and 3-stage), covering every option format the parser's
+pattern table knows. Review and coupon files use the crawler's columns.
+Scale 1 is roughly the size of data/ today; scale N writes N times as many
+competitor files. Output is deterministic for a given seed (review dates
+are relative to today so the trend windows have data).
+"""
+
+import os
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+# Files per layout at scale 1 (about today's 20 product files / 1.4k options)
+PRODUCT_FILES_PER_LAYOUT = 1
+# Review files and reviews per file at scale 1 (about 13 files / 39k reviews)
+REVIEW_FILES = {'roll': 4, 'puzzle': 3, 'pet': 6}
+REVIEWS_PER_FILE = 3000
+# Coupon files and rows per file at scale 1
+COUPON_FILES = {'roll': 4, 'puzzle': 4, 'pet': 4}
+COUPONS_PER_FILE = 25
+
+BRANDS = ['티지오매트', '따사룸', '리포소홈', '파크론', '에코폼', '딩굴', '로하우스', '꼬망세', '크림하우스', '알집매트']
+COLORS = ['모던크림', '마블아이보리', '러그아이보리', '그레이', '베이지테라조', '퓨어크림', '바닐라아이보리', '올크림']
+REVIEW_TEXTS = [
+    '생각보다 두툼해서 충격방지도 가능하고 깔끔하고 너무 좋아요.',
+    '배송 빠르고 시공도 쉬웠어요. 아이가 뛰어도 소리가 덜 나요',
+    '색상이 사진이랑 똑같아요 만족합니다',
+    '냄새가 조금 나는데 환기하니 괜찮아졌어요',
+    '재구매입니다. 거실 전체 깔았어요',
+    '가격 대비 괜찮아요'
+]
+
+
+def _roll_korean(rng):
+    for color in rng.permutation(COLORS):
+        for t in (1, 1.4, 1.7):
+            for w in (110, 140):
+                for length in (50, 100, 150, 200, 250, 300):
+                    yield f"🏅BEST🏅 {color}", f"두께{t}cm / 폭{w}cm", f"길이 {length}cm"
+
+
+def _roll_slash(rng):
+    for color in rng.permutation(COLORS):
+        for t in (1.2, 1.7, 2.2):
+            for w in (70, 110, 140):
+                for length in (50, 100, 150, 200):
+                    yield f"🏆BEST🏆{color}", f"{t}cm/{w}cm", f"{length}cm"
+
+
+def _roll_spaced_meters(rng):
+    for color in rng.permutation(COLORS):
+        for t in (1.7, 2.2):
+            for w in (80, 120):
+                for length in ('50cm', '1m', '1m50cm', '3m'):
+                    yield f"BEST👑{color}", f"{t}cm / {w}cm", length
+
+
+def _roll_thickness_paren(rng):
+    for color in rng.permutation(COLORS):
+        for w in (50, 60, 110):
+            for length in ('0.5m(연결불가)', '1m', '2m'):
+                yield f"베이직(1.7cm) / {color}", f"{w}cm", length
+
+
+def _roll_two_stage(rng):
+    for color in rng.permutation(COLORS):
+        for w in (100, 110, 120, 140):
+            yield f"{color} 2.2cm", f"{w}cm", None
+
+
+def _pet_t_notation(rng):
+    for color in rng.permutation(COLORS):
+        for t in (6, 10):
+            for w in (110, 135):
+                yield f"롤매트-{color}", f"{t / 10:g}cm({t}T)", f"폭 {w}cm x 50cm"
+
+
+def _pet_mm_width_paren(rng):
+    for color in rng.permutation(COLORS):
+        for w in (110, 125, 140):
+            yield color, f"6mm(폭{w}cm)", "50cm"
+
+
+def _pet_t_notation_reverse(rng):
+    for color in rng.permutation(COLORS):
+        for w in (110, 140):
+            for length in ('50cm', '1m'):
+                yield color, "9T(9mm)", f"{w}cm x {length}"
+
+
+def _pet_mm_width_slash(rng):
+    for color in rng.permutation(COLORS):
+        for mm in (6, 10):
+            for w in (110, 135):
+                yield f"BASIC✨{color}", f"{mm}mm / {w}cm", "50cm"
+
+
+def _pet_two_stage(rng):
+    for color in rng.permutation(COLORS):
+        for mm in (9, 15):
+            yield "110cm폭/1M", f"{color}/{mm}mm(리뉴얼)", None
+
+
+def _puzzle_mm_pieces(rng):
+    for color in rng.permutation(COLORS):
+        for mm in (25, 40):
+            for size in ('100x100 1장', '50x50 4장'):
+                yield "퍼즐매트", color, f"({mm}mm) {size}"
+
+
+def _puzzle_pu_type(rng):
+    for color in rng.permutation(COLORS):
+        yield "25T [NEW] PU_A타입(100x100x1장)", color, None
+
+
+def _puzzle_cm_pieces(rng):
+    for color in rng.permutation(COLORS):
+        for size in ('100x100x3cm (1장)', '50x50x3cm (4장)'):
+            yield f"방방퍼즐-{color}", size, None
+
+
+def _folder_size_option2(rng):
+    for size in ('200x200', '240x200', '280x200'):
+        for color in rng.permutation(COLORS):
+            yield "항균더블클린매트", size, color
+
+
+def _folder_size_option3(rng):
+    for color in rng.permutation(COLORS):
+        for size in ('200 X 240', '200 X 280', '240 X 280'):
+            yield "빅매트", color, size
+
+
+def _folder_numbered(rng):
+    for size in ('01. 일반 4단 100×200', '02. 일반 5단 125×200'):
+        for i, color in enumerate(rng.permutation(COLORS), 1):
+            yield "01. 폴더매트", size, f"0{i}. {color}"
+
+
+# (category directory, brand, layout name, 3-stage?, option generator, base price)
+# Each layout mirrors the option format of that brand's crawler export
+PRODUCT_LAYOUTS = [
+    ('roll', '티지오매트', 'thickness_width_korean', True, _roll_korean, 10900),
+    ('roll', '따사룸', 'thickness_width_slash', True, _roll_slash, 10700),
+    ('roll', '리포소홈', 'thickness_width_spaced', True, _roll_spaced_meters, 10900),
+    ('roll', '파크론', 'thickness_paren', True, _roll_thickness_paren, 10950),
+    ('roll', '파크론', 'thickness_in_option1', False, _roll_two_stage, 48900),
+    ('pet', '딩굴', 't_notation', True, _pet_t_notation, 10800),
+    ('pet', '따사룸', 'pet_mm_width_paren', True, _pet_mm_width_paren, 10400),
+    ('pet', '로하우스', 't_notation_reverse', True, _pet_t_notation_reverse, 17700),
+    ('pet', '리포소펫', 'pet_mm_width_slash', True, _pet_mm_width_slash, 11400),
+    ('pet', '에코폼', 'width_pok_length_m', False, _pet_two_stage, 24700),
+    ('puzzle', '따사룸', 'puzzle_mm_pieces', True, _puzzle_mm_pieces, 17900),
+    ('puzzle', '에코폼', 'puzzle_type_pu', False, _puzzle_pu_type, 49400),
+    ('puzzle', '방방', 'puzzle_cm_pieces', False, _puzzle_cm_pieces, 19900),
+    ('folder', '꼬망세', 'folder_size_option2', True, _folder_size_option2, 249000),
+    ('folder', '리포소홈', 'folder_size_option3', True, _folder_size_option3, 189000),
+    ('folder', '크림하우스', 'folder_numbered', True, _folder_numbered, 86900),
+]
+
+
+def _brand(index):
+    return f"{BRANDS[index % len(BRANDS)]}{index // len(BRANDS) + 1}"
+
+
+def _review_brand(index):
+    # The loaders resolve any name containing a registered brand to that brand
+    # (src/brand_aliases.json), so extra files get names of their own to stay
+    # separate competitors
+    return BRANDS[index] if index < len(BRANDS) else f"셀러{index:04d}"
+
+
+def _product_brand(brand, repeat, layout):
+    # First copy under the real brand, the others as separate sellers (see _review_brand)
+    return brand if repeat == 0 else f"셀러{repeat:03d}{layout:02d}"
+
+
+def write_product_files(root, scale, rng):
+    """Option-price CSVs; returns (files, option rows)"""
+    files = rows = 0
+    index = 0
+    for repeat in range(PRODUCT_FILES_PER_LAYOUT * scale):
+        for layout_index, (category, brand, layout, three_stage, options, base_price) in enumerate(PRODUCT_LAYOUTS):
+            directory = os.path.join(root, 'products', category)
+            os.makedirs(directory, exist_ok=True)
+            stage = '3단계' if three_stage else '2단계'
+            filename = f"{_product_brand(brand, repeat, layout_index)} 층간소음 {layout}_옵션가격_{stage}_2025-10-28-01-{index % 60:02d}.csv"
+            index += 1
+
+            option_rows = list(options(rng))
+            # Longer options cost proportionally more, plus some noise
+            extra = rng.integers(0, 40, len(option_rows)) * 100
+            if three_stage:
+                header = ['기본가격', '옵션1', '옵션2', '옵션3', '추가가격', '최종가격']
+                lines = [[base_price, '', '', '', base_price, ''], [''] * 6]
+                for (o1, o2, o3), add in zip(option_rows, extra):
+                    lines.append(['', o1, o2, o3, add or '', base_price + add])
+            else:
+                header = ['기본가격', '옵션1', '옵션2', '추가가격', '최종가격']
+                lines = [[base_price, '', '', '', base_price], [''] * 5]
+                for (o1, o2, _), add in zip(option_rows, extra):
+                    lines.append(['', o1, o2, add or '', base_price + add])
+            pd.DataFrame(lines, columns=header).to_csv(
+                os.path.join(directory, filename), index=False, encoding='utf-8-sig')
+            files += 1
+            rows += len(option_rows)
+    return files, rows
+
+
+def write_review_files(root, scale, rng, today=None):
+    """Review CSVs covering the last 365 days; returns (files, reviews)"""
+    today = today or date.today()
+    files = rows = 0
+    index = 0
+    for category, count in REVIEW_FILES.items():
+        directory = os.path.join(root, 'reviews', category)
+        os.makedirs(directory, exist_ok=True)
+        for _ in range(count * scale):
+            n = REVIEWS_PER_FILE
+            # More reviews on recent days, like a growing product
+            days_ago = np.minimum(rng.exponential(120, n).astype(int), 364)
+            days_ago.sort()
+            dates = [(today - timedelta(days=int(d))).strftime('%Y.%m.%d') for d in days_ago]
+            frame = pd.DataFrame({
+                '평점': rng.choice([5, 5, 5, 4, 4, 3, 2, 1], n),
+                '작성자': [f"user{v:04d}****" for v in rng.integers(0, 10000, n)],
+                '작성일': dates,
+                '구매옵션': [f"색상: {c} / 두께 / 폭: 1.7cm / 110cm / 길이: {l}m"
+                         for c, l in zip(rng.choice(COLORS, n), rng.integers(1, 8, n))],
+                '리뷰내용': rng.choice(REVIEW_TEXTS, n),
+                '이미지URL': ''
+            })
+            filename = f"{_review_brand(index)} 층간소음 {category} 매트 (last 365 days).csv"
+            index += 1
+            frame.to_csv(os.path.join(directory, filename), index=False, encoding='utf-8-sig')
+            files += 1
+            rows += n
+    return files, rows
+
+
+def write_coupon_files(root, scale, rng, today=None):
+    """Coupon CSVs (some rows invalid, as in the real exports); returns (files, rows)"""
+    today = today or date.today()
+    files = rows = 0
+    index = 0
+    for category, count in COUPON_FILES.items():
+        directory = os.path.join(root, 'coupons', category)
+        os.makedirs(directory, exist_ok=True)
+        for _ in range(count * scale):
+            n = COUPONS_PER_FILE
+            start = [today + timedelta(days=int(d)) for d in rng.integers(-60, 30, n)]
+            end = [s + timedelta(days=int(d)) for s, d in zip(start, rng.integers(1, 45, n))]
+            rate = rng.choice([5, 10, 15, 20, 0], n)
+            frame = pd.DataFrame({
+                'competitor': [_brand(int(i)) for i in rng.integers(0, 40, n)],
+                'type': rng.choice(['쿠폰', '즉시할인', '적립'], n),
+                'coupon_name': np.where(rng.random(n) < 0.1, '적용 안함',
+                                        [f"{r}% 할인 쿠폰" for r in rate]),
+                'discount_rate': [f"{r}%" if r else '' for r in rate],
+                'discount_amount': [f"{a}원" if not r else '' for r, a in zip(rate, rng.integers(1, 10, n) * 1000)],
+                'min_purchase': rng.choice(['', '30000원', '50000원'], n),
+                'max_discount': rng.choice(['', '10000원'], n),
+                'usage_limit': rng.choice(['', '1인 1회'], n),
+                'start_date': [d.isoformat() for d in start],
+                'end_date': [d.isoformat() for d in end],
+                'description': ''
+            })
+            filename = f"{category}_coupons_{index:04d}.csv"
+            index += 1
+            frame.to_csv(os.path.join(directory, filename), index=False, encoding='utf-8-sig')
+            files += 1
+            rows += n
+    return files, rows
+
+
+def generate_dataset(root, scale=1, seed=0):
+    """
+    Write a synthetic data/ tree (products, reviews, coupons, live)
+
+    Args:
+        root: Target directory (used as FOLLOWSCOPE_DATA_ROOT)
+        scale: Multiple of today's data size
+        seed: Random seed
+
+    Returns:
+        Dict of file and row counts per dataset
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(os.path.join(root, 'live'), exist_ok=True)
+    product_files, product_rows = write_product_files(root, scale, rng)
+    review_files, review_rows = write_review_files(root, scale, rng)
+    coupon_files, coupon_rows = write_coupon_files(root, scale, rng)
+    return {
+        'scale': scale,
+        'product_files': product_files, 'product_options': product_rows,
+        'review_files': review_files, 'reviews': review_rows,
+        'coupon_files': coupon_files, 'coupons': coupon_rows
+    }
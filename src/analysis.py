@@ -6,6 +6,13 @@ import pandas as pd
 import numpy as np
 from typing import Optional, Dict, List
 
+try:
+    from .category_stats import CategoryStats, build_category_stats
+    from .dimension_index import build_dimension_index
+except ImportError:
+    from category_stats import CategoryStats, build_category_stats
+    from dimension_index import build_dimension_index
+
 
 def filter_by_category(df: pd.DataFrame, category: Optional[str] = None) -> pd.DataFrame:
     """
@@ -45,119 +52,42 @@ def get_available_categories(df: pd.DataFrame) -> List[str]:
     return sorted([cat for cat in categories if pd.notna(cat)])
 
 
-def analyze_competitors_by_category(df: pd.DataFrame, category: Optional[str] = None) -> Dict:
+def analyze_competitors_by_category(df: pd.DataFrame, category: Optional[str] = None,
+                                    stats: Optional[CategoryStats] = None) -> Dict:
     """
     Analyze competitor data filtered by category
     
     Args:
         df: Input dataframe
         category: Product category to analyze (None means all)
+        stats: Precomputed CategoryStats of df (built here if not given)
     
     Returns:
         Dictionary with analysis results
     """
-    # Filter by category
-    df_filtered = filter_by_category(df, category)
-    
-    if df_filtered.empty:
-        return {
-            'total_products': 0,
-            'competitors': [],
-            'price_stats': {},
-            'size_stats': {}
-        }
-    
-    # Basic statistics
-    total_products = len(df_filtered)
-    competitors = df_filtered['Competitor'].unique().tolist()
-    
-    # Price statistics
-    price_stats = {
-        'min': df_filtered['Price'].min(),
-        'max': df_filtered['Price'].max(),
-        'mean': df_filtered['Price'].mean(),
-        'median': df_filtered['Price'].median()
-    }
-    
-    # Size statistics
-    size_stats = {
-        'thickness': {
-            'min': df_filtered['Thickness_cm'].min(),
-            'max': df_filtered['Thickness_cm'].max(),
-            'unique_values': sorted(df_filtered['Thickness_cm'].unique().tolist())
-        },
-        'width': {
-            'min': df_filtered['Width_cm'].min(),
-            'max': df_filtered['Width_cm'].max(),
-            'unique_values': sorted(df_filtered['Width_cm'].unique().tolist())
-        },
-        'length': {
-            'min': df_filtered['Length_cm'].min(),
-            'max': df_filtered['Length_cm'].max()
-        }
-    }
-    
-    # Competitor breakdown
-    competitor_stats = {}
-    for comp in competitors:
-        comp_data = df_filtered[df_filtered['Competitor'] == comp]
-        competitor_stats[comp] = {
-            'product_count': len(comp_data),
-            'avg_price': comp_data['Price'].mean(),
-            'price_range': (comp_data['Price'].min(), comp_data['Price'].max()),
-            'designs': comp_data['Design'].nunique()
-        }
-    
-    return {
-        'total_products': total_products,
-        'competitors': competitors,
-        'price_stats': price_stats,
-        'size_stats': size_stats,
-        'competitor_stats': competitor_stats,
-        'category': category or '전체'
-    }
+    if stats is None:
+        stats = build_category_stats(df)
+    return stats.analysis(category)
 
 
-def compare_categories(df: pd.DataFrame) -> pd.DataFrame:
+def compare_categories(df: pd.DataFrame, stats: Optional[CategoryStats] = None) -> pd.DataFrame:
     """
     Create comparison table across all categories
     
     Args:
         df: Input dataframe
+        stats: Precomputed CategoryStats of df (built here if not given)
     
     Returns:
         DataFrame with category comparison
     """
-    categories = get_available_categories(df)
-    
-    comparison_data = []
-    for category in categories:
-        stats = analyze_competitors_by_category(df, category)
-        
-        comparison_data.append({
-            'Category': category,
-            'Total_Products': stats['total_products'],
-            'Num_Competitors': len(stats['competitors']),
-            'Avg_Price': stats['price_stats'].get('mean', 0),
-            'Min_Price': stats['price_stats'].get('min', 0),
-            'Max_Price': stats['price_stats'].get('max', 0)
-        })
-    
-    # Add total row
-    total_stats = analyze_competitors_by_category(df, None)
-    comparison_data.append({
-        'Category': '전체',
-        'Total_Products': total_stats['total_products'],
-        'Num_Competitors': len(total_stats['competitors']),
-        'Avg_Price': total_stats['price_stats'].get('mean', 0),
-        'Min_Price': total_stats['price_stats'].get('min', 0),
-        'Max_Price': total_stats['price_stats'].get('max', 0)
-    })
-    
-    return pd.DataFrame(comparison_data)
+    if stats is None:
+        stats = build_category_stats(df)
+    return stats.comparison()
 
 
-def get_price_comparison_by_category(df: pd.DataFrame, thickness: float, width: float, length: float) -> pd.DataFrame:
+def get_price_comparison_by_category(df: pd.DataFrame, thickness: float, width: float, length: float,
+                                     indexes: Optional[Dict] = None) -> pd.DataFrame:
     """
     Compare prices across competitors for specific dimensions, grouped by category
     
@@ -166,39 +96,23 @@ def get_price_comparison_by_category(df: pd.DataFrame, thickness: float, width:
         thickness: Thickness in cm
         width: Width in cm  
         length: Length in cm
+        indexes: Optional {category: DimensionIndex} built beforehand (a
+            snapshot keeps them); built from df when omitted
     
     Returns:
         DataFrame with price comparison by category
     """
-    # Calculate target volume
-    target_volume = thickness * width * length
+    if indexes is None:
+        indexes = {
+            category: build_dimension_index(filter_by_category(df, category), category)
+            for category in get_available_categories(df)
+        }
     
+    # Closest product within 20% volume, per category and competitor
     results = []
-    categories = get_available_categories(df)
-    
-    for category in categories:
-        df_cat = filter_by_category(df, category)
-        
-        for competitor in df_cat['Competitor'].unique():
-            comp_data = df_cat[df_cat['Competitor'] == competitor]
-            
-            # Find products with similar dimensions (within 20% volume)
-            comp_data['volume_diff'] = abs(comp_data['Volume_cm3'] - target_volume) / target_volume
-            similar_products = comp_data[comp_data['volume_diff'] <= 0.2]
-            
-            if not similar_products.empty:
-                best_match = similar_products.loc[similar_products['volume_diff'].idxmin()]
-                
-                results.append({
-                    'Category': category,
-                    'Competitor': competitor,
-                    'Matched_Thickness': best_match['Thickness_cm'],
-                    'Matched_Width': best_match['Width_cm'],
-                    'Matched_Length': best_match['Length_cm'],
-                    'Price': best_match['Price'],
-                    'Price_per_Volume': best_match['Price_per_Volume'],
-                    'Volume_Diff_%': best_match['volume_diff'] * 100
-                })
+    for category in sorted(indexes):
+        if indexes[category] is not None:
+            results.extend(indexes[category].closest(thickness, width, length))
     
     if results:
         result_df = pd.DataFrame(results)
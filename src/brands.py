@@ -0,0 +1,182 @@
+"""
+Canonical competitor (brand) names for every loader
+
+Product files, review files, the live calendar and the coupon exports name
+the same brands differently ('티지오 ...' / '티지오매트 ...', '파크론몰',
+'리포소 홈', 'CREAMHAUS'). The aliases live in one registry file,
+brand_aliases.json (or the file named by FOLLOWSCOPE_BRAND_ALIASES):
+
+    {"brands": {"<canonical>": {"exact": [...], "match": [...]}}}
+
+"exact" aliases are whole store names; "match" aliases are keywords found
+anywhere in a name. All "match" keywords are compiled into one Aho-Corasick
+automaton, so a name is resolved in a single pass over its characters
+whatever the number of aliases. When several keywords occur, the leftmost
+wins, then the longest ('리포소펫' over '리포소'). Resolved names are memoized.
+"""
+
+import json
+import os
+import threading
+from collections import deque
+
+try:
+    from .log import get_logger
+except ImportError:
+    from log import get_logger
+
+logger = get_logger(__name__)
+
+ALIASES_ENV = 'FOLLOWSCOPE_BRAND_ALIASES'
+DEFAULT_ALIASES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'brand_aliases.json')
+# Distinct names remembered by resolve() (file names and store names: few)
+MEMO_SIZE = 10000
+
+
+def aliases_path():
+    """Registry file in effect (FOLLOWSCOPE_BRAND_ALIASES or the bundled one)"""
+    return os.environ.get(ALIASES_ENV) or DEFAULT_ALIASES_PATH
+
+
+def _normalize(name):
+    return ' '.join(str(name).split()).casefold()
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a set of keywords
+
+    Args:
+        keywords: {keyword: value}
+    """
+
+    def __init__(self, keywords):
+        # Node 0 is the root; per node: transitions, failure link, matched keyword
+        self._goto = [{}]
+        self._fail = [0]
+        self._match = [None]
+        self._longest = max((len(keyword) for keyword in keywords), default=0)
+        for keyword, value in keywords.items():
+            node = 0
+            for char in keyword:
+                child = self._goto[node].get(char)
+                if child is None:
+                    child = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._match.append(None)
+                    self._goto[node][char] = child
+                node = child
+            self._match[node] = (len(keyword), value)
+
+        # Breadth-first failure links; _output[node] is the node itself or the
+        # nearest node on its failure chain that ends a keyword
+        self._output = [None] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        for child in queue:
+            self._output[child] = child if self._match[child] else None
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[child] = fail
+                self._output[child] = child if self._match[child] else self._output[fail]
+                queue.append(child)
+
+    def find(self, text):
+        """Value of the leftmost (then longest) keyword in text, or None"""
+        best = None  # (start, -length, value)
+        node = 0
+        for end, char in enumerate(text):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            hit = self._output[node]
+            while hit is not None:
+                length, value = self._match[hit]
+                candidate = (end - length + 1, -length, value)
+                if best is None or candidate[:2] < best[:2]:
+                    best = candidate
+                hit = self._output[self._fail[hit]]
+            # Later keywords end further right and cannot start left of best
+            if best is not None and end + 1 - self._longest >= best[0]:
+                break
+        return best[2] if best is not None else None
+
+
+class BrandResolver:
+    """
+    Maps any spelling of a brand to its canonical name
+
+    Args:
+        brands: {canonical: {'exact': [aliases], 'match': [keywords]}}
+    """
+
+    def __init__(self, brands):
+        self.brands = sorted(brands)
+        self._exact = {}
+        keywords = {}
+        for canonical, aliases in brands.items():
+            self._exact[_normalize(canonical)] = canonical
+            for alias in aliases.get('exact', []):
+                self._exact[_normalize(alias)] = canonical
+            for keyword in aliases.get('match', []):
+                keywords[_normalize(keyword)] = canonical
+        self._matcher = KeywordMatcher(keywords)
+        self._memo = {}
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f).get('brands', {}))
+
+    def resolve(self, name, default=None):
+        """
+        Canonical brand of name (a store name or a file name)
+
+        Args:
+            name: Name to resolve
+            default: Returned when no alias matches
+
+        Returns:
+            Canonical brand name, or default
+        """
+        try:
+            found = self._memo[name]
+        except KeyError:
+            key = _normalize(name)
+            found = self._exact.get(key)
+            if found is None:
+                found = self._matcher.find(key)
+            if len(self._memo) >= MEMO_SIZE:
+                self._memo.clear()
+            self._memo[name] = found
+        return found if found is not None else default
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def get_brand_resolver():
+    """Process-wide BrandResolver, loaded from the registry file on first use"""
+    global _resolver
+    if _resolver is None:
+        with _resolver_lock:
+            if _resolver is None:
+                path = aliases_path()
+                try:
+                    _resolver = BrandResolver.from_file(path)
+                    logger.debug("Loaded %d brands from %s", len(_resolver.brands), path)
+                except (OSError, ValueError) as e:
+                    logger.error("Error loading brand aliases from %s: %s", path, e)
+                    _resolver = BrandResolver({})
+    return _resolver
+
+
+def resolve_brand(name, default=None):
+    """Canonical brand of name, or default (see BrandResolver.resolve)"""
+    return get_brand_resolver().resolve(name, default)
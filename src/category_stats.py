@@ -0,0 +1,198 @@
+"""
+Per-category and per-competitor product statistics computed in grouped passes
+
+analyze_competitors_by_category used to filter the frame once per
+competitor, and compare_categories called it once per category, so the
+frame was scanned categories x competitors times. CategoryStats aggregates
+every level (all rows, each category, each competitor within a category and
+across categories) with one groupby each when it is built; lookups are
+dictionary reads. ProductSnapshot keeps one per generation.
+"""
+
+import pandas as pd
+
+# Category assumed for frames without a product_category column
+DEFAULT_CATEGORY = '롤매트'
+ALL_CATEGORIES = '전체'
+
+# Output name -> (column, aggregation) for category-level rows
+_CATEGORY_AGGREGATIONS = {
+    'products': ('Price', 'size'),
+    'competitors': ('Competitor', 'nunique'),
+    'price_min': ('Price', 'min'),
+    'price_max': ('Price', 'max'),
+    'price_mean': ('Price', 'mean'),
+    'price_median': ('Price', 'median'),
+    'price_per_volume_mean': ('Price_per_Volume', 'mean'),
+    'thickness_min': ('Thickness_cm', 'min'),
+    'thickness_max': ('Thickness_cm', 'max'),
+    'width_min': ('Width_cm', 'min'),
+    'width_max': ('Width_cm', 'max'),
+    'length_min': ('Length_cm', 'min'),
+    'length_max': ('Length_cm', 'max'),
+    'thickness_values': ('Thickness_cm', 'unique'),
+    'width_values': ('Width_cm', 'unique')
+}
+
+_COMPETITOR_AGGREGATIONS = {
+    'product_count': ('Price', 'size'),
+    'avg_price': ('Price', 'mean'),
+    'price_min': ('Price', 'min'),
+    'price_max': ('Price', 'max'),
+    'designs': ('Design', 'nunique')
+}
+
+
+def _aggregations(spec, frame):
+    """Named aggregations of spec whose column exists in frame"""
+    return {name: pd.NamedAgg(column, func) for name, (column, func) in spec.items()
+            if column in frame.columns}
+
+
+def _rows(grouped, spec, frame):
+    """{group key: {output name: value}} of one grouped pass"""
+    table = grouped.agg(**_aggregations(spec, frame))
+    return table.to_dict('index')
+
+
+class CategoryStats:
+    """
+    Aggregates of one product frame
+
+    Args:
+        frame: Product frame (Competitor, Price, *_cm, Design, optionally
+            product_category and Price_per_Volume)
+    """
+
+    def __init__(self, frame):
+        self.empty = frame.empty
+        self._categories = {}
+        self._competitors = {}
+        self._overall = None
+        self._overall_competitors = {}
+        self.categories = []
+        if self.empty:
+            return
+
+        if 'product_category' in frame.columns:
+            category = frame['product_category']
+        else:
+            category = pd.Series(DEFAULT_CATEGORY, index=frame.index, name='product_category')
+
+        # All rows as one group
+        self._overall = _rows(frame.groupby(lambda _: ALL_CATEGORIES), _CATEGORY_AGGREGATIONS, frame)[ALL_CATEGORIES]
+        self._overall['competitor_names'] = frame['Competitor'].unique().tolist()
+
+        # One row per category (sorted, NaN categories left out as in filter_by_category)
+        self._categories = _rows(frame.groupby(category, sort=True, observed=True),
+                                 _CATEGORY_AGGREGATIONS, frame)
+        self.categories = list(self._categories)
+
+        # One row per competitor within each category, in order of first appearance
+        by_pair = _rows(frame.groupby([category, frame['Competitor']], sort=False, dropna=False, observed=True),
+                        _COMPETITOR_AGGREGATIONS, frame)
+        for (name, competitor), row in by_pair.items():
+            if name in self._categories:
+                self._competitors.setdefault(name, {})[competitor] = row
+        for name, row in self._categories.items():
+            row['competitor_names'] = list(self._competitors.get(name, {}))
+
+        # One row per competitor across categories
+        self._overall_competitors = _rows(frame.groupby('Competitor', sort=False, dropna=False, observed=True),
+                                          _COMPETITOR_AGGREGATIONS, frame)
+
+    def _lookup(self, category):
+        """(category row, competitor rows) or (None, None) if nothing matches"""
+        if category is None or category == ALL_CATEGORIES:
+            return self._overall, self._overall_competitors
+        row = self._categories.get(category)
+        if row is None:
+            return None, None
+        return row, self._competitors.get(category, {})
+
+    def analysis(self, category=None):
+        """Result of analyze_competitors_by_category for category (None = all)"""
+        row, competitors = self._lookup(category)
+        if row is None:
+            return {
+                'total_products': 0,
+                'competitors': [],
+                'price_stats': {},
+                'size_stats': {}
+            }
+
+        return {
+            'total_products': row['products'],
+            'competitors': row['competitor_names'],
+            'price_stats': {
+                'min': row['price_min'],
+                'max': row['price_max'],
+                'mean': row['price_mean'],
+                'median': row['price_median']
+            },
+            'size_stats': {
+                'thickness': {
+                    'min': row['thickness_min'],
+                    'max': row['thickness_max'],
+                    'unique_values': sorted(row['thickness_values'].tolist())
+                },
+                'width': {
+                    'min': row['width_min'],
+                    'max': row['width_max'],
+                    'unique_values': sorted(row['width_values'].tolist())
+                },
+                'length': {
+                    'min': row['length_min'],
+                    'max': row['length_max']
+                }
+            },
+            'competitor_stats': {
+                competitor: {
+                    'product_count': stats['product_count'],
+                    'avg_price': stats['avg_price'],
+                    'price_range': (stats['price_min'], stats['price_max']),
+                    'designs': stats.get('designs', 0)
+                }
+                for competitor, stats in competitors.items()
+            },
+            'category': category or ALL_CATEGORIES
+        }
+
+    def comparison(self):
+        """Result of compare_categories: one row per category plus a total row"""
+        comparison_data = []
+        for category in self.categories + [ALL_CATEGORIES]:
+            row = self._overall if category == ALL_CATEGORIES else self._categories[category]
+            row = row or {}
+            comparison_data.append({
+                'Category': category,
+                'Total_Products': row.get('products', 0),
+                'Num_Competitors': len(row.get('competitor_names', [])),
+                'Avg_Price': row.get('price_mean', 0),
+                'Min_Price': row.get('price_min', 0),
+                'Max_Price': row.get('price_max', 0)
+            })
+        return pd.DataFrame(comparison_data)
+
+    def summary(self, category=None):
+        """
+        Headline numbers of /api/statistics
+
+        Returns:
+            Dict, or None if the category has no rows
+        """
+        row, _ = self._lookup(category)
+        if row is None:
+            return None
+        return {
+            'total_products': row['products'],
+            'competitors': row['competitors'],
+            'avg_price_per_volume': row.get('price_per_volume_mean'),
+            'price_range': {'min': row['price_min'], 'max': row['price_max']},
+            'thickness_range': {'min': row['thickness_min'], 'max': row['thickness_max']}
+        }
+
+
+def build_category_stats(frame):
+    """CategoryStats of a product frame"""
+    return CategoryStats(frame)
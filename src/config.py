@@ -72,6 +72,9 @@ def get_competitor_rules(competitor_name):
     # Return default rules if no pattern matches
     return DEFAULT_RULES
 
+# Parser engine: 'columnar' (whole-column regex extraction) or 'row' (per-row iterrows)
+PARSE_ENGINE = 'columnar'
+
 # Data file paths
 RAW_DATA_PATH = 'data/raw/'
 PROCESSED_DATA_PATH = 'data/processed/'
@@ -0,0 +1,189 @@
+"""
+Indexed coupon table for /api/coupons
+
+Coupons from every category CSV are kept column-wise: the text fields as
+lists, competitor and category as integer codes, start/end dates parsed once
+to datetime64[D]. A coupon's status (active, upcoming, expired) depends on
+today's date, so it is not stored: it is derived with one vectorized date
+comparison whenever coupons are queried, and never goes stale at midnight.
+"""
+
+import os
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .brands import resolve_brand
+    from .log import get_logger
+except ImportError:
+    from brands import resolve_brand
+    from log import get_logger
+
+logger = get_logger(__name__)
+
+COUPON_CATEGORIES = ('roll', 'puzzle', 'pet')
+STATUSES = ('active', 'upcoming', 'expired')
+# Output field -> default for missing values ('competitor' and 'coupon_name'
+# keep str() of whatever the CSV holds, as before)
+TEXT_FIELDS = {
+    'type': '쿠폰',
+    'discount_rate': '',
+    'discount_amount': '',
+    'min_purchase': '',
+    'max_discount': '',
+    'usage_limit': '',
+    'start_date': '',
+    'end_date': '',
+    'description': ''
+}
+# Coupon names the crawler writes for "no coupon"
+NO_COUPON_NAMES = {'적용 안함', '적용안함', '', '-'}
+
+
+def _text(values, default):
+    return [str(value) if pd.notna(value) else default for value in values]
+
+
+def _dates(values):
+    """Day of each date string; NaT where missing or unparsable"""
+    parsed = pd.to_datetime(pd.Series([value or None for value in values], dtype=object),
+                            errors='coerce', format='mixed')
+    return parsed.to_numpy(dtype='datetime64[ns]').astype('datetime64[D]')
+
+
+class CouponStore:
+    """
+    Coupons of one load, filterable by competitor, category and status
+
+    Args:
+        coupon_data_path: Directory with one subdirectory of CSVs per category
+    """
+
+    def __init__(self, coupon_data_path):
+        self.coupon_data_path = coupon_data_path
+        self.files = []
+        self.competitors = []
+        self.categories = list(COUPON_CATEGORIES)
+        self._columns = {field: [] for field in ('competitor', 'coupon_name', *TEXT_FIELDS, 'source_file')}
+        self._category_codes = []
+        self.load()
+
+    def __len__(self):
+        return len(self._columns['competitor'])
+
+    def load(self):
+        """Read every category's coupon CSVs"""
+        total_files = 0
+        for code, category in enumerate(self.categories):
+            category_path = os.path.join(self.coupon_data_path, category)
+            if not os.path.exists(category_path):
+                logger.warning("Category directory not found: %s", category_path)
+                continue
+
+            csv_files = [f for f in os.listdir(category_path) if f.endswith('.csv')]
+            if not csv_files:
+                logger.info("No CSV files found in %s directory", category)
+                continue
+            logger.debug("Found %d CSV files in %s: %s", len(csv_files), category, csv_files)
+
+            for csv_file in csv_files:
+                csv_path = os.path.join(category_path, csv_file)
+                self.files.append(csv_path)
+                try:
+                    df = pd.read_csv(csv_path, encoding='utf-8-sig')
+                    logger.debug("Processing %s/%s: %d rows", category, csv_file, len(df))
+                    total_files += 1
+                    self._add_file(df, code, csv_file)
+                except Exception as e:
+                    logger.error("Error reading %s/%s: %s", category, csv_file, e)
+                    continue
+
+        self._build_index()
+        logger.info("Total loaded: %d coupons from %d files across %d categories",
+                    len(self), total_files, len(self.categories))
+
+    def _add_file(self, df, category_code, csv_file):
+        """Append the valid coupons of one CSV"""
+        def column(name):
+            return df[name].tolist() if name in df.columns else [None] * len(df)
+
+        # str() of the raw value, resolved to the canonical brand where registered
+        competitor = [str(value) if value is not None else '' for value in column('competitor')]
+        competitor = [resolve_brand(name, name) for name in competitor]
+        coupon_name = [str(value) if value is not None else '' for value in column('coupon_name')]
+        fields = {field: _text(column(field), default) for field, default in TEXT_FIELDS.items()}
+
+        # Skip invalid or unwanted entries
+        keep = [
+            i for i in range(len(df))
+            if coupon_name[i].lower() not in NO_COUPON_NAMES
+            and competitor[i]
+            and (fields['discount_rate'][i] or fields['discount_amount'][i])
+        ]
+        self._columns['competitor'] += [competitor[i] for i in keep]
+        self._columns['coupon_name'] += [coupon_name[i] for i in keep]
+        for field, values in fields.items():
+            self._columns[field] += [values[i] for i in keep]
+        self._columns['source_file'] += [csv_file] * len(keep)
+        self._category_codes += [category_code] * len(keep)
+
+    def _build_index(self):
+        codes, uniques = pd.factorize(pd.Series(self._columns['competitor'], dtype=object))
+        self.competitors = list(uniques)
+        self._competitor = codes.astype(np.int32)
+        self._category = np.asarray(self._category_codes, dtype=np.int8)
+        self._start = _dates(self._columns['start_date'])
+        self._end = _dates(self._columns['end_date'])
+        # Only coupons with both dates can be upcoming or expired
+        self._dated = ~np.isnat(self._start) & ~np.isnat(self._end)
+
+    def statuses(self, today=None):
+        """Status code of every coupon (index into STATUSES) on today's date"""
+        today = np.datetime64(today or date.today(), 'D')
+        status = np.zeros(len(self), dtype=np.int8)
+        status[self._dated & (today < self._start)] = STATUSES.index('upcoming')
+        status[self._dated & (today > self._end)] = STATUSES.index('expired')
+        return status
+
+    def query(self, competitors=None, categories=None, statuses=None, today=None):
+        """
+        Coupons matching the filters, in file order
+
+        Args:
+            competitors: Competitor names to keep (None/empty = all)
+            categories: Categories ('roll', 'puzzle', 'pet') to keep
+            statuses: Statuses to keep ('active', 'upcoming', 'expired')
+            today: Date the statuses are computed for (default: today)
+
+        Returns:
+            List of coupon dicts with their current status
+
+        Raises:
+            ValueError: On an unknown status
+        """
+        status = self.statuses(today)
+        mask = np.ones(len(self), dtype=bool)
+
+        def keep_names(names, known, codes):
+            lookup = {name: code for code, name in enumerate(known)}
+            return np.isin(codes, [lookup[name] for name in names if name in lookup])
+
+        if competitors:
+            mask &= keep_names(competitors, self.competitors, self._competitor)
+        if categories:
+            mask &= keep_names(categories, self.categories, self._category)
+        if statuses:
+            unknown = [name for name in statuses if name not in STATUSES]
+            if unknown:
+                raise ValueError(f"Unknown status: {', '.join(unknown)} (expected {', '.join(STATUSES)})")
+            mask &= keep_names(statuses, STATUSES, status)
+
+        coupons = []
+        for i in np.flatnonzero(mask):
+            coupon = {field: values[i] for field, values in self._columns.items()}
+            coupon['status'] = STATUSES[status[i]]
+            coupon['product_category'] = self.categories[self._category[i]]
+            coupons.append(coupon)
+        return coupons
@@ -0,0 +1,112 @@
+"""
+Nearest-volume product index for size-matched price comparisons
+
+One index is built per product category (once per snapshot). Within a
+category every competitor's products are sorted by Volume_cm3, so "the
+product of each competitor closest to T x W x L" is one binary search per
+competitor instead of a scan over the competitor's rows.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Default relative volume difference accepted as a match
+DEFAULT_TOLERANCE = 0.2
+
+
+def _scalar(value):
+    """Plain Python value for JSON output"""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class DimensionIndex:
+    """
+    Per-competitor sorted volumes of one product category
+
+    Ties are resolved like a scan in frame order would: among products at
+    the same distance from the target, the one listed first wins.
+    """
+
+    def __init__(self, frame, category):
+        self.category = category
+        self.frame = frame
+        volume = pd.to_numeric(frame['Volume_cm3'], errors='coerce').to_numpy(dtype=float)
+        competitor = frame['Competitor'].to_numpy(dtype=object)
+
+        # Competitors in order of first appearance
+        self.competitors = pd.unique(competitor).tolist()
+        self._volumes = {}
+        self._positions = {}
+        valid = np.isfinite(volume)
+        for name in self.competitors:
+            positions = np.flatnonzero((competitor == name) & valid)
+            order = np.argsort(volume[positions], kind='stable')
+            self._positions[name] = positions[order]
+            self._volumes[name] = volume[positions[order]]
+
+    def _closest(self, name, target):
+        """(frame position, volume) of the competitor's product closest to target, or None"""
+        volumes = self._volumes[name]
+        if volumes.size == 0:
+            return None
+        positions = self._positions[name]
+        i = int(np.searchsorted(volumes, target, side='left'))
+        candidates = []
+        if i < volumes.size:
+            # First of the run of equal volumes at or above the target
+            candidates.append((volumes[i] - target, positions[i], volumes[i]))
+        if i > 0:
+            below = volumes[i - 1]
+            # Run of equal volumes below the target: earliest frame position
+            start = int(np.searchsorted(volumes, below, side='left'))
+            first = positions[start:i].min()
+            candidates.append((target - below, first, below))
+        distance, position, volume = min(candidates)
+        return position, volume
+
+    def closest(self, thickness, width, length, tolerance=DEFAULT_TOLERANCE, competitors=None):
+        """
+        Each competitor's product closest in volume to thickness x width x length
+
+        Args:
+            thickness, width, length: Target dimensions in cm
+            tolerance: Maximum relative volume difference of a match
+            competitors: Competitor names to consider (None = all)
+
+        Returns:
+            List of match dicts in competitor order
+        """
+        target = thickness * width * length
+        if not target > 0:
+            return []
+        wanted = set(competitors) if competitors else None
+        matches = []
+        for name in self.competitors:
+            if wanted is not None and name not in wanted:
+                continue
+            found = self._closest(name, target)
+            if found is None:
+                continue
+            position, volume = found
+            difference = abs(volume - target) / target
+            if difference > tolerance:
+                continue
+            row = self.frame.iloc[position]
+            matches.append({
+                'Category': self.category,
+                'Competitor': name,
+                'Matched_Thickness': _scalar(row['Thickness_cm']),
+                'Matched_Width': _scalar(row['Width_cm']),
+                'Matched_Length': _scalar(row['Length_cm']),
+                'Price': _scalar(row['Price']),
+                'Price_per_Volume': _scalar(row['Price_per_Volume']),
+                'Volume_Diff_%': float(difference * 100)
+            })
+        return matches
+
+
+def build_dimension_index(frame, category):
+    """DimensionIndex of one category slice, or None if it has no volumes"""
+    if frame.empty or 'Volume_cm3' not in frame.columns:
+        return None
+    return DimensionIndex(frame, category)
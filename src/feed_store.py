@@ -0,0 +1,210 @@
+"""
+SQLite-backed store for feed posts
+
+Each feed is one row keyed by id with an index on (created_at, id), so a
+write touches a single row instead of rewriting the whole feed list, and
+newest-first pages are read straight off the index. The database runs in
+WAL mode with a busy timeout, so several gunicorn workers can write
+concurrently without losing each other's updates. On first use the store is
+seeded from the legacy feeds.json.
+"""
+
+import base64
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+try:
+    from .log import get_logger
+except ImportError:
+    from log import get_logger
+
+logger = get_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS feeds (
+    id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS feeds_created_at ON feeds (created_at, id);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+BUSY_TIMEOUT_SECONDS = 10
+
+
+def encode_feed_cursor(created_at, feed_id):
+    """Opaque keyset cursor pointing just after a feed in newest-first order"""
+    payload = json.dumps([created_at, feed_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_feed_cursor(cursor):
+    """
+    Decode a cursor from encode_feed_cursor
+
+    Returns:
+        (created_at, feed_id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, feed_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(created_at, str) or not isinstance(feed_id, str):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return created_at, feed_id
+
+
+class FeedStore:
+    """
+    Feed posts in an SQLite database
+
+    Feeds are plain dicts stored as JSON; id and created_at are also kept
+    as indexed columns. Connections are per thread.
+
+    Args:
+        db_path: SQLite database file
+        legacy_json_path: feeds.json to import when the database is new
+    """
+
+    def __init__(self, db_path, legacy_json_path=None):
+        self.db_path = db_path
+        self.legacy_json_path = legacy_json_path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._initialize()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """BEGIN IMMEDIATE ... COMMIT; takes the write lock up front"""
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def _initialize(self):
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        with self._transaction() as conn:
+            imported = conn.execute("SELECT value FROM meta WHERE key = 'legacy_imported'").fetchone()
+            if imported is not None:
+                return
+            count = self._import_legacy(conn)
+            conn.execute("INSERT INTO meta (key, value) VALUES ('legacy_imported', ?)", (str(count),))
+        if count:
+            logger.info("Feed store: imported %d feeds from %s", count, os.path.basename(self.legacy_json_path))
+
+    def _import_legacy(self, conn):
+        if not self.legacy_json_path or not os.path.exists(self.legacy_json_path):
+            return 0
+        with open(self.legacy_json_path, 'r', encoding='utf-8') as f:
+            feeds = json.load(f)
+        rows = [
+            (str(feed['id']), feed.get('created_at', ''), json.dumps(feed, ensure_ascii=False))
+            for feed in feeds if 'id' in feed
+        ]
+        conn.executemany('INSERT OR REPLACE INTO feeds (id, created_at, body) VALUES (?, ?, ?)', rows)
+        return len(rows)
+
+    def count(self):
+        return self._connect().execute('SELECT COUNT(*) FROM feeds').fetchone()[0]
+
+    def get(self, feed_id):
+        """Feed dict, or None if there is no such feed"""
+        row = self._connect().execute('SELECT body FROM feeds WHERE id = ?', (feed_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def page(self, limit, offset=0, after=None):
+        """
+        Feeds newest first
+
+        Args:
+            limit: Maximum number of feeds
+            offset: Feeds to skip (ignored when after is given)
+            after: (created_at, id) of the last feed of the previous page
+
+        Returns:
+            List of feed dicts
+        """
+        conn = self._connect()
+        if after is not None:
+            rows = conn.execute(
+                'SELECT body FROM feeds WHERE (created_at, id) < (?, ?) '
+                'ORDER BY created_at DESC, id DESC LIMIT ?',
+                (after[0], after[1], limit)
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                'SELECT body FROM feeds ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?',
+                (limit, offset)
+            ).fetchall()
+        return [json.loads(body) for (body,) in rows]
+
+    def all(self):
+        """Every feed, newest first"""
+        rows = self._connect().execute('SELECT body FROM feeds ORDER BY created_at DESC, id DESC').fetchall()
+        return [json.loads(body) for (body,) in rows]
+
+    def insert(self, feed):
+        """Add a new feed; raises sqlite3.IntegrityError if the id exists"""
+        with self._transaction() as conn:
+            conn.execute(
+                'INSERT INTO feeds (id, created_at, body) VALUES (?, ?, ?)',
+                (feed['id'], feed.get('created_at', ''), json.dumps(feed, ensure_ascii=False))
+            )
+        return feed
+
+    def update(self, feed_id, changes):
+        """
+        Apply changes to one feed inside a write transaction
+
+        Args:
+            feed_id: Feed to update
+            changes: Callable taking the feed dict and modifying it in place
+
+        Returns:
+            The updated feed, or None if there is no such feed
+        """
+        with self._transaction() as conn:
+            row = conn.execute('SELECT body FROM feeds WHERE id = ?', (feed_id,)).fetchone()
+            if row is None:
+                return None
+            feed = json.loads(row[0])
+            changes(feed)
+            conn.execute(
+                'UPDATE feeds SET created_at = ?, body = ? WHERE id = ?',
+                (feed.get('created_at', ''), json.dumps(feed, ensure_ascii=False), feed_id)
+            )
+        return feed
+
+    def delete(self, feed_id):
+        """Remove one feed; returns the deleted feed or None"""
+        with self._transaction() as conn:
+            row = conn.execute('SELECT body FROM feeds WHERE id = ?', (feed_id,)).fetchone()
+            if row is None:
+                return None
+            conn.execute('DELETE FROM feeds WHERE id = ?', (feed_id,))
+        return json.loads(row[0])
@@ -0,0 +1,163 @@
+"""
+Precomputed competitor x thickness x width price cube for the dashboard heatmap
+
+One cube is built per product category when a snapshot is created. A heatmap
+request only sums the cube over the selected competitors, so redraws no
+longer need the full product list.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Categories whose heatmap shows the product price as-is; the others show
+# the price normalized to a 50cm length
+UNIT_PRICE_CATEGORIES = {'퍼즐매트', '폴더매트', '강아지매트'}
+
+
+def _mean(total, count):
+    """Elementwise total / count, NaN where count is 0"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(count > 0, total / np.where(count > 0, count, 1), np.nan)
+
+
+def _json_number(value):
+    """Float for JSON output, None for NaN/inf"""
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+
+class HeatmapCube:
+    """
+    Price cube of one product category
+
+    Axes are the sorted competitors, thicknesses and widths of the category.
+    Per cell the cube holds the product count, the display-price sum and the
+    Price_per_Volume sum/count (finite values only), so per-competitor and
+    per-cell averages for any competitor subset are plain sums. The products
+    themselves are kept sorted by cell and Price_per_Volume for tooltips.
+    """
+
+    def __init__(self, frame, category):
+        self.category = category
+        thickness = frame['Thickness_cm'].to_numpy(dtype=float)
+        width = frame['Width_cm'].to_numpy(dtype=float)
+        price = frame['Price'].to_numpy(dtype=float)
+        length = frame['Length_cm'].to_numpy(dtype=float)
+        price_per_volume = pd.to_numeric(frame['Price_per_Volume'], errors='coerce').to_numpy(dtype=float)
+
+        if category in UNIT_PRICE_CATEGORIES:
+            display_price = price
+        else:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                display_price = price / length * 50
+
+        self.competitors, competitor_idx = np.unique(frame['Competitor'].to_numpy(dtype=object).astype(str), return_inverse=True)
+        self.thicknesses, thickness_idx = np.unique(thickness, return_inverse=True)
+        self.widths, width_idx = np.unique(width, return_inverse=True)
+
+        shape = (len(self.competitors), len(self.thicknesses), len(self.widths))
+        cell = np.ravel_multi_index((competitor_idx, thickness_idx, width_idx), shape)
+        size = int(np.prod(shape))
+        finite = np.isfinite(price_per_volume)
+
+        self.count = np.bincount(cell, minlength=size).reshape(shape)
+        self.display_sum = np.bincount(cell, weights=display_price, minlength=size).reshape(shape)
+        self.ppv_sum = np.bincount(cell[finite], weights=price_per_volume[finite], minlength=size).reshape(shape)
+        self.ppv_count = np.bincount(cell[finite], minlength=size).reshape(shape)
+        self.display_avg = _mean(self.display_sum, self.count)
+        self.ppv_avg = _mean(self.ppv_sum, self.ppv_count)
+
+        # Products ordered by (thickness, width) cell, then Price_per_Volume
+        # (missing last), keeping data order for ties
+        sort_metric = np.where(finite, price_per_volume, np.inf)
+        order = np.lexsort((np.arange(len(frame)), sort_metric, width_idx, thickness_idx))
+        self.product_competitor = competitor_idx[order]
+        self.product_cell = (thickness_idx * len(self.widths) + width_idx)[order]
+        self.product_values = np.column_stack([
+            display_price, price, length, width, np.where(finite, price_per_volume, np.nan)
+        ])[order]
+
+    def query(self, competitors=None, details=True):
+        """
+        Heatmap for a subset of competitors
+
+        Args:
+            competitors: Competitor names to include (None = all)
+            details: Include the per-product list of each cell (tooltips)
+
+        Returns:
+            JSON-ready dict with the axes and a thickness x width matrix of
+            cells (None for empty cells)
+        """
+        if competitors is None:
+            selected = np.ones(len(self.competitors), dtype=bool)
+        else:
+            selected = np.isin(self.competitors, list(competitors))
+
+        count = self.count[selected]
+        cell_count = count.sum(axis=0)
+        rows = np.flatnonzero(cell_count.any(axis=1))
+        cols = np.flatnonzero(cell_count.any(axis=0))
+        cell_avg = _mean(self.ppv_sum[selected].sum(axis=0), self.ppv_count[selected].sum(axis=0))
+
+        keep = selected[self.product_competitor]
+        product_cell = self.product_cell[keep]
+        product_competitor = self.product_competitor[keep]
+        product_values = self.product_values[keep]
+        bounds = np.searchsorted(product_cell, np.arange(cell_count.size + 1))
+
+        cells = []
+        for t in rows:
+            row = []
+            for w in cols:
+                if cell_count[t, w] == 0:
+                    row.append(None)
+                    continue
+                flat = t * len(self.widths) + w
+                start, end = bounds[flat], bounds[flat + 1]
+                # Competitors in order of their cheapest product, then by
+                # average Price_per_Volume (missing last), as the client did
+                present = dict.fromkeys(product_competitor[start:end].tolist())
+                entries = [
+                    [str(self.competitors[c]), _json_number(self.display_avg[c, t, w]), _json_number(self.ppv_avg[c, t, w])]
+                    for c in present
+                ]
+                entries.sort(key=lambda entry: entry[2] if entry[2] is not None else float('inf'))
+                cell = {'avg': _json_number(cell_avg[t, w]), 'competitors': entries}
+                if details:
+                    cell['products'] = [
+                        [str(self.competitors[c])] + [_json_number(v) for v in values]
+                        for c, values in zip(product_competitor[start:end], product_values[start:end])
+                    ]
+                row.append(cell)
+            cells.append(row)
+
+        averages = cell_avg[np.ix_(rows, cols)]
+        averages = averages[np.isfinite(averages) & (cell_count[np.ix_(rows, cols)] > 0)]
+        return {
+            'category': self.category,
+            'competitors': self.competitors[selected].tolist(),
+            'thicknesses': self.thicknesses[rows].tolist(),
+            'widths': self.widths[cols].tolist(),
+            'avg_range': [float(averages.min()), float(averages.max())] if averages.size else None,
+            'product_fields': ['competitor', 'display_price', 'price', 'length', 'width', 'price_per_volume'],
+            'cells': cells
+        }
+
+
+def build_heatmap_cubes(by_category):
+    """
+    Heatmap cubes for every category slice
+
+    Args:
+        by_category: Mapping of product category -> product frame
+
+    Returns:
+        Dict of product category -> HeatmapCube
+    """
+    cubes = {}
+    for category, frame in by_category.items():
+        if frame.empty:
+            continue
+        cubes[category] = HeatmapCube(frame, category)
+    return cubes
@@ -0,0 +1,80 @@
+"""
+Leveled logging and event counters
+
+Every module logs through get_logger(__name__), which puts its logger under
+the 'followscope' logger; the level comes from FOLLOWSCOPE_LOG_LEVEL (INFO
+by default, DEBUG for the per-file and per-competitor detail the loaders
+used to print). Messages use logging's lazy %-arguments, so nothing is
+formatted for a level that is off. Hot paths that would need extra work to
+build a message check logger.isEnabledFor(logging.DEBUG) first.
+
+counters tallies events (files parsed, cache hits, errors) whatever the log
+level; /api/metrics exports them.
+"""
+
+import logging
+import os
+import sys
+import threading
+from collections import Counter
+
+ROOT_LOGGER = 'followscope'
+LOG_LEVEL_ENV = 'FOLLOWSCOPE_LOG_LEVEL'
+LOG_FORMAT = '%(asctime)s %(levelname)s [%(name)s] %(message)s'
+
+_configure_lock = threading.Lock()
+_configured = False
+
+
+def configure(level=None):
+    """
+    Attach a stdout handler to the 'followscope' logger (once)
+
+    Args:
+        level: Level name or number; defaults to FOLLOWSCOPE_LOG_LEVEL or INFO
+    """
+    global _configured
+    with _configure_lock:
+        root = logging.getLogger(ROOT_LOGGER)
+        if level is None:
+            level = os.environ.get(LOG_LEVEL_ENV, 'INFO')
+        if isinstance(level, str):
+            level = logging.getLevelName(level.upper())
+            if not isinstance(level, int):
+                level = logging.INFO
+        root.setLevel(level)
+        if not _configured:
+            handler = logging.StreamHandler(sys.stdout)
+            handler.setFormatter(logging.Formatter(LOG_FORMAT))
+            root.addHandler(handler)
+            # gunicorn/Flask configure the root logger; don't print twice
+            root.propagate = False
+            _configured = True
+    return root
+
+
+def get_logger(name):
+    """Logger for a module ('src.parser' -> 'followscope.parser')"""
+    if not _configured:
+        configure()
+    name = name.rsplit('.', 1)[-1] if name != '__main__' else 'main'
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+class EventCounters:
+    """Thread-safe named event counts"""
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self._counts[name] += amount
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counts)
+
+
+counters = EventCounters()
@@ -0,0 +1,189 @@
+"""
+Registry of the option-column patterns used by the product parser
+
+Patterns are grouped into slots. Within a slot they are tried in priority
+order and the first one that matches anywhere in the text wins, exactly like
+the former if/elif chains in the parser. Each (slot, category) pair is
+compiled once into a single alternation so a lookup is one regex call, and
+every winning pattern is counted so dead patterns can be spotted.
+"""
+
+import re
+import threading
+from collections import Counter
+
+
+class OptionPattern:
+    """A single named option pattern"""
+
+    def __init__(self, slot, name, regex, priority=0, categories=None):
+        self.slot = slot
+        self.name = name
+        self.regex = re.compile(regex)
+        self.priority = priority
+        self.categories = frozenset(categories) if categories else None
+
+    @property
+    def key(self):
+        return f"{self.slot}.{self.name}"
+
+    def applies_to(self, category):
+        """Whether this pattern is active for a product category"""
+        return self.categories is None or category in self.categories
+
+
+class OptionPatternRegistry:
+    """Ordered, category-aware pattern registry with hit counters"""
+
+    def __init__(self):
+        self._slots = {}
+        self._combined = {}
+        self._lock = threading.Lock()
+        self.hits = Counter()
+
+    def register(self, slot, name, regex, priority=0, categories=None):
+        """
+        Register a pattern in a slot
+
+        Args:
+            slot: Slot name (e.g., 'option1', 'option2_3stage')
+            name: Pattern name, unique within the slot
+            regex: Regular expression source
+            priority: Lower values are tried first
+            categories: Product categories the pattern applies to (None = all)
+        """
+        pattern = OptionPattern(slot, name, regex, priority, categories)
+        with self._lock:
+            slot_patterns = self._slots.setdefault(slot, [])
+            if any(p.name == name for p in slot_patterns):
+                raise ValueError(f"Pattern '{name}' already registered in slot '{slot}'")
+            slot_patterns.append(pattern)
+            # Stable sort keeps registration order for equal priorities
+            slot_patterns.sort(key=lambda p: p.priority)
+            self._combined.clear()
+        return pattern
+
+    def patterns(self, slot, category=None):
+        """Patterns of a slot in priority order, filtered by category"""
+        return [p for p in self._slots.get(slot, []) if p.applies_to(category)]
+
+    def all_patterns(self, slot=None):
+        """Every registered pattern (of one slot, or of all slots), ignoring categories"""
+        if slot is not None:
+            return list(self._slots.get(slot, []))
+        return [p for slot_patterns in self._slots.values() for p in slot_patterns]
+
+    def combined(self, slot, category=None):
+        """
+        Compiled alternation for a slot and category
+
+        Each alternative is a lookahead anchored at the start of the text,
+        so the first pattern (by priority) that matches anywhere wins, which
+        is what a sequence of re.search calls would return.
+
+        Returns:
+            (compiled regex, [(pattern, wrapper group index), ...])
+        """
+        cache_key = (slot, category)
+        cached = self._combined.get(cache_key)
+        if cached is not None:
+            return cached
+
+        parts = []
+        alternatives = []
+        group_index = 1
+        for pattern in self.patterns(slot, category):
+            parts.append(f"(?=.*?({pattern.regex.pattern}))")
+            alternatives.append((pattern, group_index))
+            group_index += 1 + pattern.regex.groups
+
+        source = '(?s)^(?:' + '|'.join(parts) + ')' if parts else r'(?!)'
+        cached = (re.compile(source), alternatives)
+        self._combined[cache_key] = cached
+        return cached
+
+    def match(self, slot, text, category=None):
+        """
+        Find the winning pattern of a slot for one text
+
+        Returns:
+            (pattern name, groups tuple) or None
+        """
+        regex, alternatives = self.combined(slot, category)
+        found = regex.match(text)
+        if not found:
+            return None
+        for pattern, index in alternatives:
+            if found.group(index) is not None:
+                self.record_hit(pattern.key)
+                return pattern.name, found.groups()[index:index + pattern.regex.groups]
+        return None
+
+    def record_hit(self, key, count=1):
+        """Add to the hit counter of a pattern (key is 'slot.name')"""
+        if count:
+            with self._lock:
+                self.hits[key] += count
+
+    def hit_counts(self):
+        """Hit count for every registered pattern, including zero counts"""
+        with self._lock:
+            return {p.key: self.hits.get(p.key, 0) for p in self.all_patterns()}
+
+    def dead_patterns(self):
+        """Keys of patterns that have never won a match"""
+        return [key for key, count in self.hit_counts().items() if count == 0]
+
+    def reset_hits(self):
+        """Clear all hit counters"""
+        with self._lock:
+            self.hits.clear()
+
+
+# Built-in patterns: (slot, name, priority, regex)
+# Slots holding several patterns replace an if/elif chain in the parser.
+OPTION_PATTERN_TABLE = [
+    # 옵션1: width/length like "110cm폭/1M" (에코폼)
+    ('option1_width', 'width_cm_pok', 10, r'(\d+)\s*cm폭'),
+    ('option1_length', 'length_m_slash', 10, r'/(\d+(?:\.\d+)?)\s*M'),
+    # 옵션1: puzzle types, then thickness (파크론)
+    ('option1', 'puzzle_type', 10, r'[AB]타입\((\d+)x(\d+)x(\d+(?:\.\d+)?)cmx(\d+)장\)'),  # "A타입(100x100x2.5cmx1장)"
+    ('option1', 'puzzle_type_pu', 20, r'PU_[AB]타입\((\d+)x(\d+)x(\d+)장\)'),  # "PU_A타입(100x100x1장)"
+    ('option1', 'thickness_cm_paren', 30, r'\((\d+(?:\.\d+)?)\s*cm\)'),  # "베이직(1.7cm) / 러그아이보리"
+    ('option1', 'thickness_cm', 40, r'(\d+(?:\.\d+)?)\s*cm'),  # "러그아이보리 2.2cm"
+
+    # 옵션2 (3-stage): folder mat size, applied before the thickness/width chain
+    ('option2_3stage_size', 'folder_size', 10, r'(\d+)\s*[x×]\s*(\d+)'),  # "200x200"
+    # 옵션2 (3-stage): thickness/width
+    ('option2_3stage', 'pet_mm_width_paren', 10, r'(\d+(?:\.\d+)?)\s*mm\s*\(폭\s*(\d+)\s*cm\)'),  # "6mm(폭110cm)" - 따사룸
+    ('option2_3stage', 'pet_mm_width_slash', 20, r'(\d+(?:\.\d+)?)\s*mm\s*/\s*(\d+)\s*cm'),  # "6mm / 110cm" - 리포소
+    ('option2_3stage', 't_notation', 30, r'(\d+(?:\.\d+)?)\s*cm\s*\(\d+T\)'),  # "0.6cm(6T)" - 딩굴
+    ('option2_3stage', 't_notation_reverse', 40, r'\d+T\s*\((\d+(?:\.\d+)?)\s*(mm|cm)\)'),  # "9T(9mm)" - 로하우스
+    ('option2_3stage', 'thickness_width_cm', 50, r'(\d+(?:\.\d+)?)\s*cm\s*/\s*(\d+)\s*cm'),  # "1.7cm / 80cm"
+    ('option2_3stage', 'thickness_width_korean', 60, r'두께\s*(\d+(?:\.\d+)?)\s*cm\s*/\s*폭\s*(\d+)\s*cm'),  # "두께1.7cm / 폭80cm"
+    ('option2_3stage', 'width_cm', 70, r'(\d+)\s*cm'),  # "50cm" - 파크론
+
+    # 옵션2 (2-stage): size info
+    ('option2_2stage', 'folder_size', 10, r'(\d+)\s*[x×]\s*(\d+)'),  # "200x200"
+    ('option2_2stage', 'puzzle_mm_pieces', 20, r'\((\d+)mm\)\s*(\d+)x(\d+)\s*(\d+)장'),  # "(25mm) 100x100 1장"
+    ('option2_2stage', 'puzzle_cm_pieces', 30, r'(\d+)x(\d+)x(\d+(?:\.\d+)?)cm\s*\((\d+)장\)'),  # "100x100x3cm (1장)"
+    ('option2_2stage', 'dimension_3d', 40, r'(\d+)\s*x\s*(\d+)\s*x\s*(\d+(?:\.\d+)?)\s*cm'),  # length x width x thickness
+    ('option2_2stage', 'dimension_2d', 50, r'(\d+)\s*x\s*(\d+)$'),  # "110x50"
+    # 옵션2 (2-stage): color/thickness combo when no size matched
+    ('option2_thickness', 'thickness_mm', 10, r'(\d+(?:\.\d+)?)\s*mm'),  # "베이지스캐터/15mm(리뉴얼)"
+    ('option2_width', 'width_only', 10, r'^(\d+)\s*cm$'),  # "110cm"
+    ('option2_color', 'color', 10, r'^([^/]+)'),
+
+    # 옵션3 (3-stage): length
+    ('option3', 'puzzle_mm_pieces', 10, r'\((\d+)mm\)\s*(\d+)x(\d+)\s*(\d+)장'),  # "(25mm) 50x50 4장" - 따사룸
+    ('option3', 'dimension_cm_x_cm', 20, r'(?:폭\s*)?(\d+)\s*cm\s*x\s*(\d+)\s*cm'),  # "폭 110cm x 50cm"
+    ('option3', 'mixed_cm_x_m', 30, r'(\d+)\s*cm\s*x\s*(\d+(?:\.\d+)?)\s*m'),  # "140cm x 1m" - 로하우스
+    ('option3', 'length_m_cm', 40, r'(\d+)\s*m\s*(\d+)\s*cm'),  # "1m50cm"
+    ('option3_meters', 'length_m', 10, r'(\d+(?:\.\d+)?)\s*m'),  # "1m"
+    ('option3_cm', 'length_cm', 10, r'(?:길이\s*)?(\d+)\s*cm'),  # "길이 50cm"
+]
+
+
+OPTION_PATTERNS = OptionPatternRegistry()
+for _slot, _name, _priority, _regex in OPTION_PATTERN_TABLE:
+    OPTION_PATTERNS.register(_slot, _name, _regex, priority=_priority)
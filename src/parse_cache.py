@@ -0,0 +1,195 @@
+"""
+On-disk cache of parsed product frames, one entry per source file
+
+Each entry is keyed by the file path and validated against its size, mtime
+and content hash, so a reload only has to parse files that were added or
+changed. Entries of files that disappeared are dropped by prune().
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    from .brands import aliases_path
+    from .log import get_logger
+except ImportError:
+    from brands import aliases_path
+    from log import get_logger
+
+logger = get_logger(__name__)
+
+MANIFEST_NAME = 'manifest.json'
+PARSER_SOURCES = ('parser.py', 'option_patterns.py', 'config.py', 'brands.py')
+
+
+def file_digest(file_path, chunk_size=1 << 20):
+    """SHA-1 of a file's content"""
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parser_fingerprint(engine):
+    """
+    Fingerprint of the parsing code; entries written by another parser
+    version or engine are discarded
+    """
+    digest = hashlib.sha1(engine.encode('utf-8'))
+    src_dir = Path(__file__).parent
+    for name in PARSER_SOURCES:
+        source = src_dir / name
+        if source.exists():
+            digest.update(source.read_bytes())
+    # Competitor names come from the brand registry
+    aliases = Path(aliases_path())
+    if aliases.exists():
+        digest.update(aliases.read_bytes())
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """Per-file cache of parsed product frames"""
+
+    def __init__(self, cache_dir, engine=None):
+        try:
+            from .config import PARSE_ENGINE
+        except ImportError:
+            from config import PARSE_ENGINE
+        self.cache_dir = Path(cache_dir)
+        self.engine = engine or PARSE_ENGINE
+        self.fingerprint = parser_fingerprint(self.engine)
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._frames = {}
+        self._dirty = False
+        self._load_manifest()
+
+    def _manifest_path(self):
+        return self.cache_dir / MANIFEST_NAME
+
+    def _frame_path(self, key):
+        return self.cache_dir / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.pkl"
+
+    def _load_manifest(self):
+        try:
+            with open(self._manifest_path(), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return
+        if manifest.get('fingerprint') != self.fingerprint:
+            logger.info("Parse cache: parser changed, discarding cached frames")
+            return
+        self._entries = manifest.get('files', {})
+
+    def _save_manifest(self):
+        self._dirty = False
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        manifest = {'fingerprint': self.fingerprint, 'files': self._entries}
+        # Per-process temporary names: workers without a shared snapshot all
+        # write to the same cache directory
+        tmp_path = f"{self._manifest_path()}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, self._manifest_path())
+
+    def get(self, file_path):
+        """
+        Cached frame for a file, or None if the file is new or changed
+
+        Size and mtime are checked first; the content hash is only computed
+        when they differ, so touched-but-identical files still hit.
+        """
+        key = str(file_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                return None
+            if stat.st_size != entry['size']:
+                return None
+            if stat.st_mtime_ns != entry['mtime_ns']:
+                if file_digest(file_path) != entry['sha1']:
+                    return None
+                entry['mtime_ns'] = stat.st_mtime_ns
+                self._dirty = True
+
+            frame = self._frames.get(key)
+            if frame is None:
+                try:
+                    frame = pd.read_pickle(self._frame_path(key))
+                except Exception:
+                    self._entries.pop(key, None)
+                    return None
+                self._frames[key] = frame
+            return frame
+
+    def signature(self, file_path):
+        """Size, mtime and content hash of a file as stored in the manifest"""
+        stat = os.stat(file_path)
+        return {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha1': file_digest(file_path)
+        }
+
+    def put(self, file_path, frame, signature=None):
+        """
+        Store the parsed frame of a file
+
+        Args:
+            file_path: Source file the frame was parsed from
+            frame: Parsed product rows of that file (may be empty)
+            signature: Result of signature() taken before the file was read,
+                so a write that lands mid-parse invalidates the entry
+        """
+        key = str(file_path)
+        entry = signature or self.signature(file_path)
+        with self._lock:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            frame_path = self._frame_path(key)
+            tmp_path = f"{frame_path}.{os.getpid()}.tmp"
+            try:
+                frame.to_pickle(tmp_path)
+                os.replace(tmp_path, frame_path)
+            except OSError as e:
+                logger.warning("Parse cache: could not store %s: %s", Path(file_path).name, e)
+                return
+            self._entries[key] = entry
+            self._frames[key] = frame
+            self._dirty = True
+
+    def prune(self, file_paths):
+        """Drop entries of files that are no longer present"""
+        keep = {str(path) for path in file_paths}
+        with self._lock:
+            removed = [key for key in self._entries if key not in keep]
+            for key in removed:
+                self._entries.pop(key, None)
+                self._frames.pop(key, None)
+                try:
+                    self._frame_path(key).unlink()
+                except OSError:
+                    pass
+            if removed:
+                self._dirty = True
+        return removed
+
+    def save(self):
+        """Write the manifest if entries changed"""
+        with self._lock:
+            if self._dirty:
+                try:
+                    self._save_manifest()
+                except OSError as e:
+                    self._dirty = True
+                    logger.warning("Parse cache: could not write the manifest: %s", e)
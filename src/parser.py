@@ -2,11 +2,34 @@
 Data parser for processing raw competitor data
 """
 
+import logging
 import pandas as pd
+import numpy as np
 import re
 import os
 from pathlib import Path
 
+try:
+    from .option_patterns import OPTION_PATTERNS
+    from .brands import resolve_brand
+    from .log import get_logger, counters
+except ImportError:
+    from option_patterns import OPTION_PATTERNS
+    from brands import resolve_brand
+    from log import get_logger, counters
+
+logger = get_logger(__name__)
+
+
+def _normalize_puzzle_pieces(width, length, pieces):
+    """
+    Normalize 50x50 4pieces to 100x100 1piece
+    """
+    width, length, pieces = int(width), int(length), int(pieces)
+    if width == 50 and length == 50 and pieces == 4:
+        return '100', '100'
+    return str(width), str(length)
+
 
 def extract_product_attributes_from_csv(row, category=None):
     """
@@ -40,68 +63,37 @@ def extract_product_attributes_from_csv(row, category=None):
             attributes['design'] = design
             
             # Check if 옵션1 contains width info (like "110cm폭/1M")
-            width_in_option1 = re.search(r'(\d+)\s*cm폭', option1_str)
+            width_in_option1 = OPTION_PATTERNS.match('option1_width', option1_str, category)
             if width_in_option1:
-                attributes['width'] = width_in_option1.group(1)
+                attributes['width'] = width_in_option1[1][0]
             
             # Check if 옵션1 contains length info (like "110cm폭/1M" where 1M is length)
-            length_in_option1 = re.search(r'/(\d+(?:\.\d+)?)\s*M', option1_str)
+            length_in_option1 = OPTION_PATTERNS.match('option1_length', option1_str, category)
             if length_in_option1:
                 # Convert meters to cm
-                length_m = float(length_in_option1.group(1))
+                length_m = float(length_in_option1[1][0])
                 attributes['length'] = str(length_m * 100)
                 # For 에코폼, clear design if it contains width/length info
-                if width_in_option1 and length_in_option1:
+                if width_in_option1:
                     attributes['design'] = None
             
-            # Check for puzzle mat pattern: "A타입(100x100x2.5cmx1장)" or "B타입(50x50x2.5cmx4장)"
-            puzzle_pattern = re.search(r'[AB]타입\((\d+)x(\d+)x(\d+(?:\.\d+)?)cmx(\d+)장\)', option1_str)
-            if puzzle_pattern:
-                width = int(puzzle_pattern.group(1))
-                length = int(puzzle_pattern.group(2))
-                thickness = puzzle_pattern.group(3)
-                pieces = int(puzzle_pattern.group(4))
-                
-                # Normalize 50x50 4pieces to 100x100 1piece
-                if width == 50 and length == 50 and pieces == 4:
-                    attributes['width'] = '100'
-                    attributes['length'] = '100'
-                else:
-                    attributes['width'] = str(width)
-                    attributes['length'] = str(length)
-                attributes['thickness'] = thickness
-            else:
-                # Check for PU pattern without cm: "PU_A타입(100x100x1장)" or "PU_B타입(50x50x4장)"
-                pu_pattern = re.search(r'PU_[AB]타입\((\d+)x(\d+)x(\d+)장\)', option1_str)
-                if pu_pattern:
-                    width = int(pu_pattern.group(1))
-                    length = int(pu_pattern.group(2))
-                    pieces = int(pu_pattern.group(3))
-                    
-                    # Normalize 50x50 4pieces to 100x100 1piece
-                    if width == 50 and length == 50 and pieces == 4:
-                        attributes['width'] = '100'
-                        attributes['length'] = '100'
-                    else:
-                        attributes['width'] = str(width)
-                        attributes['length'] = str(length)
-                    # Default thickness for PU type (need to check 옵션2 or 옵션3)
-                    # Set default thickness for puzzle mats
-                    if category == '퍼즐매트':
-                        attributes['thickness'] = '2.5'  # Default thickness for puzzle mats
-                    else:
-                        attributes['thickness'] = None
+            # Puzzle types first, then thickness (파크론)
+            name, groups = OPTION_PATTERNS.match('option1', option1_str, category) or (None, None)
+            if name == 'puzzle_type':
+                # "A타입(100x100x2.5cmx1장)" or "B타입(50x50x2.5cmx4장)"
+                attributes['width'], attributes['length'] = _normalize_puzzle_pieces(groups[0], groups[1], groups[3])
+                attributes['thickness'] = groups[2]
+            elif name == 'puzzle_type_pu':
+                # "PU_A타입(100x100x1장)" or "PU_B타입(50x50x4장)"
+                attributes['width'], attributes['length'] = _normalize_puzzle_pieces(*groups)
+                # Default thickness for PU type (need to check 옵션2 or 옵션3)
+                if category == '퍼즐매트':
+                    attributes['thickness'] = '2.5'  # Default thickness for puzzle mats
                 else:
-                    # 파크론 파일: 옵션1에서 두께 추출
-                    # Pattern 1: "베이직(1.7cm) / 러그아이보리"
-                    thickness_match = re.search(r'\((\d+(?:\.\d+)?)\s*cm\)', option1_str)
-                    if thickness_match:
-                        attributes['thickness'] = thickness_match.group(1)
-                    else:
-                        # Pattern 2: "러그아이보리 2.2cm" (new pattern for sub data)
-                        thickness_match2 = re.search(r'(\d+(?:\.\d+)?)\s*cm', option1_str)
-                        if thickness_match2:
-                            attributes['thickness'] = thickness_match2.group(1)
+                    attributes['thickness'] = None
+            elif name in ('thickness_cm_paren', 'thickness_cm'):
+                # "베이직(1.7cm) / 러그아이보리" or "러그아이보리 2.2cm"
+                attributes['thickness'] = groups[0]
     
     # Process 옵션2 differently based on stage type
     if pd.notna(row.get('옵션2')):
@@ -110,262 +102,138 @@ def extract_product_attributes_from_csv(row, category=None):
             if is_3stage:
                 # 3-stage format: 옵션2 contains thickness/width info
                 # Check for folder mat patterns FIRST (폴더매트 크기 패턴)
-                folder_mat_pattern = r'(\d+)\s*[x×]\s*(\d+)'
-                folder_match = re.search(folder_mat_pattern, option2_str)
-                
+                folder_match = OPTION_PATTERNS.match('option2_3stage_size', option2_str, category)
                 if folder_match:
                     # 폴더매트 크기 추출 (예: "200x200", "240x200")
-                    width = int(folder_match.group(1))
-                    length = int(folder_match.group(2))
-                    attributes['width'] = str(width)
-                    attributes['length'] = str(length)
+                    attributes['width'] = str(int(folder_match[1][0]))
+                    attributes['length'] = str(int(folder_match[1][1]))
                     attributes['thickness'] = '0'  # 폴더매트는 두께가 없음
-                else:
-                    # Pattern for "1.7cm / 80cm" format
-                    simple_pattern = r'(\d+(?:\.\d+)?)\s*cm\s*/\s*(\d+)\s*cm'
-                    # Pattern for "두께1.7cm / 폭80cm" format
-                    korean_pattern = r'두께\s*(\d+(?:\.\d+)?)\s*cm\s*/\s*폭\s*(\d+)\s*cm'
-                # Pattern for pet mat format "6mm(폭110cm)" or "9mm(폭125cm)" - 따사룸
-                pet_pattern = r'(\d+(?:\.\d+)?)\s*mm\s*\(폭\s*(\d+)\s*cm\)'
-                # Pattern for pet mat format "6mm / 110cm" - 리포소
-                pet_pattern2 = r'(\d+(?:\.\d+)?)\s*mm\s*/\s*(\d+)\s*cm'
-                # Pattern for T notation "0.6cm(6T)" - 딩굴
-                t_pattern = r'(\d+(?:\.\d+)?)\s*cm\s*\(\d+T\)'
-                # Pattern for T notation reverse "9T(9mm)" or "15T(1.5cm)" - 로하우스
-                t_pattern2 = r'\d+T\s*\((\d+(?:\.\d+)?)\s*(mm|cm)\)'
                 
-                # Try pet patterns first for pet mats
-                pet_match = re.search(pet_pattern, option2_str)
-                pet_match2 = re.search(pet_pattern2, option2_str)
-                t_match = re.search(t_pattern, option2_str)
-                t_match2 = re.search(t_pattern2, option2_str)
-                
-                if pet_match:
-                    # Convert mm to cm for thickness - 따사룸
-                    thickness_mm = float(pet_match.group(1))
-                    attributes['thickness'] = str(thickness_mm / 10)
-                    attributes['width'] = pet_match.group(2)
-                elif pet_match2:
-                    # Convert mm to cm for thickness - 리포소
-                    thickness_mm = float(pet_match2.group(1))
-                    attributes['thickness'] = str(thickness_mm / 10)
-                    attributes['width'] = pet_match2.group(2)
-                elif t_match:
-                    # T notation pattern 1 - 딩굴
-                    attributes['thickness'] = t_match.group(1)
-                    # Width might be in 옵션3 for 딩굴
-                elif t_match2:
+                name, groups = OPTION_PATTERNS.match('option2_3stage', option2_str, category) or (None, None)
+                if name in ('pet_mm_width_paren', 'pet_mm_width_slash'):
+                    # Convert mm to cm for thickness - 따사룸, 리포소
+                    attributes['thickness'] = str(float(groups[0]) / 10)
+                    attributes['width'] = groups[1]
+                elif name == 't_notation':
+                    # T notation pattern 1 - 딩굴 (width might be in 옵션3)
+                    attributes['thickness'] = groups[0]
+                elif name == 't_notation_reverse':
                     # T notation pattern 2 - 로하우스
-                    value = float(t_match2.group(1))
-                    unit = t_match2.group(2)
-                    if unit == 'mm':
+                    value = float(groups[0])
+                    if groups[1] == 'mm':
                         attributes['thickness'] = str(value / 10)
                     else:
                         attributes['thickness'] = str(value)
-                else:
-                    # Pattern for "1.7cm / 80cm" format
-                    simple_pattern = r'(\d+(?:\.\d+)?)\s*cm\s*/\s*(\d+)\s*cm'
-                    # Pattern for "두께1.7cm / 폭80cm" format
-                    korean_pattern = r'두께\s*(\d+(?:\.\d+)?)\s*cm\s*/\s*폭\s*(\d+)\s*cm'
-                    
-                    # Try simple pattern
-                    match = re.search(simple_pattern, option2_str)
-                    if match:
-                        attributes['thickness'] = match.group(1)
-                        attributes['width'] = match.group(2)
-                    else:
-                        # Try Korean pattern
-                        match = re.search(korean_pattern, option2_str)
-                        if match:
-                            attributes['thickness'] = match.group(1)
-                            attributes['width'] = match.group(2)
-                        else:
-                            # 파크론 파일: 옵션2에서 폭만 추출 (예: "50cm")
-                            width_only_match = re.search(r'(\d+)\s*cm', option2_str)
-                            if width_only_match:
-                                attributes['width'] = width_only_match.group(1)
+                elif name in ('thickness_width_cm', 'thickness_width_korean'):
+                    # "1.7cm / 80cm" or "두께1.7cm / 폭80cm"
+                    attributes['thickness'] = groups[0]
+                    attributes['width'] = groups[1]
+                elif name == 'width_cm':
+                    # 파크론 파일: 옵션2에서 폭만 추출 (예: "50cm")
+                    attributes['width'] = groups[0]
             else:
                 # 2-stage format: 옵션2 contains size info or color/thickness combo
-                
-                # Check for folder mat patterns FIRST (폴더매트 크기 패턴)
-                folder_mat_pattern = r'(\d+)\s*[x×]\s*(\d+)'
-                folder_match = re.search(folder_mat_pattern, option2_str)
-                
-                if folder_match:
+                # (폴더매트 크기 패턴 is checked first)
+                name, groups = OPTION_PATTERNS.match('option2_2stage', option2_str, category) or (None, None)
+                if name == 'folder_size':
                     # 폴더매트 크기 추출 (예: "200x200", "240x200")
-                    width = int(folder_match.group(1))
-                    length = int(folder_match.group(2))
-                    attributes['width'] = str(width)
-                    attributes['length'] = str(length)
+                    attributes['width'] = str(int(groups[0]))
+                    attributes['length'] = str(int(groups[1]))
                     attributes['thickness'] = '0'  # 폴더매트는 두께가 없음
-                else:
-                    # 퍼즐/기타 규격 패턴 체크
-                    puzzle_option2_pattern1 = r'\((\d+)mm\)\s*(\d+)x(\d+)\s*(\d+)장'
-                    puzzle_option2_pattern2 = r'(\d+)x(\d+)x(\d+(?:\.\d+)?)cm\s*\((\d+)장\)'
+                elif name == 'puzzle_mm_pieces':
+                    # Convert mm to cm for thickness
+                    attributes['thickness'] = str(float(groups[0]) / 10)
+                    attributes['width'], attributes['length'] = _normalize_puzzle_pieces(*groups[1:])
+                elif name == 'puzzle_cm_pieces':
+                    # 티지오매트 형식
+                    attributes['width'], attributes['length'] = _normalize_puzzle_pieces(groups[0], groups[1], groups[3])
+                    attributes['thickness'] = groups[2]
+                elif name == 'dimension_3d':
+                    # Format: length x width x thickness
+                    original_length = int(groups[0])
 
-                    puzzle_match = re.search(puzzle_option2_pattern1, option2_str)
-                    puzzle_match2 = re.search(puzzle_option2_pattern2, option2_str)
+                    # For 리코코 long mats: break down into 50cm units for comparison
+                    if original_length >= 100:  # Only for lengths 100cm or more
+                        # Calculate how many 50cm units this represents
+                        unit_count = original_length // 50
+                        # Set length to 50cm for unit comparison, store unit count
+                        attributes['length'] = '50'
+                        attributes['unit_count'] = str(unit_count)
+                    else:
+                        # For shorter lengths, use as-is
+                        attributes['length'] = str(original_length)
 
-                    if puzzle_match:
-                        # Convert mm to cm for thickness
-                        thickness_mm = float(puzzle_match.group(1))
+                    if not attributes['width']:  # Only if not already found in 옵션1
+                        attributes['width'] = groups[1]
+                    if not attributes['thickness']:  # Only if not already found in 옵션1
+                        attributes['thickness'] = groups[2]
+                elif name == 'dimension_2d':
+                    # Width x length format like "110x50"
+                    if not attributes['width']:  # Only if not already found in 옵션1
+                        attributes['width'] = groups[0]
+                    attributes['length'] = groups[1]
+                else:
+                    # 옵션2 contains color/pattern and thickness info
+                    # Example: "베이지스캐터/15mm(리뉴얼)", "포쉐린/21mm(리뉴얼)"
+                    thickness_in_option2 = OPTION_PATTERNS.match('option2_thickness', option2_str, category)
+                    if thickness_in_option2:
+                        # Convert mm to cm
+                        thickness_mm = float(thickness_in_option2[1][0])
                         attributes['thickness'] = str(thickness_mm / 10)
 
-                        width = int(puzzle_match.group(2))
-                        length = int(puzzle_match.group(3))
-                        pieces = int(puzzle_match.group(4))
-
-                        # Normalize 50x50 4pieces to 100x100 1piece
-                        if width == 50 and length == 50 and pieces == 4:
-                            attributes['width'] = '100'
-                            attributes['length'] = '100'
-                        else:
-                            attributes['width'] = str(width)
-                            attributes['length'] = str(length)
-                    elif puzzle_match2:
-                        # Pattern 2: 티지오매트 형식
-                        width = int(puzzle_match2.group(1))
-                        length = int(puzzle_match2.group(2))
-                        thickness = puzzle_match2.group(3)
-                        pieces = int(puzzle_match2.group(4))
-
-                        # Normalize 50x50 4pieces to 100x100 1piece
-                        if width == 50 and length == 50 and pieces == 4:
-                            attributes['width'] = '100'
-                            attributes['length'] = '100'
-                        else:
-                            attributes['width'] = str(width)
-                            attributes['length'] = str(length)
-                        attributes['thickness'] = thickness
-                    else:
-                        # Check for 3D dimensions (length x width x thickness)
-                        dimension_3d_pattern = r'(\d+)\s*x\s*(\d+)\s*x\s*(\d+(?:\.\d+)?)\s*cm'
-                        dim_3d_match = re.search(dimension_3d_pattern, option2_str)
-                        if dim_3d_match:
-                            # Format: length x width x thickness
-                            original_length = int(dim_3d_match.group(1))
-
-                            # For 리코코 long mats: break down into 50cm units for comparison
-                            if original_length >= 100:  # Only for lengths 100cm or more
-                                # Calculate how many 50cm units this represents
-                                unit_count = original_length // 50
-                                # Set length to 50cm for unit comparison, store unit count
-                                attributes['length'] = '50'
-                                attributes['unit_count'] = str(unit_count)
-                            else:
-                                # For shorter lengths, use as-is
-                                attributes['length'] = str(original_length)
-
-                            if not attributes['width']:  # Only if not already found in 옵션1
-                                attributes['width'] = dim_3d_match.group(2)
-                            if not attributes['thickness']:  # Only if not already found in 옵션1
-                                attributes['thickness'] = dim_3d_match.group(3)
-                        else:
-                            # Case 1: 옵션2 is 2D dimensions like "110x50", "110x100"
-                            dimension_pattern = r'(\d+)\s*x\s*(\d+)$'  # Added $ to ensure no "cm" follows
-                            dim_match = re.search(dimension_pattern, option2_str)
-                            if dim_match:
-                                # This is width x length format
-                                if not attributes['width']:  # Only if not already found in 옵션1
-                                    attributes['width'] = dim_match.group(1)
-                                attributes['length'] = dim_match.group(2)
+                    # 옵션2 is just width (like "100cm", "110cm")
+                    width_only = OPTION_PATTERNS.match('option2_width', option2_str, category)
+                    if width_only and not attributes['width']:
+                        attributes['width'] = width_only[1][0]
+
+                    # Extract color/pattern info for design (if not just width)
+                    if not width_only:
+                        color_pattern = OPTION_PATTERNS.match('option2_color', option2_str, category)
+                        if color_pattern:
+                            color_info = color_pattern[1][0].strip()
+                            if attributes['design']:
+                                attributes['design'] = f"{attributes['design']} - {color_info}"
                             else:
-                                # Case 2: 옵션2 contains color/pattern and thickness info
-                                # Example: "베이지스캐터/15mm(리뉴얼)", "포쉐린/21mm(리뉴얼)"
-                                thickness_in_option2 = re.search(r'(\d+(?:\.\d+)?)\s*mm', option2_str)
-                                if thickness_in_option2:
-                                    # Convert mm to cm
-                                    thickness_mm = float(thickness_in_option2.group(1))
-                                    attributes['thickness'] = str(thickness_mm / 10)
-
-                                # Case 3: 옵션2 is just width (like "100cm", "110cm")
-                                width_only_pattern = re.search(r'^(\d+)\s*cm$', option2_str)
-                                if width_only_pattern and not attributes['width']:
-                                    attributes['width'] = width_only_pattern.group(1)
-
-                                # Extract color/pattern info for design (if not just width)
-                                if not width_only_pattern:
-                                    color_pattern = re.search(r'^([^/]+)', option2_str)
-                                    if color_pattern:
-                                        color_info = color_pattern.group(1).strip()
-                                        if attributes['design']:
-                                            attributes['design'] = f"{attributes['design']} - {color_info}"
-                                        else:
-                                            attributes['design'] = color_info
+                                attributes['design'] = color_info
     
     # Extract length from 옵션3 (only for 3-stage data)
     if is_3stage and pd.notna(row.get('옵션3')):
         length_str = str(row['옵션3']).strip()
         if length_str:
-            # Check for puzzle mat pattern: "(25mm) 100x100 1장" or "(40mm) 50x50 4장" (따사룸)
-            puzzle_option3_pattern = r'\((\d+)mm\)\s*(\d+)x(\d+)\s*(\d+)장'
-            puzzle_match = re.search(puzzle_option3_pattern, length_str)
-            
-            if puzzle_match:
-                thickness_mm = int(puzzle_match.group(1))
-                width = int(puzzle_match.group(2))
-                length = int(puzzle_match.group(3))
-                pieces = int(puzzle_match.group(4))
-                
-                # Convert mm to cm for thickness
-                attributes['thickness'] = str(thickness_mm / 10)
-                
-                # Normalize 50x50 4pieces to 100x100 1piece
-                if width == 50 and length == 50 and pieces == 4:
-                    attributes['width'] = '100'
-                    attributes['length'] = '100'
-                else:
-                    attributes['width'] = str(width)
-                    attributes['length'] = str(length)
+            name, groups = OPTION_PATTERNS.match('option3', length_str, category) or (None, None)
+            if name == 'puzzle_mm_pieces':
+                # "(25mm) 100x100 1장" or "(40mm) 50x50 4장" (따사룸)
+                attributes['thickness'] = str(int(groups[0]) / 10)
+                attributes['width'], attributes['length'] = _normalize_puzzle_pieces(*groups[1:])
+            elif name == 'dimension_cm_x_cm':
+                # "폭 110cm x 50cm" (딩굴) or "110cm x 50cm" (로하우스)
+                if not attributes['width']:
+                    attributes['width'] = groups[0]
+                attributes['length'] = groups[1]
+            elif name == 'mixed_cm_x_m':
+                # "140cm x 1m" (로하우스): width in cm, length in meters
+                if not attributes['width']:
+                    attributes['width'] = groups[0]
+                attributes['length'] = str(float(groups[1]) * 100)  # Convert to cm
             else:
-                # Check for dimension patterns like "폭 110cm x 50cm" (딩굴) or "110cm x 50cm" (로하우스)
-                dimension_pattern = r'(?:폭\s*)?(\d+)\s*cm\s*x\s*(\d+)\s*cm'
-                dim_match = re.search(dimension_pattern, length_str)
-
-                if dim_match:
-                    # This contains both width and length
-                    if not attributes['width']:
-                        attributes['width'] = dim_match.group(1)
-                    attributes['length'] = dim_match.group(2)
+                # Handle "XmYcm", "Xm" or "Ycm" format
+                length_cm = 0
+
+                if name == 'length_m_cm':
+                    length_cm = float(groups[0]) * 100 + float(groups[1])
                 else:
-                    # Check for mixed units like "140cm x 1m" (로하우스)
-                    mixed_pattern = r'(\d+)\s*cm\s*x\s*(\d+(?:\.\d+)?)\s*m'
-                    mixed_match = re.search(mixed_pattern, length_str)
-
-                    if mixed_match:
-                        # First number is width in cm, second is length in meters
-                        if not attributes['width']:
-                            attributes['width'] = mixed_match.group(1)
-                        length_m = float(mixed_match.group(2))
-                        attributes['length'] = str(length_m * 100)  # Convert to cm
-                    else:
-                        # Handle "Xm" or "XmYcm" format
-                        meter_pattern = r'(\d+(?:\.\d+)?)\s*m'
-                        cm_pattern = r'(\d+)\s*cm'
-
-                        length_cm = 0
-
-                        # First check if it's a combined format like "1m50cm"
-                        combined_pattern = r'(\d+)\s*m\s*(\d+)\s*cm'
-                        combined_match = re.search(combined_pattern, length_str)
-
-                        if combined_match:
-                            # Handle "XmYcm" format
-                            length_cm = float(combined_match.group(1)) * 100 + float(combined_match.group(2))
-                        else:
-                            # Check for meters only
-                            meter_match = re.search(meter_pattern, length_str)
-                            if meter_match:
-                                length_cm += float(meter_match.group(1)) * 100
-
-                            # Check for cm only (with or without '길이' prefix)
-                            cm_only_pattern = r'(?:길이\s*)?(\d+)\s*cm'
-                            cm_match = re.search(cm_only_pattern, length_str)
-                            if cm_match and length_cm == 0:  # Only if no meters found
-                                length_cm = float(cm_match.group(1))
-
-                        if length_cm > 0:
-                            attributes['length'] = str(length_cm)
+                    # Check for meters only
+                    meter_match = OPTION_PATTERNS.match('option3_meters', length_str, category)
+                    if meter_match:
+                        length_cm += float(meter_match[1][0]) * 100
+
+                    # Check for cm only (with or without '길이' prefix)
+                    cm_match = OPTION_PATTERNS.match('option3_cm', length_str, category)
+                    if cm_match and length_cm == 0:  # Only if no meters found
+                        length_cm = float(cm_match[1][0])
+
+                if length_cm > 0:
+                    attributes['length'] = str(length_cm)
     
     # Extract price - handle both formats: 기본가격,옵션1,옵션2,옵션3,추가가격,최종가격 and 옵션1,옵션2,옵션3,추가가격,최종가격
     if pd.notna(row.get('최종가격')):
@@ -389,6 +257,304 @@ def extract_product_attributes_from_csv(row, category=None):
     return attributes
 
 
+def _clean_option_column(values):
+    """
+    Convert a raw option column to stripped strings, with NaN for empty cells
+    (mirrors the str(...).strip() checks in extract_product_attributes_from_csv)
+    """
+    column = pd.Series(values, dtype=object)
+    present = column.notna().to_numpy()
+    cleaned = np.full(len(column), np.nan, dtype=object)
+    if present.any():
+        cleaned[present] = column[present].map(str).str.strip().to_numpy(dtype=object)
+        cleaned[cleaned == ''] = np.nan
+    return pd.Series(cleaned, dtype=object)
+
+
+def _match_slot(column, slot, category=None, where=None):
+    """
+    Match a pattern slot against a whole column (restricted to rows in
+    `where`) with one .str.extract of the slot's combined alternation per
+    category
+
+    Returns:
+        (winning pattern name per row or None,
+         {pattern name: 2D object array of its groups, NaN for other rows})
+    """
+    n_rows = len(column)
+    selected = column.notna().to_numpy()
+    if where is not None:
+        selected = selected & where
+    categories = np.broadcast_to(np.asarray(category, dtype=object), (n_rows,))
+
+    winner = np.full(n_rows, None, dtype=object)
+    groups = {
+        pattern.name: np.full((n_rows, pattern.regex.groups), np.nan, dtype=object)
+        for pattern in OPTION_PATTERNS.all_patterns(slot)
+    }
+    for value in pd.unique(categories[selected]):
+        rows = np.flatnonzero(selected & (categories == value))
+        regex, alternatives = OPTION_PATTERNS.combined(slot, value)
+        extracted = column.iloc[rows].str.extract(regex.pattern, expand=True).to_numpy(dtype=object)
+        for pattern, index in alternatives:
+            hit = pd.notna(extracted[:, index - 1])
+            if hit.any():
+                winner[rows[hit]] = pattern.name
+                groups[pattern.name][rows[hit]] = extracted[hit, index:index + pattern.regex.groups]
+                OPTION_PATTERNS.record_hit(pattern.key, int(hit.sum()))
+    return winner, groups
+
+
+def _match_numbers(column, slot, name, category=None, where=None):
+    """
+    Groups of one pattern of a slot as floats (NaN where it did not win)
+    """
+    return _match_slot(column, slot, category, where)[1][name].astype(float)
+
+
+def prepare_option_columns(df):
+    """
+    Turn a structured option CSV into the inputs of the columnar parser:
+    cleaned 옵션1/옵션2/옵션3 strings and the parsed price (최종가격, falling
+    back to 기본가격 for the folder mat format)
+    """
+    # iterrows() hands rows over as df.values, so take the columns from the
+    # same array to get identical str() representations for mixed dtypes
+    values = df.to_numpy()
+
+    def raw_column(name):
+        if name not in df.columns:
+            return pd.Series(np.nan, index=range(len(df)), dtype=object)
+        return pd.Series(values[:, df.columns.get_loc(name)], dtype=object)
+
+    final_price = raw_column('최종가격')
+    price_source = final_price.where(final_price.notna(), raw_column('기본가격'))
+    has_price = price_source.notna()
+    price = pd.Series(np.nan, index=price_source.index)
+    if has_price.any():
+        price[has_price] = pd.to_numeric(
+            price_source[has_price].map(str).str.replace(',', '', regex=False).str.strip(),
+            errors='coerce'
+        )
+
+    return pd.DataFrame({
+        '옵션1': _clean_option_column(raw_column('옵션1')),
+        '옵션2': _clean_option_column(raw_column('옵션2')),
+        '옵션3': _clean_option_column(raw_column('옵션3')),
+        'price': price.where(price > 0)
+    })
+
+
+def _normalize_puzzle_size(width, length, pieces):
+    """
+    Normalize 50x50 4pieces to 100x100 1piece, column-wise
+    """
+    is_quarter = (width == 50) & (length == 50) & (pieces == 4)
+    return np.where(is_quarter, 100.0, width), np.where(is_quarter, 100.0, length)
+
+
+def extract_product_attributes_columnar(options, category=None):
+    """
+    Column-wise counterpart of extract_product_attributes_from_csv
+    Matches each pattern slot once per column with .str.extract and applies
+    the same precedence rules through boolean masks, so each row ends up
+    with exactly the attributes the row-by-row parser would produce.
+
+    Args:
+        options: DataFrame from prepare_option_columns (may span many files)
+        category: Product category, either one value or one per row
+
+    Returns:
+        DataFrame with design/thickness/width/length/unit_count/price columns
+        (numeric columns are floats, NaN where the row parser yields None)
+    """
+    n_rows = len(options)
+    option1 = options['옵션1'].reset_index(drop=True)
+    option2 = options['옵션2'].reset_index(drop=True)
+    option3 = options['옵션3'].reset_index(drop=True)
+    is_3stage = option3.notna().to_numpy()
+    is_puzzle_category = np.asarray(category == '퍼즐매트')
+
+    design = np.full(n_rows, None, dtype=object)
+    thickness = np.full(n_rows, np.nan)
+    width = np.full(n_rows, np.nan)
+    length = np.full(n_rows, np.nan)
+    unit_count = np.full(n_rows, np.nan)
+
+    # --- 옵션1: design, width/length ("110cm폭/1M"), puzzle types, thickness ---
+    has_option1 = option1.notna().to_numpy()
+    design[has_option1] = (
+        option1[has_option1]
+        .str.replace(r'[🏅👑]', '', regex=True).str.strip()
+        .str.replace('BEST', '', regex=False).str.strip()
+        .to_numpy(dtype=object)
+    )
+
+    width_in_option1 = _match_numbers(option1, 'option1_width', 'width_cm_pok', category)[:, 0]
+    has_width1 = ~np.isnan(width_in_option1)
+    width = np.where(has_width1, width_in_option1, width)
+
+    length_in_option1 = _match_numbers(option1, 'option1_length', 'length_m_slash', category)[:, 0]
+    has_length1 = ~np.isnan(length_in_option1)
+    length = np.where(has_length1, length_in_option1 * 100, length)
+    design[has_length1 & has_width1] = None
+
+    winner, groups = _match_slot(option1, 'option1', category)
+    puzzle = groups['puzzle_type'].astype(float)
+    is_puzzle = winner == 'puzzle_type'
+    puzzle_width, puzzle_length = _normalize_puzzle_size(puzzle[:, 0], puzzle[:, 1], puzzle[:, 3])
+    width = np.where(is_puzzle, puzzle_width, width)
+    length = np.where(is_puzzle, puzzle_length, length)
+    thickness = np.where(is_puzzle, puzzle[:, 2], thickness)
+
+    pu = groups['puzzle_type_pu'].astype(float)
+    is_pu = winner == 'puzzle_type_pu'
+    pu_width, pu_length = _normalize_puzzle_size(pu[:, 0], pu[:, 1], pu[:, 2])
+    width = np.where(is_pu, pu_width, width)
+    length = np.where(is_pu, pu_length, length)
+    thickness = np.where(is_pu, np.where(is_puzzle_category, 2.5, np.nan), thickness)
+
+    # 파크론 파일: 옵션1에서 두께 추출 ("베이직(1.7cm)" or "러그아이보리 2.2cm")
+    for name in ('thickness_cm_paren', 'thickness_cm'):
+        thickness = np.where(winner == name, groups[name][:, 0].astype(float), thickness)
+
+    # --- 옵션2, 3-stage: thickness/width info ---
+    is_3stage_option2 = option2.notna().to_numpy() & is_3stage
+
+    folder = _match_numbers(option2, 'option2_3stage_size', 'folder_size', category, where=is_3stage_option2)
+    is_folder = ~np.isnan(folder[:, 0])
+    width = np.where(is_folder, folder[:, 0], width)
+    length = np.where(is_folder, folder[:, 1], length)
+    thickness = np.where(is_folder, 0.0, thickness)
+
+    winner, groups = _match_slot(option2, 'option2_3stage', category, where=is_3stage_option2)
+    for name in ('pet_mm_width_paren', 'pet_mm_width_slash'):
+        # Convert mm to cm for thickness - 따사룸, 리포소
+        pet = groups[name].astype(float)
+        thickness = np.where(winner == name, pet[:, 0] / 10, thickness)
+        width = np.where(winner == name, pet[:, 1], width)
+
+    # T notation "0.6cm(6T)" - 딩굴
+    t_notation = groups['t_notation'][:, 0].astype(float)
+    thickness = np.where(winner == 't_notation', t_notation, thickness)
+
+    # T notation reverse "9T(9mm)" or "15T(1.5cm)" - 로하우스
+    t_reverse = groups['t_notation_reverse']
+    t_value = t_reverse[:, 0].astype(float)
+    t_value = np.where(t_reverse[:, 1] == 'mm', t_value / 10, t_value)
+    thickness = np.where(winner == 't_notation_reverse', t_value, thickness)
+
+    for name in ('thickness_width_cm', 'thickness_width_korean'):
+        size = groups[name].astype(float)
+        thickness = np.where(winner == name, size[:, 0], thickness)
+        width = np.where(winner == name, size[:, 1], width)
+
+    # 파크론 파일: 옵션2에서 폭만 추출 (예: "50cm")
+    width = np.where(winner == 'width_cm', groups['width_cm'][:, 0].astype(float), width)
+
+    # --- 옵션2, 2-stage: size info or color/thickness combo ---
+    is_2stage_option2 = option2.notna().to_numpy() & ~is_3stage
+    winner, groups = _match_slot(option2, 'option2_2stage', category, where=is_2stage_option2)
+
+    folder = groups['folder_size'].astype(float)
+    is_folder = winner == 'folder_size'
+    width = np.where(is_folder, folder[:, 0], width)
+    length = np.where(is_folder, folder[:, 1], length)
+    thickness = np.where(is_folder, 0.0, thickness)
+
+    # 퍼즐 "(25mm) 100x100 1장"
+    puzzle = groups['puzzle_mm_pieces'].astype(float)
+    is_puzzle = winner == 'puzzle_mm_pieces'
+    puzzle_width, puzzle_length = _normalize_puzzle_size(puzzle[:, 1], puzzle[:, 2], puzzle[:, 3])
+    thickness = np.where(is_puzzle, puzzle[:, 0] / 10, thickness)
+    width = np.where(is_puzzle, puzzle_width, width)
+    length = np.where(is_puzzle, puzzle_length, length)
+
+    # 퍼즐 "100x100x3cm (1장)" - 티지오매트
+    puzzle = groups['puzzle_cm_pieces'].astype(float)
+    is_puzzle = winner == 'puzzle_cm_pieces'
+    puzzle_width, puzzle_length = _normalize_puzzle_size(puzzle[:, 0], puzzle[:, 1], puzzle[:, 3])
+    width = np.where(is_puzzle, puzzle_width, width)
+    length = np.where(is_puzzle, puzzle_length, length)
+    thickness = np.where(is_puzzle, puzzle[:, 2], thickness)
+
+    # 3D dimensions (length x width x thickness); 리코코 long mats become 50cm units
+    dim_3d = groups['dimension_3d'].astype(float)
+    is_3d = winner == 'dimension_3d'
+    is_long = is_3d & (dim_3d[:, 0] >= 100)
+    length = np.where(is_long, 50.0, np.where(is_3d, dim_3d[:, 0], length))
+    unit_count = np.where(is_long, dim_3d[:, 0] // 50, unit_count)
+    width = np.where(is_3d & np.isnan(width), dim_3d[:, 1], width)
+    thickness = np.where(is_3d & np.isnan(thickness), dim_3d[:, 2], thickness)
+
+    # 2D dimensions like "110x50" (no trailing "cm")
+    dim_2d = groups['dimension_2d'].astype(float)
+    is_2d = winner == 'dimension_2d'
+    width = np.where(is_2d & np.isnan(width), dim_2d[:, 0], width)
+    length = np.where(is_2d, dim_2d[:, 1], length)
+
+    # Color/pattern and thickness, e.g. "베이지스캐터/15mm(리뉴얼)", or just width "110cm"
+    remaining = is_2stage_option2 & pd.isna(winner)
+    thickness_in_option2 = _match_numbers(option2, 'option2_thickness', 'thickness_mm', category, where=remaining)[:, 0]
+    thickness = np.where(np.isnan(thickness_in_option2), thickness, thickness_in_option2 / 10)
+
+    width_only = _match_numbers(option2, 'option2_width', 'width_only', category, where=remaining)[:, 0]
+    is_width_only = ~np.isnan(width_only)
+    width = np.where(is_width_only & np.isnan(width), width_only, width)
+
+    color_info = _match_slot(option2, 'option2_color', category, where=remaining & ~is_width_only)[1]['color'][:, 0]
+    has_color = pd.notna(color_info)
+    if has_color.any():
+        color_info[has_color] = [color.strip() for color in color_info[has_color]]
+        has_design = pd.notna(design) & (design != '')
+        append_color = has_color & has_design
+        design[append_color] = design[append_color] + ' - ' + color_info[append_color]
+        design[has_color & ~has_design] = color_info[has_color & ~has_design]
+
+    # --- 옵션3 (3-stage only): length ---
+    winner, groups = _match_slot(option3, 'option3', category)
+
+    # "(25mm) 100x100 1장" - 따사룸
+    puzzle = groups['puzzle_mm_pieces'].astype(float)
+    is_puzzle = winner == 'puzzle_mm_pieces'
+    puzzle_width, puzzle_length = _normalize_puzzle_size(puzzle[:, 1], puzzle[:, 2], puzzle[:, 3])
+    thickness = np.where(is_puzzle, puzzle[:, 0] / 10, thickness)
+    width = np.where(is_puzzle, puzzle_width, width)
+    length = np.where(is_puzzle, puzzle_length, length)
+
+    # "폭 110cm x 50cm" (딩굴) or "110cm x 50cm" (로하우스)
+    dim = groups['dimension_cm_x_cm'].astype(float)
+    is_dim = winner == 'dimension_cm_x_cm'
+    width = np.where(is_dim & np.isnan(width), dim[:, 0], width)
+    length = np.where(is_dim, dim[:, 1], length)
+
+    # Mixed units like "140cm x 1m" (로하우스)
+    mixed = groups['mixed_cm_x_m'].astype(float)
+    is_mixed = winner == 'mixed_cm_x_m'
+    width = np.where(is_mixed & np.isnan(width), mixed[:, 0], width)
+    length = np.where(is_mixed, mixed[:, 1] * 100, length)
+
+    # "1m50cm", "Xm" or "(길이) Ycm"
+    remaining = is_3stage & ~is_puzzle & ~is_dim & ~is_mixed
+    combined = groups['length_m_cm'].astype(float)
+    is_combined = winner == 'length_m_cm'
+    meters = _match_numbers(option3, 'option3_meters', 'length_m', category, where=remaining & ~is_combined)[:, 0]
+    centimeters = _match_numbers(option3, 'option3_cm', 'length_cm', category, where=remaining & ~is_combined)[:, 0]
+    length_cm = np.where(np.isnan(meters), 0.0, meters * 100)
+    length_cm = np.where((length_cm == 0) & ~np.isnan(centimeters), centimeters, length_cm)
+    length_cm = np.where(is_combined, combined[:, 0] * 100 + combined[:, 1], length_cm)
+    length = np.where(remaining & (length_cm > 0), length_cm, length)
+
+    return pd.DataFrame({
+        'design': design,
+        'thickness': thickness,
+        'width': width,
+        'length': length,
+        'unit_count': unit_count,
+        'price': options['price'].to_numpy(dtype=float)
+    })
+
+
 def extract_product_attributes(text):
     """
     Extract product attributes from unstructured text (fallback for non-CSV files)
@@ -444,6 +610,11 @@ def extract_competitor_name(filename):
     """
     Extract competitor name from filename more intelligently
     """
+    # Known brands and their aliases anywhere in the name (e.g. "티지오 ...")
+    brand = resolve_brand(filename)
+    if brand is not None:
+        return brand
+    
     # Remove file extension
     name = filename
     
@@ -498,27 +669,140 @@ def get_category_from_path(file_path):
     return '롤매트'
 
 
-def process_raw_data(raw_data_path, rules):
+def build_products_columnar(batch):
+    """
+    Build the standardized product rows for a batch of structured CSV rows in
+    whole-column operations (columnar counterpart of the per-row loop in
+    process_raw_data)
+
+    Args:
+        batch: prepare_option_columns output for one or more files, plus
+            per-row Competitor, product_category, rule_method and
+            rule_base_unit_cm columns
+
+    Returns:
+        DataFrame with the same columns and row order the row engine produces
+    """
+    category = batch['product_category'].to_numpy(dtype=object)
+    competitor = batch['Competitor'].to_numpy(dtype=object)
+    attrs = extract_product_attributes_columnar(batch, category=category)
+    width_cm = attrs['width'].to_numpy()
+    thickness = attrs['thickness'].to_numpy()
+    length = attrs['length'].to_numpy()
+    unit_count = attrs['unit_count'].to_numpy()
+    price = attrs['price'].to_numpy()
+
+    # Skip rows where all option columns are empty, or essential
+    # attributes (price, width and either thickness or length) are missing
+    has_option = batch[['옵션1', '옵션2', '옵션3']].notna().any(axis=1).to_numpy()
+    valid = (
+        has_option & ~np.isnan(price) & ~np.isnan(width_cm) &
+        (~np.isnan(thickness) | ~np.isnan(length))
+    )
+
+    thickness_cm = np.where(np.isnan(thickness), 1.5, thickness)  # Default 1.5cm thickness
+
+    # Length based on rules and data availability
+    by_rule = (batch['rule_method'].to_numpy(dtype=object) == 'unit') & ~np.isnan(unit_count)
+    by_units = ~by_rule & ~np.isnan(unit_count) & ~np.isnan(length)
+    by_length = ~by_rule & ~by_units & ~np.isnan(length)
+    # 파크론 sub data: assume 1M (100cm) unit rolls
+    is_parkron = batch['Competitor'].str.contains('파크론', regex=False).to_numpy(dtype=bool)
+    assumed = (
+        ~by_rule & ~by_units & ~by_length & is_parkron &
+        ~np.isnan(width_cm) & ~np.isnan(thickness)
+    )
+    length_cm = np.select(
+        [by_rule, by_units, by_length, assumed],
+        [unit_count * batch['rule_base_unit_cm'].to_numpy(dtype=float), unit_count * length, length, 100.0],
+        default=np.nan
+    )
+    valid &= ~np.isnan(length_cm)
+
+    # Normalize 100cm pet mats to the 50cm standard for price comparison
+    is_pet_100cm = (category == '강아지매트') & (length_cm == 100)
+    length_cm = np.where(is_pet_100cm, 50.0, length_cm)
+    price = np.where(is_pet_100cm, price / 2, price)
+
+    # Derived metrics; 폴더매트는 두께 정보가 없으므로 면적당 가격을 사용
+    area_cm2 = width_cm * length_cm
+    volume_cm3 = thickness_cm * width_cm * length_cm
+    basis = np.where(category == '폴더매트', area_cm2, volume_cm3)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        price_per_volume = np.where(basis > 0, price / basis, np.nan)
+
+    design = attrs['design'].to_numpy(dtype=object)
+    design = np.where(pd.notna(design) & (design != ''), design, 'Unknown')
+
+    return pd.DataFrame({
+        'Competitor': [name.strip() for name in competitor[valid]],
+        'Design': design[valid].tolist(),
+        'Thickness_cm': thickness_cm[valid],
+        'Width_cm': width_cm[valid],
+        'Length_cm': length_cm[valid],
+        'Area_cm2': area_cm2[valid],
+        'Volume_cm3': volume_cm3[valid],
+        'Price': price[valid],
+        'Price_per_Volume': price_per_volume[valid],
+        'product_category': category[valid].tolist()
+    }, index=batch.index[valid])
+
+
+def raw_data_files(raw_data_path):
+    """CSV and Excel files under raw_data_path, in the order they are processed"""
+    raw_path = Path(raw_data_path)
+    return list(raw_path.glob('**/*.xlsx')) + list(raw_path.glob('**/*.xls')) + list(raw_path.glob('**/*.csv'))
+
+
+def process_raw_data(raw_data_path, rules, engine=None, cache=None):
     """
     Process all raw CSV and Excel files and return standardized DataFrame
+
+    Args:
+        raw_data_path: Directory scanned recursively for CSV/Excel files
+        rules: Legacy rules argument (competitor rules are resolved dynamically)
+        engine: 'columnar' or 'row' (defaults to config.PARSE_ENGINE).
+            Both engines return identical frames; 'row' walks df.iterrows()
+            and is kept for comparison.
+        cache: Optional ParseCache. Unchanged files are taken from the cache,
+            only new or modified files are parsed, and entries of deleted
+            files are dropped.
     """
+    try:
+        from .config import PARSE_ENGINE
+    except ImportError:
+        from config import PARSE_ENGINE
+    engine = engine or PARSE_ENGINE
+
     all_data = []
+    batches = []
+    batch_files = {}
+    frames = []
     
     # Get all data files in raw data directory and subdirectories
-    raw_path = Path(raw_data_path)
-    data_files = list(raw_path.glob('**/*.xlsx')) + list(raw_path.glob('**/*.xls')) + list(raw_path.glob('**/*.csv'))
+    data_files = raw_data_files(raw_data_path)
     
-    for file_path in data_files:
+    for file_order, file_path in enumerate(data_files):
         try:
             # Extract competitor from filename
             filename = file_path.stem
-            competitor = extract_competitor_name(filename).strip()  # Ensure no whitespace
             
-            # Force normalize 티지오매트 name
-            if '티지오' in competitor or '티지오' in filename:
-                competitor = '티지오매트'
+            # Unchanged files come straight from the parse cache
+            if cache is not None:
+                cached = cache.get(file_path)
+                if cached is not None:
+                    logger.debug("Cached file: %s -> %d products", filename, len(cached))
+                    counters.incr('parse_files_cached')
+                    if engine == 'columnar':
+                        frames.append(cached.assign(file_order=file_order))
+                    else:
+                        all_data.extend(cached.to_dict('records'))
+                    continue
+                signature = cache.signature(file_path)
+            competitor = extract_competitor_name(filename).strip()  # Ensure no whitespace
             
-            print(f"Processing file: {filename} -> Competitor: {competitor}")
+            logger.debug("Processing file: %s -> Competitor: %s", filename, competitor)
+            counters.incr('parse_files_parsed')
             
             # Get rules for this competitor dynamically
             try:
@@ -533,6 +817,20 @@ def process_raw_data(raw_data_path, rules):
             else:
                 df = pd.read_excel(file_path)
             
+            # Columnar engine: queue structured files, parse them in one batch
+            if engine == 'columnar' and '옵션1' in df.columns and '옵션2' in df.columns:
+                prepared = prepare_option_columns(df)
+                prepared['Competitor'] = competitor
+                prepared['product_category'] = get_category_from_path(str(file_path))
+                prepared['rule_method'] = competitor_rules['method']
+                prepared['rule_base_unit_cm'] = competitor_rules['base_unit_cm']
+                prepared['file_order'] = file_order
+                batches.append(prepared)
+                if cache is not None:
+                    batch_files[file_order] = (file_path, signature)
+                logger.debug("  -> Queued %d rows for columnar parsing", len(df))
+                continue
+            
             # Track initial data count for this file
             initial_data_count = len(all_data)
             
@@ -647,22 +945,62 @@ def process_raw_data(raw_data_path, rules):
             # Count products from this specific file
             file_products = len(all_data) - initial_data_count
             
-            # Count by category for this file
-            file_categories = {}
-            for d in all_data[initial_data_count:]:
-                cat = d.get('product_category', 'Unknown')
-                file_categories[cat] = file_categories.get(cat, 0) + 1
+            if logger.isEnabledFor(logging.DEBUG):
+                # Count by category for this file
+                file_categories = {}
+                for d in all_data[initial_data_count:]:
+                    cat = d.get('product_category', 'Unknown')
+                    file_categories[cat] = file_categories.get(cat, 0) + 1
+                
+                logger.debug("  -> Processed %d rows, found %d valid products", idx + 1, file_products)
+                if file_categories:
+                    logger.debug("     Categories: %s", file_categories)
+            
+            if cache is not None:
+                cache.put(file_path, pd.DataFrame(all_data[initial_data_count:]), signature)
             
-            print(f"  -> Processed {idx + 1} rows, found {file_products} valid products")
-            if file_categories:
-                print(f"     Categories: {file_categories}")
+            # Unstructured files fall back to the row loop; keep file order
+            if engine == 'columnar' and file_products:
+                frame = pd.DataFrame(all_data[initial_data_count:])
+                frame['file_order'] = file_order
+                frames.append(frame)
                 
         except Exception as e:
-            print(f"Error processing {file_path}: {str(e)}")
+            logger.error("Error processing %s: %s", file_path, e)
+            counters.incr('parse_errors')
             continue
     
     # Create DataFrame
-    df_processed = pd.DataFrame(all_data)
+    if engine == 'columnar':
+        if batches:
+            batch = pd.concat(batches, ignore_index=True)
+            products = build_products_columnar(batch)
+            products['file_order'] = batch['file_order'].to_numpy()[products.index]
+            logger.info("Columnar parse: %d rows, found %d valid products", len(batch), len(products))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("     Categories: %s", products['product_category'].value_counts(sort=False).to_dict())
+            frames.append(products)
+            if cache is not None:
+                # Store each file's rows separately so a reload only reparses changed files
+                by_file = dict(tuple(products.groupby('file_order', sort=False)))
+                for order, (file_path, signature) in batch_files.items():
+                    file_products = by_file.get(order, products.iloc[0:0])
+                    cache.put(file_path, file_products.drop(columns='file_order').reset_index(drop=True), signature)
+        frames = [frame for frame in frames if not frame.empty]
+        if frames:
+            df_processed = pd.concat(frames, ignore_index=True)
+            df_processed = df_processed.sort_values('file_order', kind='stable', ignore_index=True)
+            df_processed = df_processed.drop(columns='file_order')
+        else:
+            df_processed = pd.DataFrame()
+    else:
+        df_processed = pd.DataFrame(all_data)
+    
+    if cache is not None:
+        removed = cache.prune(data_files)
+        if removed:
+            logger.info("Parse cache: dropped %d deleted file(s)", len(removed))
+        cache.save()
     
     # Sort by competitor and thickness
     if not df_processed.empty:
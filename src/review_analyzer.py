@@ -4,83 +4,275 @@
 - 경쟁사별 리뷰 통계 생성
 """
 
+import hashlib
+import logging
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from pathlib import Path
 import os
+import threading
 from collections import defaultdict
 
+try:
+    from .brands import resolve_brand
+    from .parse_cache import file_digest
+    from .log import get_logger, counters
+except ImportError:
+    from brands import resolve_brand
+    from parse_cache import file_digest
+    from log import get_logger, counters
+
+logger = get_logger(__name__)
+
+
+REVIEW_CATEGORIES = ['roll', 'puzzle', 'tpu', 'double_side', 'folder', 'pet']
+TREND_COLUMNS = ('작성일', '평점')
+
+
+def _pct_change(values, periods):
+    """pandas pct_change (*100) with inf replaced by 0, on the last axis"""
+    result = np.full(values.shape, np.nan)
+    if values.shape[-1] > periods:
+        previous = values[..., :-periods]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change = (values[..., periods:] / previous - 1) * 100
+        change[np.isinf(change)] = 0
+        result[..., periods:] = change
+    return result
+
+
+class ReviewCountCube:
+    """
+    경쟁사 x 일자 리뷰 수 행렬 (카테고리 단위)
+
+    counts[c, d]는 start + d일에 작성된 리뷰 수이고, prefix는 그 누적합이다.
+    기간별 리뷰 수, 일별 시계열, 차트 구간 합계를 원본 프레임을 다시
+    훑지 않고 배열 슬라이싱으로 계산한다. 작성일은 일 단위로 다룬다.
+    """
+
+    def __init__(self, frames):
+        """
+        Args:
+            frames: 경쟁사 -> 리뷰 프레임 (비어 있는 프레임은 제외된다)
+        """
+        frames = {name: df for name, df in frames.items() if not df.empty}
+        self.competitors = list(frames)
+        self.totals = np.array([len(df) for df in frames.values()], dtype=np.int64)
+        self.avg_ratings = [
+            df['평점'].mean() if '평점' in df.columns and not df['평점'].isna().all() else 0
+            for df in frames.values()
+        ]
+
+        days = [df['작성일'].dt.normalize().to_numpy(dtype='datetime64[D]') for df in frames.values()]
+        if days:
+            first = min(d.min() for d in days)
+            last = max(d.max() for d in days)
+            self.start = pd.Timestamp(first)
+            n_days = int((last - first).astype(np.int64)) + 1
+        else:
+            self.start = pd.Timestamp(datetime.now().date())
+            n_days = 0
+
+        self.counts = np.zeros((len(days), n_days), dtype=np.int32)
+        for i, d in enumerate(days):
+            self.counts[i] = np.bincount((d - np.datetime64(self.start.date(), 'D')).astype(np.int64), minlength=n_days)
+        self.prefix = np.zeros((len(days), n_days + 1), dtype=np.int64)
+        np.cumsum(self.counts, axis=1, out=self.prefix[:, 1:])
+
+    def _day_index(self, timestamp):
+        """Fractional day offset of a timestamp from start"""
+        return (pd.Timestamp(timestamp) - self.start) / pd.Timedelta(days=1)
+
+    def count_since(self, since):
+        """경쟁사별로 since 이후(포함) 작성된 리뷰 수"""
+        index = int(np.clip(np.ceil(self._day_index(since)), 0, self.counts.shape[1]))
+        return self.prefix[:, -1] - self.prefix[:, index]
+
+    def daily(self, dates):
+        """
+        dates의 각 날짜(일 단위)에 작성된 리뷰 수
+
+        Returns:
+            (경쟁사 수, len(dates)) float 배열
+        """
+        index = np.asarray((dates.normalize() - self.start).days, dtype=np.int64)
+        valid = (index >= 0) & (index < self.counts.shape[1])
+        result = np.zeros((len(self.competitors), len(dates)))
+        result[:, valid] = self.counts[:, index[valid]]
+        return result
+
+
+def _review_window(days, start_date, end_date):
+    """분석 기간: (시작, 종료, 기준 시각)"""
+    if start_date and end_date:
+        # 특정 기간 조회
+        start_dt = pd.to_datetime(start_date)
+        end_dt = pd.to_datetime(end_date)
+        current_date = end_dt
+    else:
+        # 기본 기간 조회 (최근 N일)
+        current_date = datetime.now()
+        start_dt = current_date - timedelta(days=days)
+        end_dt = current_date
+    return start_dt, end_dt, current_date
+
 
 class ReviewAnalyzer:
-    def __init__(self, review_data_path):
-        self.review_data_path = Path(review_data_path)
+    """
+    리뷰 데이터 저장소 + 분석기
+
+    프로세스 전체에서 하나의 인스턴스를 유지하고, 파일 변경 시 refresh()로
+    바뀐 CSV만 다시 읽는다. 경쟁사별 프레임은 작성일(datetime64)과
+    평점(Int8)만 보관한다.
+    """
+
+    def __init__(self, review_data_path, column_cache=None):
+        """
+        Args:
+            review_data_path: 리뷰 CSV 루트 (카테고리별 하위 폴더)
+            column_cache: 선택적 ReviewColumnCache; 있으면 CSV 대신
+                컬럼 사이드카에서 작성일/평점만 읽는다
+        """
+        self.review_data_path = Path(os.path.abspath(review_data_path))
+        self.column_cache = column_cache
         self.review_data = {}
+        self.review_cubes = {}
+        # 로드한 CSV 내용의 버전 (모든 워커 프로세스에서 동일)
+        self.version = None
+        self._files = {}
+        self._lock = threading.Lock()
         self.load_review_data()
     
     def load_review_data(self):
-        """리뷰 데이터 로드"""
-        categories = ['roll', 'puzzle', 'tpu', 'double_side', 'folder', 'pet']
-        
-        for category in categories:
-            category_path = self.review_data_path / category
-            if not category_path.exists():
-                continue
+        """리뷰 데이터 로드 (전체)"""
+        with self._lock:
+            self._files = {}
+            csv_files = []
+            for category in REVIEW_CATEGORIES:
+                category_path = self.review_data_path / category
+                if not category_path.exists():
+                    continue
                 
-            self.review_data[category] = {}
+                # 각 카테고리별 CSV 파일 로드
+                for csv_file in category_path.glob('*.csv'):
+                    csv_files.append(csv_file)
+                    self._load_file(category, csv_file)
+            self._rebuild()
             
-            # 각 카테고리별 CSV 파일 로드
-            for csv_file in category_path.glob('*.csv'):
-                try:
-                    df = pd.read_csv(csv_file, encoding='utf-8-sig')
-                    
-                    # 경쟁사 이름 추출 (파일명에서)
-                    competitor_name = self.extract_competitor_name(csv_file.name)
-                    
-                    # 날짜 컬럼 처리
-                    if '작성일' in df.columns:
-                        df['작성일'] = pd.to_datetime(df['작성일'], errors='coerce')
-                        df = df.dropna(subset=['작성일'])
-                        
-                        # 평점 숫자 변환
-                        if '평점' in df.columns:
-                            df['평점'] = pd.to_numeric(df['평점'], errors='coerce')
-                        
-                        print(f"  {competitor_name}: {len(df)} reviews, date range: {df['작성일'].min()} to {df['작성일'].max()}")
-                        
-                        # 디버깅: 현재 날짜와 비교
-                        current_date = datetime.now()
-                        print(f"    Current date: {current_date.date()}, Days from latest: {(current_date - df['작성일'].max()).days}")
-                        
-                        self.review_data[category][competitor_name] = df
-                        
-                except Exception as e:
-                    print(f"Error loading {csv_file}: {str(e)}")
+            # 삭제된 CSV의 사이드카 정리
+            if self.column_cache is not None:
+                self.column_cache.prune(csv_files)
+    
+    def refresh(self, changed_paths=None):
+        """
+        변경된 리뷰 파일만 다시 로드
+        
+        Args:
+            changed_paths: FileWatcher가 전달한 경로 집합 (None이면 전체 로드)
+        """
+        if not changed_paths or str(self.review_data_path) in {str(p) for p in changed_paths}:
+            self.load_review_data()
+            return
+        
+        with self._lock:
+            for changed in changed_paths:
+                csv_file = Path(os.path.abspath(changed))
+                category = csv_file.parent.name
+                if csv_file.suffix != '.csv' or category not in REVIEW_CATEGORIES:
+                    continue
+                if csv_file.parent.parent != self.review_data_path:
+                    continue
+                if csv_file.exists():
+                    self._load_file(category, csv_file)
+                else:
+                    self._files.pop(csv_file, None)
+            self._rebuild()
+    
+    def _load_file(self, category, csv_file):
+        """CSV 하나를 타입이 지정된 프레임으로 로드"""
+        try:
+            if self.column_cache is not None:
+                df, signature = self.column_cache.load_with_signature(csv_file, columns=TREND_COLUMNS)
+            else:
+                # 읽기 전에 서명을 떠서, 읽는 도중 바뀐 파일은 다음 refresh에서 새 버전이 된다
+                signature = {'size': os.path.getsize(csv_file), 'sha1': file_digest(csv_file)}
+                df = pd.read_csv(
+                    csv_file, encoding='utf-8-sig',
+                    usecols=lambda column: column in TREND_COLUMNS
+                )
+            
+            # 경쟁사 이름 추출 (파일명에서)
+            competitor_name = self.extract_competitor_name(csv_file.name)
+            
+            # 날짜 컬럼 처리
+            if '작성일' not in df.columns:
+                self._files.pop(csv_file, None)
+                return
+            
+            dates = pd.to_datetime(df['작성일'], errors='coerce')
+            typed = pd.DataFrame({'작성일': dates.astype('datetime64[ns]')})
+            
+            # 평점 숫자 변환 (1~5, 결측은 <NA>)
+            if '평점' in df.columns:
+                typed['평점'] = pd.to_numeric(df['평점'], errors='coerce').round().astype('Int8')
+            
+            typed = typed.dropna(subset=['작성일']).reset_index(drop=True)
+            self._files[csv_file] = (category, competitor_name, typed, signature)
+            
+            counters.incr('review_files_loaded')
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("  %s: %d reviews, date range: %s to %s",
+                             competitor_name, len(typed), typed['작성일'].min(), typed['작성일'].max())
+        
+        except Exception as e:
+            self._files.pop(csv_file, None)
+            logger.error("Error loading %s: %s", csv_file, e)
+            counters.incr('review_load_errors')
+    
+    def _rebuild(self):
+        """카테고리 -> 경쟁사 -> 프레임 인덱스를 새로 만들어 교체"""
+        review_data = {}
+        for category in REVIEW_CATEGORIES:
+            if (self.review_data_path / category).exists():
+                review_data[category] = {}
+        for category, competitor_name, df, _ in self._files.values():
+            review_data.setdefault(category, {})[competitor_name] = df
+        review_cubes = {category: ReviewCountCube(frames) for category, frames in review_data.items()}
+        version = hashlib.sha1()
+        for csv_file, (_, _, _, signature) in sorted(self._files.items(), key=lambda item: str(item[0])):
+            version.update(f"{csv_file}:{signature['size']}:{signature['sha1']};".encode('utf-8'))
+        # 요청 스레드는 이전/새 인덱스 중 하나만 보게 된다. 버전은 데이터를
+        # 바꾼 뒤에 바꿔서, 새 버전으로 이전 데이터가 캐시되지 않게 한다
+        self.review_cubes = review_cubes
+        self.review_data = review_data
+        self.version = version.hexdigest()[:16]
     
     def extract_competitor_name(self, filename):
         """파일명에서 경쟁사 이름 추출"""
-        # 파일명에서 경쟁사 이름 추출
-        name_mapping = {
-            '따사룸': '따사룸',
-            '파크론': '파크론', 
-            '티지오매트': '티지오매트',
-            '티지오': '티지오매트',
-            '에코폼': '에코폼',
-            '리포소홈': '리포소홈',
-            '리포소': '리포소홈',
-            '리코코': '리코코',
-            '크림하우스': '크림하우스'
-        }
-        
-        filename_lower = filename.lower()
-        for key, value in name_mapping.items():
-            if key in filename:
-                return value
+        # 등록된 브랜드/별칭 (brand_aliases.json)
+        brand = resolve_brand(filename)
+        if brand is not None:
+            return brand
         
         # 첫 번째 단어 사용
         return filename.split()[0] if filename.split() else 'Unknown'
     
     
+    def _daily_series(self, category, days=30, start_date=None, end_date=None):
+        """
+        기간 내 경쟁사별 일별 리뷰 수
+
+        Returns:
+            (cube, 날짜 인덱스, (경쟁사 수, 일수) 배열, 기준 시각) 또는 None
+        """
+        cube = self.review_cubes.get(category)
+        if cube is None or not cube.competitors:
+            return None
+        start_dt, end_dt, current_date = _review_window(days, start_date, end_date)
+        dates = pd.date_range(start=start_dt, end=end_dt, freq='D')
+        return cube, dates, cube.daily(dates), current_date
+    
     def calculate_review_growth_rate(self, category='roll', days=30, start_date=None, end_date=None):
         """리뷰 상승률 계산
         
@@ -90,92 +282,39 @@ class ReviewAnalyzer:
             start_date (str): 시작 날짜 (YYYY-MM-DD 형식)
             end_date (str): 종료 날짜 (YYYY-MM-DD 형식)
         """
-        if category not in self.review_data:
+        series = self._daily_series(category, days, start_date, end_date)
+        if series is None:
             return {}
+        cube, dates, counts, current_date = series
         
-        growth_data = {}
+        # 7일 이동평균 (누적합으로 계산)
+        cumulative = np.concatenate([np.zeros((len(counts), 1)), np.cumsum(counts, axis=1)], axis=1)
+        window = np.minimum(np.arange(1, counts.shape[1] + 1), 7)
+        ma_7d = (cumulative[:, 1:] - cumulative[:, np.arange(counts.shape[1]) + 1 - window]) / window
         
-        # 날짜 범위 설정
-        if start_date and end_date:
-            # 특정 기간 조회
-            start_dt = pd.to_datetime(start_date)
-            end_dt = pd.to_datetime(end_date)
-            current_date = end_dt
-            # 실제 기간 계산
-            actual_days = (end_dt - start_dt).days + 1
-        else:
-            # 기본 기간 조회 (최근 N일)
-            current_date = datetime.now()
-            start_dt = current_date - timedelta(days=days)
-            end_dt = current_date
-            actual_days = days
+        # 성장률 (전날 대비) / 주간 성장률 (7일 전 대비)
+        growth_rate = _pct_change(counts, 1)
+        weekly_growth = _pct_change(counts, 7)
         
-        for competitor, df in self.review_data[category].items():
-            if df.empty:
-                continue
-                
-            # 일별 리뷰 수 계산
-            daily_reviews = df.groupby(df['작성일'].dt.date).size().reset_index()
-            daily_reviews.columns = ['date', 'review_count']
-            daily_reviews['date'] = pd.to_datetime(daily_reviews['date'])
-            
-            # 디버깅: 일별 리뷰 데이터 확인
-            print(f"  {competitor}: Total {len(daily_reviews)} days with reviews")
-            
-            # 설정된 기간으로 날짜 범위 생성
-            date_range = pd.date_range(
-                start=start_dt,
-                end=end_dt,
-                freq='D'
-            )
-            
-            # 전체 날짜 인덱스 생성 (날짜 정규화)
-            full_date_df = pd.DataFrame({'date': date_range})
-            
-            # 디버깅: 병합 전 데이터 확인
-            print(f"    Date range type: {type(date_range[0])}, Daily reviews date type: {type(daily_reviews['date'].iloc[0]) if not daily_reviews.empty else 'No data'}")
-            print(f"    Sample dates - Range: {date_range[0]}, Reviews: {daily_reviews['date'].iloc[0] if not daily_reviews.empty else 'No data'}")
-            
-            # 날짜를 문자열로 변환하여 병합
-            full_date_df['date_str'] = full_date_df['date'].dt.strftime('%Y-%m-%d')
-            daily_reviews['date_str'] = daily_reviews['date'].dt.strftime('%Y-%m-%d')
-            
-            # 병합 및 0으로 채우기
-            merged_df = full_date_df.merge(daily_reviews[['date_str', 'review_count']], on='date_str', how='left')
-            merged_df['date'] = full_date_df['date']  # 원래 날짜 컬럼 유지
-            merged_df['review_count'] = merged_df['review_count'].fillna(0)
-            
-            # 디버깅: 필터링된 데이터 확인
-            if merged_df['review_count'].sum() == 0:
-                print(f"  WARNING: {competitor} has no reviews in the selected period ({actual_days} days)")
-                print(f"    Date range: {date_range[0].date()} to {date_range[-1].date()}")
-                print(f"    Available data: {df['작성일'].min().date()} to {df['작성일'].max().date()}")
-            else:
-                print(f"    {competitor}: Found {merged_df['review_count'].sum():.0f} reviews in {actual_days} days period")
-            
-            # 7일 이동평균 계산
-            merged_df['ma_7d'] = merged_df['review_count'].rolling(window=7, min_periods=1).mean()
-            
-            # 성장률 계산 (전날 대비)
-            merged_df['growth_rate'] = merged_df['review_count'].pct_change() * 100
-            # 무한대 값 처리
-            merged_df['growth_rate'] = merged_df['growth_rate'].replace([np.inf, -np.inf], 0)
-            
-            # 주간 성장률 계산 (7일 전 대비)
-            merged_df['weekly_growth'] = merged_df['review_count'].pct_change(periods=7) * 100
-            # 무한대 값 처리
-            merged_df['weekly_growth'] = merged_df['weekly_growth'].replace([np.inf, -np.inf], 0)
-            
+        # 기간별 리뷰 수는 누적합 차이로 계산
+        recent = {
+            window_days: cube.count_since(current_date - timedelta(days=window_days))
+            for window_days in (7, 14, 30, 90, 180, 365)
+        }
+        
+        growth_data = {}
+        for i, competitor in enumerate(cube.competitors):
             growth_data[competitor] = {
-                'data': merged_df,
-                'total_reviews': len(df),
-                'avg_rating': df['평점'].mean() if '평점' in df.columns and not df['평점'].isna().all() else 0,
-                'recent_7d_reviews': len(df[df['작성일'] >= current_date - timedelta(days=7)]),
-                'recent_14d_reviews': len(df[df['작성일'] >= current_date - timedelta(days=14)]),
-                'recent_30d_reviews': len(df[df['작성일'] >= current_date - timedelta(days=30)]),
-                'recent_90d_reviews': len(df[df['작성일'] >= current_date - timedelta(days=90)]),
-                'recent_180d_reviews': len(df[df['작성일'] >= current_date - timedelta(days=180)]),
-                'recent_365d_reviews': len(df[df['작성일'] >= current_date - timedelta(days=365)])
+                'data': pd.DataFrame({
+                    'date': dates,
+                    'review_count': counts[i],
+                    'ma_7d': ma_7d[i],
+                    'growth_rate': growth_rate[i],
+                    'weekly_growth': weekly_growth[i]
+                }),
+                'total_reviews': int(cube.totals[i]),
+                'avg_rating': cube.avg_ratings[i],
+                **{f'recent_{window_days}d_reviews': int(count[i]) for window_days, count in recent.items()}
             }
         
         return growth_data
@@ -189,9 +328,9 @@ class ReviewAnalyzer:
             df = data['data']
             recent_data = df.tail(7)  # 최근 7일 데이터
             
-            # 무한대 값 처리
-            recent_growth = recent_data['growth_rate'].replace([np.inf, -np.inf], 0).mean()
-            weekly_growth = recent_data['weekly_growth'].replace([np.inf, -np.inf], 0).mean()
+            # 무한대 값은 이미 0으로 처리됨
+            recent_growth = recent_data['growth_rate'].mean()
+            weekly_growth = recent_data['weekly_growth'].mean()
             
             # NaN 값 처리
             avg_rating = data['avg_rating']
@@ -227,15 +366,15 @@ class ReviewAnalyzer:
     
     def get_chart_data(self, category='roll', period_days=30, start_date=None, end_date=None):
         """차트용 데이터 생성 (기간에 따른 그룹화)"""
-        growth_data = self.calculate_review_growth_rate(category, period_days, start_date, end_date)
-        
         chart_data = {
             'labels': [],
             'datasets': []
         }
         
-        if not growth_data:
+        series = self._daily_series(category, period_days, start_date, end_date)
+        if series is None:
             return chart_data
+        cube, dates, counts, _ = series
         
         # 기간에 따른 그룹화 간격 결정
         actual_period = period_days
@@ -254,34 +393,14 @@ class ReviewAnalyzer:
         else:
             group_days = 10  # 10일 단위
         
-        # 첫 번째 경쟁사 데이터 기준으로 그룹화된 날짜 생성
-        first_competitor = list(growth_data.keys())[0]
-        raw_data = growth_data[first_competitor]['data']
-        
-        grouped_data = {}
-        for competitor, data in growth_data.items():
-            df = data['data'].copy()
-            
-            # 그룹화 수행
-            if group_days > 1:
-                # 날짜를 그룹 단위로 그룹화
-                df['group'] = (df.index // group_days) * group_days
-                grouped_df = df.groupby('group').agg({
-                    'date': 'first',
-                    'review_count': 'sum'
-                }).reset_index()
-            else:
-                grouped_df = df[['date', 'review_count']].copy()
-            
-            grouped_data[competitor] = grouped_df
-        
-        # 라벨 생성
-        dates = grouped_data[first_competitor]['date']
+        # 구간 합계: 구간 시작 위치에서 reduceat
+        if group_days > 1 and counts.shape[1] > 0:
+            starts = np.arange(0, counts.shape[1], group_days)
+            counts = np.add.reduceat(counts, starts, axis=1)
+            dates = dates[starts]
         
         # 라벨 형식 결정
-        if actual_period <= 30:
-            chart_data['labels'] = [d.strftime('%m-%d') for d in dates]
-        elif actual_period <= 90:
+        if actual_period <= 90:
             chart_data['labels'] = [d.strftime('%m-%d') for d in dates]
         else:
             chart_data['labels'] = [d.strftime('%m/%d') for d in dates]
@@ -292,12 +411,12 @@ class ReviewAnalyzer:
             '#8b5cf6', '#06b6d4', '#84cc16', '#f97316'
         ]
         
-        for i, (competitor, data) in enumerate(grouped_data.items()):
+        for i, competitor in enumerate(cube.competitors):
             color = colors[i % len(colors)]
             
             chart_data['datasets'].append({
                 'label': competitor,
-                'data': [0 if pd.isna(x) else x for x in data['review_count'].tolist()],
+                'data': counts[i].astype(np.int64).tolist(),
                 'borderColor': color,
                 'backgroundColor': color + '20',
                 'fill': False,
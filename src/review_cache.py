@@ -0,0 +1,271 @@
+"""
+Columnar binary sidecar cache for review CSVs
+
+Each review CSV gets one sidecar file under the cache directory holding its
+columns already typed: 작성일 as datetime64[ns], 평점 as int8 plus a missing
+mask, and text columns as one UTF-8 blob plus offsets. The file starts with a
+JSON header that records the source CSV's size, mtime and hash and where each
+column's arrays live, so a reader can load just the columns it needs. A
+sidecar is rebuilt only when its CSV changes.
+"""
+
+import hashlib
+import json
+import os
+import struct
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .parse_cache import file_digest
+    from .log import get_logger
+except ImportError:
+    from parse_cache import file_digest
+    from log import get_logger
+
+logger = get_logger(__name__)
+
+MAGIC = b'FSREVCOL'
+FORMAT_VERSION = 1
+HEADER_LENGTH = struct.Struct('<Q')
+ALIGNMENT = 8
+
+DATE_COLUMNS = ('작성일',)
+RATING_COLUMNS = ('평점',)
+
+
+def read_review_csv(csv_path):
+    """
+    Read a review CSV with typed columns
+
+    Returns:
+        DataFrame with 작성일 as datetime64[ns], 평점 as nullable Int8 and
+        every other column as object strings (NaN when missing)
+    """
+    df = pd.read_csv(csv_path, encoding='utf-8-sig', dtype=str)
+    typed = {}
+    for column in df.columns:
+        values = df[column]
+        if column in DATE_COLUMNS:
+            typed[column] = pd.to_datetime(values, errors='coerce').astype('datetime64[ns]')
+        elif column in RATING_COLUMNS:
+            typed[column] = pd.to_numeric(values, errors='coerce').round().astype('Int8')
+        else:
+            typed[column] = pd.Series(values.to_numpy(dtype=object, na_value=np.nan), dtype=object)
+    return pd.DataFrame(typed, columns=df.columns)
+
+
+def _encode_column(series):
+    """Column -> (kind, {part name: array})"""
+    if series.name in DATE_COLUMNS:
+        return 'datetime', {'values': series.to_numpy(dtype='datetime64[ns]').view(np.int64)}
+    if series.name in RATING_COLUMNS:
+        mask = series.isna().to_numpy()
+        return 'int8', {
+            'values': series.fillna(0).to_numpy(dtype=np.int8),
+            'mask': mask
+        }
+    mask = series.isna().to_numpy()
+    texts = [value if not missing else '' for value, missing in zip(series.tolist(), mask)]
+    texts = [value if isinstance(value, str) else str(value) for value in texts]
+    offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+    np.cumsum([len(text) for text in texts], out=offsets[1:])
+    blob = np.frombuffer(''.join(texts).encode('utf-8'), dtype=np.uint8)
+    return 'string', {'blob': blob, 'offsets': offsets, 'mask': mask}
+
+
+def _decode_column(kind, parts, rows):
+    """Inverse of _encode_column"""
+    if kind == 'datetime':
+        return pd.Series(parts['values'].view('datetime64[ns]'))
+    if kind == 'int8':
+        return pd.Series(pd.arrays.IntegerArray(parts['values'], parts['mask']))
+    text = parts['blob'].tobytes().decode('utf-8')
+    offsets = parts['offsets']
+    values = np.empty(rows, dtype=object)
+    for i in range(rows):
+        values[i] = text[offsets[i]:offsets[i + 1]]
+    values[parts['mask']] = np.nan
+    return pd.Series(values, dtype=object)
+
+
+class ReviewColumnCache:
+    """Sidecar cache of typed review columns, one file per CSV"""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = Path(cache_dir)
+        self._lock = threading.Lock()
+
+    def sidecar_path(self, csv_path):
+        key = hashlib.sha1(os.path.abspath(csv_path).encode('utf-8')).hexdigest()
+        return self.cache_dir / f"{key}.revcol"
+
+    def load(self, csv_path, columns=None):
+        """
+        Typed review frame of a CSV, read from its sidecar when up to date
+
+        Args:
+            csv_path: Review CSV
+            columns: Columns to load (None = all); columns the CSV does not
+                have are skipped
+
+        Returns:
+            DataFrame (see read_review_csv for the column types)
+        """
+        return self.load_with_signature(csv_path, columns)[0]
+
+    def load_with_signature(self, csv_path, columns=None):
+        """
+        Like load(), also returning the signature of the content read
+
+        Returns:
+            (DataFrame, {'size', 'mtime_ns', 'sha1'}) - pass the signature to
+            load_matching() to read the same content again later
+        """
+        sidecar = self.sidecar_path(csv_path)
+        loaded = self._read_sidecar(sidecar, csv_path, columns)
+        if loaded is not None:
+            return loaded
+
+        stat = os.stat(csv_path)
+        signature = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha1': file_digest(csv_path)}
+        frame = read_review_csv(csv_path)
+        try:
+            self._write_sidecar(sidecar, frame, signature)
+        except OSError as e:
+            logger.warning("Review cache: could not write sidecar for %s: %s", Path(csv_path).name, e)
+        if columns is not None:
+            frame = frame[[column for column in frame.columns if column in columns]]
+        return frame, signature
+
+    def load_matching(self, csv_path, signature, columns=None):
+        """
+        Columns of a CSV as they were when signature was taken
+
+        Only the sidecar is read, so rows line up with an index built from
+        the same signature even if the CSV has changed since.
+
+        Returns:
+            DataFrame, or None if the sidecar no longer holds that content
+        """
+        try:
+            with open(self.sidecar_path(csv_path), 'rb') as f:
+                header = self._read_header(f)
+                if header is None:
+                    return None
+                source = header['source']
+                if source['size'] != signature['size'] or source['sha1'] != signature['sha1']:
+                    return None
+                return self._read_columns(f, header, columns)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _read_header(self, f):
+        if f.read(len(MAGIC)) != MAGIC:
+            return None
+        (length,) = HEADER_LENGTH.unpack(f.read(HEADER_LENGTH.size))
+        header = json.loads(f.read(length).decode('utf-8'))
+        if header.get('version') != FORMAT_VERSION:
+            return None
+        return header
+
+    def _read_columns(self, f, header, columns):
+        rows = header['rows']
+        data = {}
+        for name in header['order']:
+            if columns is not None and name not in columns:
+                continue
+            column = header['columns'][name]
+            parts = {}
+            for part, (offset, dtype, count) in column['parts'].items():
+                f.seek(offset)
+                parts[part] = np.fromfile(f, dtype=np.dtype(dtype), count=count)
+            data[name] = _decode_column(column['kind'], parts, rows)
+        return pd.DataFrame(data, columns=list(data), index=pd.RangeIndex(rows))
+
+    def _read_sidecar(self, sidecar, csv_path, columns):
+        try:
+            with open(sidecar, 'rb') as f:
+                header = self._read_header(f)
+                if header is None:
+                    return None
+
+                source = header['source']
+                stat = os.stat(csv_path)
+                if stat.st_size != source['size']:
+                    return None
+                # Touched but unchanged: all columns are read to rewrite the sidecar
+                touched = stat.st_mtime_ns != source['mtime_ns']
+                if touched and file_digest(csv_path) != source['sha1']:
+                    return None
+                frame = self._read_columns(f, header, None if touched else columns)
+        except (OSError, ValueError, KeyError):
+            return None
+
+        if touched:
+            # Record the new mtime so later loads skip hashing the CSV again
+            source = {**source, 'mtime_ns': stat.st_mtime_ns}
+            try:
+                self._write_sidecar(sidecar, frame, source)
+            except OSError as e:
+                logger.warning("Review cache: could not refresh sidecar for %s: %s", Path(csv_path).name, e)
+            if columns is not None:
+                frame = frame[[column for column in frame.columns if column in columns]]
+        return frame, source
+
+    def _write_sidecar(self, sidecar, frame, signature):
+        encoded = {name: _encode_column(frame[name]) for name in frame.columns}
+
+        # Lay out the arrays after the header, each aligned to 8 bytes
+        def layout(header_size):
+            position = len(MAGIC) + HEADER_LENGTH.size + header_size
+            columns = {}
+            for name, (kind, parts) in encoded.items():
+                placed = {}
+                for part, array in parts.items():
+                    position += -position % ALIGNMENT
+                    placed[part] = [position, array.dtype.str, int(array.size)]
+                    position += array.nbytes
+                columns[name] = {'kind': kind, 'parts': placed}
+            return columns
+
+        header = {'version': FORMAT_VERSION, 'source': signature, 'rows': len(frame),
+                  'order': list(frame.columns), 'columns': layout(0)}
+        # Offsets depend on the header size; iterate until it is stable
+        header_bytes = b''
+        while True:
+            header['columns'] = layout(len(header_bytes))
+            encoded_header = json.dumps(header, ensure_ascii=False).encode('utf-8')
+            if len(encoded_header) == len(header_bytes):
+                break
+            header_bytes = encoded_header
+        header_bytes = encoded_header
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = sidecar.with_name(f"{sidecar.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(HEADER_LENGTH.pack(len(header_bytes)))
+            f.write(header_bytes)
+            for name, (kind, parts) in encoded.items():
+                for part, array in parts.items():
+                    offset = header['columns'][name]['parts'][part][0]
+                    f.write(b'\0' * (offset - f.tell()))
+                    f.write(array.tobytes())
+        os.replace(tmp_path, sidecar)
+
+    def prune(self, csv_paths):
+        """Delete sidecars whose CSV is not in csv_paths"""
+        keep = {self.sidecar_path(path).name for path in csv_paths}
+        with self._lock:
+            if not self.cache_dir.exists():
+                return
+            for sidecar in self.cache_dir.glob('*.revcol'):
+                if sidecar.name not in keep:
+                    try:
+                        sidecar.unlink()
+                    except OSError:
+                        pass
@@ -0,0 +1,243 @@
+"""
+Compact columnar index of individual reviews for /api/reviews
+
+Only the filterable columns (category, competitor, date, rating) of every
+review are kept in memory as flat NumPy arrays. The text columns are read
+from the review sidecar cache one file at a time while results are being
+written, so memory stays bounded no matter how long the history grows.
+"""
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .review_analyzer import REVIEW_CATEGORIES
+    from .brands import resolve_brand
+    from .log import get_logger
+except ImportError:
+    from review_analyzer import REVIEW_CATEGORIES
+    from brands import resolve_brand
+    from log import get_logger
+
+logger = get_logger(__name__)
+
+INDEX_COLUMNS = ('작성일', '평점')
+# Output field -> CSV columns to take it from (first one present wins)
+TEXT_FIELDS = {
+    'title': ('제목',),
+    'content': ('리뷰내용', '내용'),
+    'product': ('구매옵션', '상품명')
+}
+TEXT_COLUMNS = tuple(column for columns in TEXT_FIELDS.values() for column in columns)
+NO_RATING = -1
+
+
+def competitor_from_filename(filename):
+    """Competitor name used by /api/reviews (registered brand, else the first word of the file name)"""
+    brand = resolve_brand(filename)
+    if brand is not None:
+        return brand
+    return filename.split()[0] if filename.split() else 'Unknown'
+
+
+class ReviewStore:
+    """Filterable review index over a category/competitor CSV tree"""
+
+    def __init__(self, review_data_path, column_cache):
+        self.review_data_path = Path(os.path.abspath(review_data_path))
+        self.column_cache = column_cache
+        self.generation = 0
+        self.version = None
+        self._files = {}
+        self._lock = threading.Lock()
+        self._index = self._empty_index()
+        self.load()
+
+    @staticmethod
+    def _empty_index():
+        return {
+            'files': [], 'signatures': [], 'categories': [], 'competitors': [],
+            'file': np.zeros(0, dtype=np.int32), 'row': np.zeros(0, dtype=np.int32),
+            'category': np.zeros(0, dtype=np.int16), 'competitor': np.zeros(0, dtype=np.int16),
+            'date': np.zeros(0, dtype='datetime64[D]'), 'rating': np.zeros(0, dtype=np.int8)
+        }
+
+    def __len__(self):
+        return len(self._index['row'])
+
+    def load(self):
+        """Index every review CSV"""
+        with self._lock:
+            self._files = {}
+            for category in REVIEW_CATEGORIES:
+                category_path = self.review_data_path / category
+                if not category_path.exists():
+                    continue
+                for csv_file in sorted(category_path.glob('*.csv')):
+                    self._load_file(category, csv_file)
+            self._rebuild()
+
+    def refresh(self, changed_paths=None):
+        """Re-index only the CSVs that changed (None = everything)"""
+        if not changed_paths or str(self.review_data_path) in {str(p) for p in changed_paths}:
+            self.load()
+            return
+        with self._lock:
+            for changed in changed_paths:
+                csv_file = Path(os.path.abspath(changed))
+                category = csv_file.parent.name
+                if csv_file.suffix != '.csv' or category not in REVIEW_CATEGORIES:
+                    continue
+                if csv_file.parent.parent != self.review_data_path:
+                    continue
+                if csv_file.exists():
+                    self._load_file(category, csv_file)
+                else:
+                    self._files.pop(csv_file, None)
+            self._rebuild()
+
+    def _load_file(self, category, csv_file):
+        try:
+            df, signature = self.column_cache.load_with_signature(csv_file, columns=INDEX_COLUMNS)
+            rows = len(df)
+            if '작성일' in df.columns:
+                dates = df['작성일'].to_numpy(dtype='datetime64[D]')
+            else:
+                dates = np.full(rows, np.datetime64('NaT'), dtype='datetime64[D]')
+            if '평점' in df.columns:
+                ratings = df['평점'].fillna(NO_RATING).to_numpy(dtype=np.int8)
+            else:
+                ratings = np.zeros(rows, dtype=np.int8)
+            self._files[csv_file] = (category, competitor_from_filename(csv_file.name), dates, ratings, signature)
+        except Exception as e:
+            self._files.pop(csv_file, None)
+            logger.error("Error loading %s: %s", csv_file.name, e)
+
+    def _rebuild(self):
+        """Concatenate the per-file arrays and swap the new index in"""
+        ordered = sorted(
+            self._files.items(),
+            key=lambda item: (REVIEW_CATEGORIES.index(item[1][0]), str(item[0]))
+        )
+        categories = list(dict.fromkeys(entry[0] for _, entry in ordered))
+        competitors = list(dict.fromkeys(entry[1] for _, entry in ordered))
+        sizes = [len(entry[2]) for _, entry in ordered]
+
+        index = self._empty_index()
+        if ordered:
+            index['file'] = np.repeat(np.arange(len(ordered), dtype=np.int32), sizes)
+            index['row'] = np.concatenate([np.arange(size, dtype=np.int32) for size in sizes])
+            index['category'] = np.repeat(
+                np.array([categories.index(entry[0]) for _, entry in ordered], dtype=np.int16), sizes)
+            index['competitor'] = np.repeat(
+                np.array([competitors.index(entry[1]) for _, entry in ordered], dtype=np.int16), sizes)
+            index['date'] = np.concatenate([entry[2] for _, entry in ordered])
+            index['rating'] = np.concatenate([entry[3] for _, entry in ordered])
+        index['files'] = [path for path, _ in ordered]
+        # Content each file's rows were indexed from, to read its texts from
+        index['signatures'] = [entry[4] for _, entry in ordered]
+        index['categories'] = categories
+        index['competitors'] = competitors
+
+        # Content version of the indexed files: equal in every process that
+        # indexed the same CSVs, unlike the generation
+        version = hashlib.sha1()
+        for path, signature in zip(index['files'], index['signatures']):
+            version.update(f"{path}:{signature['size']}:{signature['sha1']};".encode('utf-8'))
+
+        self.generation += 1
+        index['generation'] = self.generation
+        index['version'] = version.hexdigest()[:16]
+        # Single reference assignment: readers see the old or the new index.
+        # The version moves after the index, so a response built from the old
+        # index is never cached under the new version.
+        self._index = index
+        self.version = index['version']
+
+    def query(self, competitors=None, categories=None, start_date=None, end_date=None,
+              ratings=None, min_rating=None, max_rating=None):
+        """
+        Positions of the reviews matching the filters
+
+        Args:
+            competitors, categories: Names to keep (None/empty = all)
+            start_date, end_date: Inclusive date bounds ('YYYY-MM-DD')
+            ratings: Exact ratings to keep
+            min_rating, max_rating: Inclusive rating bounds
+
+        Returns:
+            (index, positions) - keep the index for rows(); positions are in
+            category / file / CSV row order
+
+        Raises:
+            ValueError: On unparsable dates
+        """
+        index = self._index
+        mask = np.ones(len(index['row']), dtype=bool)
+
+        def keep_names(names, key, codes):
+            lookup = {name: code for code, name in enumerate(index[key])}
+            wanted = [lookup[name] for name in names if name in lookup]
+            return np.isin(codes, wanted)
+
+        if competitors:
+            mask &= keep_names(competitors, 'competitors', index['competitor'])
+        if categories:
+            mask &= keep_names(categories, 'categories', index['category'])
+        if start_date:
+            mask &= index['date'] >= np.datetime64(pd.Timestamp(start_date).date(), 'D')
+        if end_date:
+            mask &= index['date'] <= np.datetime64(pd.Timestamp(end_date).date(), 'D')
+        if ratings:
+            mask &= np.isin(index['rating'], [int(r) for r in ratings])
+        if min_rating is not None:
+            mask &= (index['rating'] >= min_rating) & (index['rating'] != NO_RATING)
+        if max_rating is not None:
+            mask &= (index['rating'] <= max_rating) & (index['rating'] != NO_RATING)
+        return index, np.flatnonzero(mask)
+
+    def rows(self, index, positions):
+        """
+        Yield review dicts for positions, loading text columns file by file
+
+        Only one file's text columns are held at a time. Texts come from the
+        content the index was built from; if that is gone (the CSV changed
+        and its sidecar was rebuilt), the file's text fields are left empty.
+        """
+        current_file = None
+        texts = None
+        for position in positions:
+            file_id = index['file'][position]
+            if file_id != current_file:
+                current_file = file_id
+                texts = self._load_texts(index['files'][file_id], index['signatures'][file_id])
+            row = index['row'][position]
+            date = index['date'][position]
+            rating = int(index['rating'][position])
+            review = {
+                'competitor': index['competitors'][index['competitor'][position]],
+                'category': index['categories'][index['category'][position]],
+                'rating': None if rating == NO_RATING else rating,
+                'date': '' if np.isnat(date) else pd.Timestamp(date).strftime('%Y.%m.%d')
+            }
+            for field, values in texts.items():
+                review[field] = values[row] if values is not None and row < len(values) else ''
+            yield review
+
+    def _load_texts(self, csv_file, signature):
+        df = self.column_cache.load_matching(csv_file, signature, columns=TEXT_COLUMNS)
+        if df is None:
+            logger.warning("Review text of %s changed since it was indexed; leaving it out", csv_file.name)
+            df = pd.DataFrame()
+        texts = {}
+        for field, columns in TEXT_FIELDS.items():
+            column = next((c for c in columns if c in df.columns), None)
+            texts[field] = (
+                df[column].fillna('').astype(str).tolist() if column is not None else None
+            )
+        return texts
@@ -0,0 +1,302 @@
+"""
+Product snapshots shared between processes through memory-mapped files
+
+In shared mode one loader process (the worker holding the loader lock)
+parses the product data and writes each generation to a columnar snapshot
+file; every other worker maps that file read-only instead of parsing and
+watching the data itself. A small version stamp file names the current
+snapshot file, so workers notice a new generation with one stat() call.
+
+File layout: MAGIC, header length, JSON header (rows, index and column
+descriptions with their array offsets), then the column arrays, each aligned
+to 8 bytes. Numeric columns are stored raw and mapped zero-copy; text columns
+are dictionary-encoded (sorted distinct values in the header, codes in the
+file) and mapped zero-copy as Categoricals over those codes. The loader's
+frame is grouped by product_category (see ProductSnapshot), so the
+per-category partitions are row slices of the mapping too, and a worker holds
+no private copy of the catalog.
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: no loader election, every process loads
+    fcntl = None
+
+try:
+    from .snapshot import ProductSnapshot
+    from .log import get_logger
+except ImportError:
+    from snapshot import ProductSnapshot
+    from log import get_logger
+
+logger = get_logger(__name__)
+
+MAGIC = b'FSSNAP02'
+HEADER_LENGTH = struct.Struct('<Q')
+ALIGNMENT = 8
+STAMP_NAME = 'current.json'
+LOCK_NAME = 'loader.lock'
+
+
+def _code_dtype(count):
+    """Integer dtype pandas keeps as is for the codes of count categories"""
+    for dtype in (np.int8, np.int16, np.int32):
+        if count < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def _encode_column(series):
+    """Column -> (description, array)"""
+    dtype = series.dtype
+    if dtype.kind in 'biufM' and isinstance(dtype, np.dtype):
+        return {'kind': 'raw', 'dtype': dtype.str}, series.to_numpy()
+    # Sorted values keep sorting on the Categorical the same as on strings
+    try:
+        codes, uniques = pd.factorize(series, sort=True, use_na_sentinel=True)
+        ordered = True
+    except TypeError:  # mixed types that do not compare
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        ordered = False
+    return (
+        {'kind': 'dictionary', 'dtype': str(dtype), 'values': [str(value) for value in uniques],
+         'sorted': ordered},
+        codes.astype(_code_dtype(len(uniques)))
+    )
+
+
+def _decode_column(description, array):
+    if description['kind'] == 'raw':
+        return array
+    if description['sorted']:
+        try:
+            # Categorical over the mapped codes (no copy)
+            categories = pd.Index(description['values'])
+            return pd.Series(pd.Categorical.from_codes(array, categories=categories, validate=False),
+                             copy=False)
+        except ValueError:  # values that collide once converted to str
+            pass
+    values = np.empty(len(description['values']) + 1, dtype=object)
+    values[:-1] = description['values']
+    values[-1] = np.nan
+    # code -1 (missing) picks the trailing NaN
+    decoded = values[array]
+    try:
+        return pd.Series(decoded, dtype=description['dtype'])
+    except (TypeError, ValueError):
+        return pd.Series(decoded, dtype=object)
+
+
+def write_snapshot_file(path, frame):
+    """Write frame to path in the snapshot layout (atomically)"""
+    columns = [('__index__', pd.Series(frame.index.to_numpy()))]
+    columns += [(name, frame[name]) for name in frame.columns]
+    encoded = [(name,) + _encode_column(series) for name, series in columns]
+
+    def layout(header_size):
+        position = len(MAGIC) + HEADER_LENGTH.size + header_size
+        placed = []
+        for name, description, array in encoded:
+            position += -position % ALIGNMENT
+            placed.append(dict(description, name=name, offset=position, count=int(array.size),
+                               array_dtype=array.dtype.str))
+            position += array.nbytes
+        return placed
+
+    header = {'rows': len(frame), 'columns': layout(0)}
+    # Offsets depend on the header size; iterate until it is stable
+    header_bytes = b''
+    while True:
+        header['columns'] = layout(len(header_bytes))
+        encoded_header = json.dumps(header, ensure_ascii=False).encode('utf-8')
+        if len(encoded_header) == len(header_bytes):
+            break
+        header_bytes = encoded_header
+    header_bytes = encoded_header
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(HEADER_LENGTH.pack(len(header_bytes)))
+        f.write(header_bytes)
+        for (_, _, array), placed in zip(encoded, header['columns']):
+            f.write(b'\0' * (placed['offset'] - f.tell()))
+            f.write(np.ascontiguousarray(array).tobytes())
+    os.replace(tmp_path, path)
+
+
+def read_snapshot_file(path):
+    """
+    Map a snapshot file read-only and rebuild the frame
+
+    Numeric columns are views on the mapping; the mapping stays open as long
+    as any of them is referenced.
+
+    Raises:
+        ValueError: If the file is not a snapshot file
+    """
+    with open(path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if buffer[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"Not a snapshot file: {path}")
+    (length,) = HEADER_LENGTH.unpack_from(buffer, len(MAGIC))
+    start = len(MAGIC) + HEADER_LENGTH.size
+    header = json.loads(bytes(buffer[start:start + length]).decode('utf-8'))
+
+    index = None
+    data = {}
+    for column in header['columns']:
+        array = np.frombuffer(buffer, dtype=np.dtype(column['array_dtype']),
+                              count=column['count'], offset=column['offset'])
+        values = _decode_column(column, array)
+        if column['name'] == '__index__':
+            index = pd.Index(values)
+        else:
+            data[column['name']] = values
+    frame = pd.DataFrame(data, columns=list(data), copy=False)
+    if index is not None:
+        frame.index = index
+    return frame
+
+
+class SharedSnapshotWriter:
+    """
+    Loader side: owns the loader lock and publishes snapshot files
+
+    Args:
+        directory: Directory holding the snapshot files and the version stamp
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock_file = None
+
+    def acquire(self):
+        """Try to become the loader process; True if this process is it"""
+        if self._lock_file is not None:
+            return True
+        os.makedirs(self.directory, exist_ok=True)
+        lock_file = open(os.path.join(self.directory, LOCK_NAME), 'a+')
+        if fcntl is not None:
+            # A POSIX record lock, not flock(): forked children (the image
+            # pool) do not inherit it, so it dies with this process
+            try:
+                fcntl.lockf(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB, 0, 0, os.SEEK_SET)
+            except OSError:
+                lock_file.close()
+                return False
+        self._lock_file = lock_file
+        return True
+
+    def last_generation(self):
+        """Generation of the snapshot currently published (0 if none)"""
+        stamp = read_stamp(self.directory)
+        return stamp['generation'] if stamp else 0
+
+    def publish(self, snapshot):
+        """Write a ProductSnapshot's frame and point the version stamp at it"""
+        filename = f"products-{snapshot.generation}.fssnap"
+        write_snapshot_file(os.path.join(self.directory, filename), snapshot.frame)
+
+        stamp = {
+            'generation': snapshot.generation,
+            'file': filename,
+            'loaded_at': (snapshot.loaded_at or datetime.now()).isoformat(),
+            'version': snapshot.version
+        }
+        stamp_path = os.path.join(self.directory, STAMP_NAME)
+        tmp_path = f"{stamp_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(stamp, f)
+        os.replace(tmp_path, stamp_path)
+
+        # Readers that still map an older file keep it alive after unlink
+        for name in os.listdir(self.directory):
+            if name.endswith('.fssnap') and name != filename:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+
+def read_stamp(directory):
+    """Current version stamp dict, or None if nothing was published"""
+    try:
+        with open(os.path.join(directory, STAMP_NAME), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class SharedSnapshotReader:
+    """
+    Worker side: maps the published snapshot and follows new generations
+
+    Args:
+        directory: Directory the loader publishes to
+        check_interval: Minimum seconds between version stamp checks
+    """
+
+    def __init__(self, directory, check_interval=1.0):
+        self.directory = directory
+        self.check_interval = check_interval
+        self._snapshot = None
+        self._stamp_signature = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def current(self):
+        """Snapshot of the published generation, or None if there is none yet"""
+        now = time.monotonic()
+        if self._snapshot is not None and now - self._checked_at < self.check_interval:
+            return self._snapshot
+        with self._lock:
+            self._checked_at = now
+            try:
+                stat = os.stat(os.path.join(self.directory, STAMP_NAME))
+            except OSError:
+                return self._snapshot
+            signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+            if signature == self._stamp_signature:
+                return self._snapshot
+
+            stamp = read_stamp(self.directory)
+            if stamp is None:
+                return self._snapshot
+            if self._snapshot is None or stamp['generation'] != self._snapshot.generation:
+                try:
+                    frame = read_snapshot_file(os.path.join(self.directory, stamp['file']))
+                except (OSError, ValueError) as e:
+                    # Replaced again while we looked; retry on the next check
+                    logger.warning("Shared snapshot: could not map %s: %s", stamp['file'], e)
+                    return self._snapshot
+                self._snapshot = ProductSnapshot(
+                    frame,
+                    generation=stamp['generation'],
+                    loaded_at=datetime.fromisoformat(stamp['loaded_at']),
+                    version=stamp.get('version')
+                )
+                logger.info("Shared snapshot: mapped generation %d (%d products)", stamp['generation'], len(frame))
+            self._stamp_signature = signature
+            return self._snapshot
+
+    def wait(self, timeout):
+        """Wait up to timeout seconds for a first snapshot; returns it or None"""
+        deadline = time.monotonic() + timeout
+        while True:
+            self._checked_at = 0.0
+            snapshot = self.current()
+            if snapshot is not None or time.monotonic() >= deadline:
+                return snapshot
+            time.sleep(0.2)
@@ -0,0 +1,381 @@
+"""
+Versioned, immutable snapshots of the processed product data
+
+A snapshot bundles the product frame with indexes precomputed from it and a
+generation number. The frame's rows are grouped by category when the snapshot
+is built, with product_category and Competitor stored as Categoricals; each
+category's partition is a row slice of the frame (a view, not a copy), so a
+request picks its category slice with a dict lookup and filters competitors
+by integer code instead of comparing strings row by row.
+
+Reloads build a new snapshot off to the side and swap it in with a single
+reference assignment, so request threads always see either the old or the
+new generation, never a half-built frame.
+"""
+
+import base64
+import json
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .heatmap import build_heatmap_cubes
+    from .category_stats import build_category_stats
+    from .dimension_index import build_dimension_index, DEFAULT_TOLERANCE
+except ImportError:
+    from heatmap import build_heatmap_cubes
+    from category_stats import build_category_stats
+    from dimension_index import build_dimension_index, DEFAULT_TOLERANCE
+
+# product_type query values used by the dashboard -> product_category
+PRODUCT_TYPE_CATEGORIES = {
+    'roll': '롤매트',
+    'puzzle': '퍼즐매트',
+    'pet': '강아지매트',
+    'folder': '폴더매트'
+}
+
+# Low-cardinality text columns stored as pandas Categoricals
+CATEGORICAL_COLUMNS = ('product_category', 'Competitor')
+
+
+def with_categoricals(frame):
+    """
+    frame with CATEGORICAL_COLUMNS as Categoricals with sorted categories
+
+    Sorted categories keep sorting and grouping by these columns in the same
+    order as on plain strings. Other columns are shared, not copied.
+    """
+    converted = {}
+    for column in CATEGORICAL_COLUMNS:
+        if column not in frame.columns:
+            continue
+        values = frame[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            categories = values.cat.categories
+            if not categories.is_monotonic_increasing:
+                converted[column] = values.cat.reorder_categories(categories.sort_values())
+        else:
+            converted[column] = values.astype('category')
+    return frame.assign(**converted) if converted else frame
+
+
+def grouped_by_category(frame):
+    """
+    frame with its rows in product_category order (stable), and the row
+    range of each category
+
+    A frame already in that order (a mapped shared snapshot) is returned
+    as is.
+
+    Returns:
+        (frame, {category: (start, end)})
+    """
+    if 'product_category' not in frame.columns or frame.empty:
+        return frame, {}
+    column = frame['product_category']
+    codes = column.array.codes
+    if len(codes) > 1 and (codes[1:] < codes[:-1]).any():
+        frame = frame.iloc[np.argsort(codes, kind='stable')]
+        codes = frame['product_category'].array.codes
+    ranges = {}
+    for code, category in enumerate(column.cat.categories):
+        start, end = np.searchsorted(codes, [code, code + 1])
+        if start < end:
+            ranges[category] = (int(start), int(end))
+    return frame, ranges
+
+
+class ProductSnapshot:
+    """
+    Immutable view of one generation of product data
+
+    The frame and the per-category slices are shared between threads and
+    must be treated as read-only.
+    """
+
+    def __init__(self, frame, generation=0, loaded_at=None, version=None):
+        frame, ranges = grouped_by_category(with_categoricals(frame))
+        self.frame = frame
+        self.generation = generation
+        self.loaded_at = loaded_at
+        # Version of the source files, the same in every process that loads them
+        self.version = version
+        self.empty = frame.empty
+
+        # Row slices share the frame's memory (missing categories are left out)
+        self.by_category = {category: frame.iloc[start:end] for category, (start, end) in ranges.items()}
+        self.categories = list(self.by_category)
+
+        if 'Competitor' in frame.columns:
+            self.competitors = frame['Competitor'].unique().tolist()
+        else:
+            self.competitors = []
+
+        # Heatmap price cubes, one per category
+        self.heatmaps = build_heatmap_cubes(self.by_category)
+
+        # Lazily computed sort orders: (category, column, descending) -> positions
+        self._sort_orders = {}
+        # Lazily built nearest-volume indexes: category -> DimensionIndex
+        self._dimension_indexes = {}
+        # Grouped statistics, built on first use
+        self._stats = None
+        self._stats_lock = threading.Lock()
+
+    def category(self, category):
+        """Rows of one product category (empty frame if unknown)"""
+        part = self.by_category.get(category)
+        return part if part is not None else self.frame.iloc[0:0]
+
+    def _resolve(self, category, product_type):
+        """
+        Category named by the dashboard filters
+
+        Returns:
+            Category name, None for all rows, or False for no rows
+        """
+        wanted = None
+        if category and category != '전체':
+            wanted = category
+
+        type_category = PRODUCT_TYPE_CATEGORIES.get(product_type)
+        if type_category is not None:
+            if wanted is not None and wanted != type_category:
+                return False
+            wanted = type_category
+        return wanted
+
+    def select(self, category=None, product_type=None):
+        """
+        Rows matching the dashboard's category and product_type filters
+
+        Args:
+            category: Product category name ('전체' or None means all)
+            product_type: 'roll', 'puzzle', 'pet' or 'folder'; other values
+                leave the selection unfiltered
+        """
+        if self.empty:
+            return self.frame
+
+        wanted = self._resolve(category, product_type)
+        if wanted is False:
+            return self.frame.iloc[0:0]
+        return self.frame if wanted is None else self.category(wanted)
+
+    def competitor_mask(self, part, competitors):
+        """
+        Boolean mask of the rows of part whose Competitor is in competitors
+
+        Looks the names up once in the categories and compares integer codes.
+        """
+        column = part['Competitor']
+        if not isinstance(column.dtype, pd.CategoricalDtype):
+            return column.isin(list(competitors)).to_numpy()
+        wanted = column.cat.categories.get_indexer(list(competitors))
+        # One slot per category plus a trailing False for missing values (code -1)
+        selected = np.zeros(len(column.cat.categories) + 1, dtype=bool)
+        selected[wanted[wanted >= 0]] = True
+        return selected[column.cat.codes.to_numpy()]
+
+    def heatmap(self, category=None, product_type=None):
+        """Heatmap cube for the dashboard filters, or None if there is no data"""
+        wanted = self._resolve(category, product_type)
+        if not wanted:
+            return None
+        return self.heatmaps.get(wanted)
+
+    def statistics(self):
+        """CategoryStats of the whole frame, computed once per snapshot"""
+        if self._stats is None:
+            with self._stats_lock:
+                if self._stats is None:
+                    self._stats = build_category_stats(self.frame)
+        return self._stats
+
+    def summary(self, category=None, product_type=None):
+        """Headline statistics for the dashboard filters, or None if no rows match"""
+        if self.empty:
+            return None
+        wanted = self._resolve(category, product_type)
+        if wanted is False:
+            return None
+        return self.statistics().summary(wanted)
+
+    def dimension_index(self, category):
+        """Nearest-volume index of a category (None if it has no data), built on first use"""
+        if category not in self._dimension_indexes:
+            self._dimension_indexes[category] = build_dimension_index(self.category(category), category)
+        return self._dimension_indexes[category]
+
+    def dimension_indexes(self):
+        """Nearest-volume indexes of every category"""
+        return {category: self.dimension_index(category) for category in self.categories}
+
+    def match(self, thickness, width, length, category=None, product_type=None,
+              competitors=None, tolerance=DEFAULT_TOLERANCE):
+        """
+        Each competitor's product closest in volume to thickness x width x length
+
+        Args:
+            category, product_type: Same meaning as in select(); no filter
+                searches every category
+            competitors: Competitor names to consider (None = all)
+            tolerance: Maximum relative volume difference of a match
+
+        Returns:
+            List of match dicts, by category then competitor
+        """
+        wanted = self._resolve(category, product_type)
+        if wanted is False:
+            return []
+        categories = self.categories if wanted is None else [wanted]
+        matches = []
+        for name in categories:
+            index = self.dimension_index(name)
+            if index is not None:
+                matches.extend(index.closest(thickness, width, length, tolerance, competitors))
+        return matches
+
+    def _sort_order(self, wanted, part, column, descending):
+        """Stable sort positions of a category slice, memoized per snapshot"""
+        key = (wanted, column, descending)
+        order = self._sort_orders.get(key)
+        if order is None:
+            values = part[column].reset_index(drop=True)
+            order = values.sort_values(
+                ascending=not descending, kind='stable', na_position='last'
+            ).index.to_numpy()
+            self._sort_orders[key] = order
+        return order
+
+    def query(self, category=None, product_type=None, competitors=None,
+              thickness_range=None, width_range=None, sort=None):
+        """
+        Filter and sort the rows served by /api/data
+
+        Args:
+            category, product_type: Same meaning as in select()
+            competitors: Iterable of competitor names to keep (None = all)
+            thickness_range: (min, max) on Thickness_cm, either bound may be None
+            width_range: (min, max) on Width_cm, either bound may be None
+            sort: Column name, prefixed with '-' for descending order
+
+        Returns:
+            DataFrame with the matching rows in the requested order
+
+        Raises:
+            ValueError: If the sort column does not exist
+        """
+        part = self.select(category, product_type)
+        if part.empty:
+            return part
+
+        mask = np.ones(len(part), dtype=bool)
+        if competitors:
+            mask &= self.competitor_mask(part, competitors)
+        for column, bounds in (('Thickness_cm', thickness_range), ('Width_cm', width_range)):
+            if not bounds:
+                continue
+            low, high = bounds
+            values = part[column].to_numpy()
+            if low is not None:
+                mask &= values >= low
+            if high is not None:
+                mask &= values <= high
+
+        if sort:
+            descending = sort.startswith('-')
+            column = sort.lstrip('-')
+            if column not in part.columns:
+                raise ValueError(f"Unknown sort column: {column}")
+            wanted = self._resolve(category, product_type)
+            positions = self._sort_order(wanted, part, column, descending)
+            positions = positions[mask[positions]]
+        else:
+            positions = np.flatnonzero(mask)
+
+        if len(positions) == len(part) and not sort:
+            return part
+        return part.iloc[positions]
+
+
+def encode_cursor(version, offset):
+    """
+    Opaque pagination cursor bound to a data version
+
+    Use a version that is the same in every worker process (a snapshot's
+    version, not its generation), so the next page may land on any worker.
+    """
+    payload = json.dumps({'v': version, 'o': offset}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor from encode_cursor
+
+    Returns:
+        (version, offset)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        version, offset = payload['v'], int(payload['o'])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if offset < 0 or not isinstance(version, (str, type(None))):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return version, offset
+
+
+class SnapshotStore:
+    """Holds the current ProductSnapshot and swaps in new generations"""
+
+    def __init__(self, start_generation=0):
+        self._current = ProductSnapshot(pd.DataFrame(), generation=start_generation)
+        self._reload_lock = threading.Lock()
+
+    def current(self):
+        """The snapshot in effect; keep the reference for the whole request"""
+        return self._current
+
+    def publish(self, frame, loaded_at=None, version=None):
+        """Build a snapshot for frame and make it current"""
+        with self._reload_lock:
+            return self._publish(frame, loaded_at, version)
+
+    def reload(self, loader, version=None):
+        """
+        Build the next generation with loader() and swap it in
+
+        Reloads are serialized; readers are never blocked. If loader raises,
+        the current snapshot stays in place and the exception propagates.
+
+        Args:
+            loader: Returns the product frame
+            version: Callable returning the version of the source files;
+                called before loader so a file changed mid-load yields a
+                new version on the next reload
+        """
+        with self._reload_lock:
+            source_version = version() if version is not None else None
+            frame = loader()
+            return self._publish(frame, None, source_version)
+
+    def _publish(self, frame, loaded_at, version):
+        snapshot = ProductSnapshot(
+            frame,
+            generation=self._current.generation + 1,
+            loaded_at=loaded_at or datetime.now(),
+            version=version
+        )
+        # Single reference assignment: atomic for readers
+        self._current = snapshot
+        return snapshot
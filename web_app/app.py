@@ -2,71 +2,218 @@
 Flask Web Application for FollowScope
 """
 
-from flask import Flask, render_template, jsonify, request, redirect, url_for
-from werkzeug.utils import secure_filename
+from flask import Flask, render_template, jsonify, request, redirect, url_for, Response, stream_with_context, g
 import sys
 import os
+import functools
+import hashlib
+import threading
+import time
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+# pandas/NumPy and the data modules built on them are imported where the
+# datasets are loaded, so the server can bind before they are needed
+from src.brands import resolve_brand
 from src.config import get_competitor_rules
-from src.parser import process_raw_data
-from src.review_analyzer import ReviewAnalyzer
-from PIL import Image
-import io
+from src.feed_store import FeedStore, encode_feed_cursor, decode_feed_cursor
+from src.log import get_logger, counters
 try:
     from .file_watcher import FileWatcher
+    from .image_pipeline import ImagePipeline, ImageCache, PLACEHOLDER_SVG, IMAGE_SIZES, size_filename, sized_variants
+    from .datasets import DatasetRegistry
+    from .metrics import RequestMetrics, SamplingProfiler
+    from .response_cache import ResponseCache
 except ImportError:
     from file_watcher import FileWatcher
-import pandas as pd
+    from image_pipeline import ImagePipeline, ImageCache, PLACEHOLDER_SVG, IMAGE_SIZES, size_filename, sized_variants
+    from datasets import DatasetRegistry
+    from metrics import RequestMetrics, SamplingProfiler
+    from response_cache import ResponseCache
 import json
+import mimetypes
 from datetime import datetime
 
+logger = get_logger(__name__)
+
 # Fix paths for web app
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-PRODUCT_DATA_PATH = os.path.join(PROJECT_ROOT, 'data', 'products')
-REVIEW_DATA_PATH = os.path.join(PROJECT_ROOT, 'data', 'reviews')
-LIVE_DATA_PATH = os.path.join(PROJECT_ROOT, 'data', 'live')
-COUPON_DATA_PATH = os.path.join(PROJECT_ROOT, 'data', 'coupons')
+# Data directory (overridable, e.g. to point the app at benchmark data)
+DATA_ROOT = os.environ.get('FOLLOWSCOPE_DATA_ROOT') or os.path.join(PROJECT_ROOT, 'data')
+PRODUCT_DATA_PATH = os.path.join(DATA_ROOT, 'products')
+REVIEW_DATA_PATH = os.path.join(DATA_ROOT, 'reviews')
+LIVE_DATA_PATH = os.path.join(DATA_ROOT, 'live')
+COUPON_DATA_PATH = os.path.join(DATA_ROOT, 'coupons')
 MACRO_DATA_PATH = os.path.join(PROJECT_ROOT, 'scraping', 'macros')
+PARSE_CACHE_PATH = os.path.join(DATA_ROOT, 'cache', 'parsed')
+REVIEW_CACHE_PATH = os.path.join(DATA_ROOT, 'cache', 'reviews')
+SHARED_SNAPSHOT_PATH = os.path.join(DATA_ROOT, 'cache', 'snapshot')
+FEED_DATA_PATH = os.path.join(DATA_ROOT, 'feeds')
+FEED_DB_PATH = os.path.join(FEED_DATA_PATH, 'feeds.db')
+FEED_IMAGE_PATH = os.path.join(FEED_DATA_PATH, 'images')
 
 app = Flask(__name__)
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 app.config['UPLOAD_EXTENSIONS'] = ['.csv', '.xlsx', '.xls']
 app.config['JSON_AS_ASCII'] = False  # Enable proper Unicode in JSON responses
 
+# Shared product snapshot (for gunicorn with several workers): one loader
+# process parses and watches the product data, the others map its snapshot
+SHARED_SNAPSHOT = os.environ.get('FOLLOWSCOPE_SHARED_SNAPSHOT', '') == '1'
+# Seconds a worker waits for the loader's first snapshot before loading itself
+SHARED_SNAPSHOT_WAIT = 30
+
+# Lazy startup: bind right away and load the datasets in a background
+# warm-up (or on first use) instead of at import time
+LAZY_STARTUP = os.environ.get('FOLLOWSCOPE_LAZY_STARTUP', '') == '1'
+# With lazy startup, FOLLOWSCOPE_WARM_UP=0 loads datasets only on first use
+WARM_UP = os.environ.get('FOLLOWSCOPE_WARM_UP', '1') != '0'
+
+# FOLLOWSCOPE_PROFILE=1 lets ?profile=1 return a sampling profile of that
+# request instead of its response (off by default: it exposes code paths)
+PROFILE_REQUESTS = os.environ.get('FOLLOWSCOPE_PROFILE', '') == '1'
+
+# /api/data and /api/reviews pagination
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# Rows per chunk when streaming /api/reviews
+REVIEW_STREAM_BATCH = 500
+
 # Global variables
-df_processed = None
+product_store = None
 last_update = None
 file_watcher = None
+shared_writer = None
+shared_reader = None
+review_watcher = None
+review_analyzer = None
 live_data = []
-coupon_data = []
-review_data = []
-
-def load_data():
-    """Load and process data"""
-    global df_processed, last_update
+coupon_store = None
+# Versions of the loaded live/coupon files (see files_version)
+live_data_version = None
+coupon_data_version = None
+review_store = None
+parse_cache = None
+review_column_cache = None
+datasets = DatasetRegistry()
+feed_store = FeedStore(FEED_DB_PATH, legacy_json_path=os.path.join(FEED_DATA_PATH, 'feeds.json'))
+image_pipeline = ImagePipeline(FEED_IMAGE_PATH, '/api/feed-image/', max_workers=2)
+image_cache = ImageCache()
+request_metrics = RequestMetrics()
+response_cache = ResponseCache()
+
+def load_data(changed_paths=None, strict=False):
+    """
+    Load and process data
+
+    Args:
+        changed_paths: Paths reported by the file watcher (None = initial/manual load)
+        strict: Re-raise load errors (initial load, so the dataset is marked
+            failed) instead of keeping the current snapshot
+    """
+    global last_update, product_store, parse_cache
+    from src.parser import process_raw_data, raw_data_files
+    from src.brands import aliases_path
+    from src.parse_cache import ParseCache
+    from src.snapshot import SnapshotStore
+    if product_store is None:
+        product_store = SnapshotStore()
+    if parse_cache is None:
+        parse_cache = ParseCache(PARSE_CACHE_PATH)
     try:
-        # Process data without predefined rules (uses dynamic rules)
-        df_processed = process_raw_data(PRODUCT_DATA_PATH, {})
-        last_update = datetime.now()
-        print(f"[{last_update}] Data reloaded: {len(df_processed)} products from {df_processed['Competitor'].nunique()} competitors")
-        return df_processed
+        if changed_paths:
+            logger.info("Reloading after changes in %d file(s)", len(changed_paths))
+        # Process data without predefined rules (uses dynamic rules);
+        # only files changed since the last load are parsed again.
+        # The new snapshot is built off to the side and swapped in atomically.
+        snapshot = product_store.reload(
+            lambda: process_raw_data(PRODUCT_DATA_PATH, {}, cache=parse_cache),
+            version=lambda: files_version(
+                [str(path) for path in raw_data_files(PRODUCT_DATA_PATH)] + [aliases_path()])
+        )
+        last_update = snapshot.loaded_at
+        logger.info("Data reloaded (generation %d): %d products from %d competitors",
+                    snapshot.generation, len(snapshot.frame), len(snapshot.competitors))
+        counters.incr('product_reloads')
+        if shared_writer is not None:
+            shared_writer.publish(snapshot)
+        return snapshot.frame
     except Exception as e:
-        print(f"Error loading data: {e}")
-        if df_processed is None:
-            df_processed = pd.DataFrame()
-        return df_processed
+        logger.error("Error loading data: %s", e)
+        if strict:
+            raise
+        return product_store.current().frame
+
+def get_products():
+    """Current product snapshot, loading data on first use"""
+    datasets.ensure('products')
+    if shared_reader is not None:
+        snapshot = shared_reader.current()
+        if snapshot is not None:
+            return snapshot
+    if product_store is None or product_store.current().loaded_at is None:
+        load_data()
+    return product_store.current()
+
+def init_product_data():
+    """
+    Load the product data and start watching it
+
+    In shared snapshot mode only the process that wins the loader lock does
+    this and publishes every generation; the other workers map its snapshot.
+    """
+    global file_watcher, shared_writer, shared_reader, product_store
+    from src.shared_snapshot import SharedSnapshotWriter, SharedSnapshotReader
+    from src.snapshot import SnapshotStore
+    if SHARED_SNAPSHOT:
+        writer = SharedSnapshotWriter(SHARED_SNAPSHOT_PATH)
+        if not writer.acquire():
+            shared_reader = SharedSnapshotReader(SHARED_SNAPSHOT_PATH)
+            if shared_reader.wait(SHARED_SNAPSHOT_WAIT) is None:
+                logger.warning("Shared snapshot: no snapshot from the loader yet, loading locally")
+                load_data(strict=True)
+            return
+        shared_writer = writer
+        # Continue the published generation numbers across loader restarts
+        product_store = SnapshotStore(start_generation=writer.last_generation())
+        logger.info("Shared snapshot: this process (pid %d) is the loader", os.getpid())
+    
+    load_data(strict=True)
+    file_watcher = FileWatcher(PRODUCT_DATA_PATH, load_data, interval=10, debounce=0.5)
+    file_watcher.start()
+    logger.info("Watching directory: %s", PRODUCT_DATA_PATH)
 
 def update_last_update_time():
     """Update last update time manually"""
     global last_update
     last_update = datetime.now()
-    print(f"[{last_update}] Last update time manually updated")
+    logger.info("Last update time manually updated: %s", last_update)
+
+def files_version(paths):
+    """
+    Version of a set of data files, from their names, sizes and mtimes
 
-def load_live_data():
-    """Load live calendar data using only the latest CSV in LIVE_DATA_PATH."""
+    The same in every worker process that loaded the same files, so ETags
+    built from it stay valid across workers.
+    """
+    signature = hashlib.sha1()
+    for path in sorted(p for p in paths if p):
+        try:
+            stat = os.stat(path)
+            signature.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns};".encode('utf-8'))
+        except OSError:
+            signature.update(f"{path}:missing;".encode('utf-8'))
+    return signature.hexdigest()[:16]
+
+def load_live_data(strict=False):
+    """
+    Load live calendar data using only the latest CSV in LIVE_DATA_PATH.
+
+    Args:
+        strict: Re-raise load errors instead of serving no events
+    """
     import re
-    global live_data
+    import pandas as pd
+    global live_data, live_data_version
     live_data = []
 
     # Load excluded brands from file
@@ -78,7 +225,7 @@ def load_live_data():
                 line = line.strip()
                 if line and not line.startswith('#'):
                     excluded_brands.add(line)
-        print(f"Loaded {len(excluded_brands)} excluded brands")
+        logger.info("Loaded %d excluded brands", len(excluded_brands))
 
     try:
         latest_csv_path = None
@@ -103,53 +250,17 @@ def load_live_data():
                     latest_key = key
                     latest_csv_path = filepath
 
+        live_data_version = files_version([excluded_brands_file, latest_csv_path])
         if latest_csv_path and os.path.exists(latest_csv_path):
-            print(f"Loading live data from: {os.path.basename(latest_csv_path)}")
+            logger.info("Loading live data from: %s", os.path.basename(latest_csv_path))
             df = pd.read_csv(latest_csv_path, encoding='utf-8-sig')
 
             for _, row in df.iterrows():
                 # Extract competitor name from Subject field
                 competitor = str(row.get('Subject', ''))
 
-                # Map competitor names to standard names used in the system
-                competitor_mapping = {
-                    '꿈비스토어': '꿈비',
-                    'CREAMHAUS': '크림하우스',
-                    '크림하우스': '크림하우스',
-                    '젤리맘': '젤리맘',
-                    '파크론몰': '파크론',
-                    '티지오매트': '티지오매트',
-                    '바르맘': '바르맘',
-                    '리포소 홈': '리포소홈',
-                    '따사룸': '따사룸',
-                    '플로리아 FLORIA': '플로리아',
-                    '국민매트 알집매트': '알집매트',
-                    '아소방': '아소방',
-                    '소베맘': '소베맘',
-                    '카라즈': '카라즈',
-                    '아가드': '아가드',
-                    '불로홈': '불로홈',
-                    '아가앤': '아가앤',
-                    '베베핏 Bebefit': '베베핏',
-                    '베베데코': '베베데코',
-                    '히요코베이비': '히요코베이비',
-                    '말랑하니': '말랑하니',
-                    '무무슈': '무무슈',
-                    '라비킷': '라비킷',
-                    '곰표한일전자공식몰': '곰표한일',
-                    '루트비 공식몰': '루트비',
-                    '두리 공식스토어': '두리',
-                    '스위트패밀리': '스위트패밀리',
-                    '핑크퐁 공식스토어': '핑크퐁',
-                    '위드앤스토어': '위드앤',
-                    '네이쳐러브메레': '네이쳐러브메레',
-                    '위틀스토어': '위틀',
-                    '킨초': '킨초',
-                    '언니에반하다': '언니에반하다'
-                }
-
-                # Use mapped name or original if not in mapping
-                competitor = competitor_mapping.get(competitor, competitor)
+                # Canonical brand name, or the original if not registered
+                competitor = resolve_brand(competitor, competitor)
 
                 # Skip excluded brands
                 if competitor in excluded_brands or row.get('Subject', '') in excluded_brands:
@@ -183,206 +294,234 @@ def load_live_data():
 
         live_data = unique_live_events
 
-        print(f"Loaded {len(live_data)} live events")
+        logger.info("Loaded %d live events", len(live_data))
     except Exception as e:
-        print(f"Error loading live data: {e}")
+        logger.error("Error loading live data: %s", e)
         live_data = []
+        if strict:
+            raise
 
 def save_live_data():
     """Deprecated - live data is now loaded directly from CSV files"""
     pass
 
-def load_coupon_data():
-    """Load coupon data from CSV files in subdirectories (roll, puzzle, pet)"""
-    global coupon_data
-    coupon_data = []
-    
+def load_coupon_data(strict=False):
+    """
+    Load the coupon table from the CSV files in subdirectories (roll, puzzle, pet)
+
+    Args:
+        strict: Re-raise load errors instead of serving no coupons
+    """
+    global coupon_store, coupon_data_version
+    from src.coupon_store import CouponStore
     try:
-        # Define product categories
-        categories = ['roll', 'puzzle', 'pet']
-        total_files = 0
-        
-        for category in categories:
-            category_path = os.path.join(COUPON_DATA_PATH, category)
-            if not os.path.exists(category_path):
-                print(f"Category directory not found: {category_path}")
-                continue
-            
-            # Get all CSV files in the category directory
-            csv_files = [f for f in os.listdir(category_path) if f.endswith('.csv')]
-            
-            if not csv_files:
-                print(f"No CSV files found in {category} directory")
-                continue
-            
-            print(f"Found {len(csv_files)} CSV files in {category}: {csv_files}")
-            today = datetime.now().date()
-            
-            # Read each CSV file and merge data
-            for csv_file in csv_files:
-                csv_path = os.path.join(category_path, csv_file)
-                try:
-                    # Read CSV file
-                    df = pd.read_csv(csv_path, encoding='utf-8-sig')
-                    print(f"Processing {category}/{csv_file}: {len(df)} rows")
-                    total_files += 1
-                    
-                    # Process each row
-                    for _, row in df.iterrows():
-                        # Get competitor name and apply mapping
-                        competitor = str(row.get('competitor', ''))
-                        
-                        # Use the same mapping as live data
-                        competitor_mapping = {
-                        '꿈비스토어': '꿈비',
-                        'CREAMHAUS': '크림하우스',
-                        '크림하우스': '크림하우스',
-                        '젤리맘': '젤리맘',
-                        '파크론몰': '파크론',
-                        '티지오매트': '티지오매트',
-                        '바르맘': '바르맘',
-                        '리포소 홈': '리포소홈',  # Fix space issue
-                        '따사룸': '따사룸',
-                        '플로리아 FLORIA': '플로리아',
-                        '국민매트 알집매트': '알집매트',
-                        '아소방': '아소방',
-                        '소베맘': '소베맘',
-                        '카라즈': '카라즈',
-                        '아가드': '아가드',
-                        '불로홈': '불로홈',
-                        '아가앤': '아가앤',
-                        '베베핏 Bebefit': '베베핏',
-                        '베베데코': '베베데코',
-                        '히요코베이비': '히요코베이비',
-                        '말랑하니': '말랑하니',
-                        '무무슈': '무무슈',
-                        '라비킷': '라비킷',
-                        '곰표한일전자공식몰': '곰표한일',
-                        '루트비 공식몰': '루트비',
-                        '두리 공식스토어': '두리',
-                        '스위트패밀리': '스위트패밀리',
-                        '핑크퐁 공식스토어': '핑크퐁',
-                        '위드앤스토어': '위드앤',
-                        '네이쳐러브메레': '네이쳐러브메레',
-                        '위틀스토어': '위틀',
-                        '킨초': '킨초',
-                        '언니에반하다': '언니에반하다'
-                        }
-                        
-                        # Apply mapping
-                        competitor = competitor_mapping.get(competitor, competitor)
-                        
-                        coupon = {
-                        'competitor': competitor,
-                        'type': str(row.get('type', '')) if pd.notna(row.get('type')) else '쿠폰',  # Add type field
-                        'coupon_name': str(row.get('coupon_name', '')),
-                        'discount_rate': str(row.get('discount_rate', '')) if pd.notna(row.get('discount_rate')) else '',
-                        'discount_amount': str(row.get('discount_amount', '')) if pd.notna(row.get('discount_amount')) else '',
-                        'min_purchase': str(row.get('min_purchase', '')) if pd.notna(row.get('min_purchase')) else '',
-                        'max_discount': str(row.get('max_discount', '')) if pd.notna(row.get('max_discount')) else '',
-                        'usage_limit': str(row.get('usage_limit', '')) if pd.notna(row.get('usage_limit')) else '',
-                        'start_date': str(row.get('start_date', '')) if pd.notna(row.get('start_date')) else '',
-                        'end_date': str(row.get('end_date', '')) if pd.notna(row.get('end_date')) else '',
-                        'description': str(row.get('description', '')) if pd.notna(row.get('description')) else '',
-                        'source_file': csv_file  # Track which file this came from
-                        }
-                        
-                        # Calculate status
-                        status = 'active'
-                        if coupon['start_date'] and coupon['end_date']:
-                            try:
-                                start_date = pd.to_datetime(coupon['start_date']).date()
-                                end_date = pd.to_datetime(coupon['end_date']).date()
-                                
-                                if today < start_date:
-                                    status = 'upcoming'
-                                elif today > end_date:
-                                    status = 'expired'
-                                else:
-                                    status = 'active'
-                            except:
-                                pass
-                        
-                        coupon['status'] = status
-                        
-                        # Skip invalid or unwanted entries
-                        if (coupon['coupon_name'].lower() in ['적용 안함', '적용안함', '', '-'] or
-                            not coupon['competitor'] or 
-                            not coupon['coupon_name'] or
-                            (not coupon['discount_rate'] and not coupon['discount_amount'])):
-                            continue
-                        
-                        # Add product category to coupon data
-                        coupon['product_category'] = category
-                        
-                        # Add valid coupon
-                        coupon_data.append(coupon)
-                    
-                except Exception as e:
-                    print(f"Error reading {category}/{csv_file}: {e}")
-                    continue
-        
-        print(f"Total loaded: {len(coupon_data)} coupons from {total_files} files across {len(categories)} categories")
-        
+        store = CouponStore(COUPON_DATA_PATH)
     except Exception as e:
-        print(f"Error loading coupon data: {e}")
-        coupon_data = []
+        logger.error("Error loading coupon data: %s", e)
+        coupon_store = None
+        coupon_data_version = files_version([])
+        if strict:
+            raise
+        return
+    coupon_store = store
+    coupon_data_version = files_version(store.files)
 
 def save_coupon_data():
     """No longer needed - we read directly from CSV"""
     pass
 
-def load_review_data():
-    """Load review data from CSV files"""
-    global review_data
-    review_data = []
-    
+def load_review_data(changed_paths=None, strict=False):
+    """
+    Load the review index served by /api/reviews, or refresh the files that changed
+
+    Args:
+        changed_paths: Paths reported by the review file watcher
+        strict: Re-raise load errors (initial load)
+    """
+    global review_store, review_column_cache
+    from src.review_cache import ReviewColumnCache
+    from src.review_store import ReviewStore
+    if review_column_cache is None:
+        review_column_cache = ReviewColumnCache(REVIEW_CACHE_PATH)
     try:
-        categories = ['roll', 'puzzle', 'tpu', 'double_side', 'folder', 'pet']
-        
-        for category in categories:
-            category_path = os.path.join(REVIEW_DATA_PATH, category)
-            if not os.path.exists(category_path):
-                continue
-            
-            # 각 카테고리별 CSV 파일 로드
-            for csv_file in os.listdir(category_path):
-                if not csv_file.endswith('.csv'):
-                    continue
-                    
-                csv_path = os.path.join(category_path, csv_file)
-                try:
-                    df = pd.read_csv(csv_path, encoding='utf-8-sig')
-                    
-                    # 경쟁사 이름 추출 (파일명에서)
-                    competitor_name = csv_file.split()[0] if csv_file.split() else 'Unknown'
-                    
-                    # 각 리뷰를 review_data 형식으로 변환
-                    for _, row in df.iterrows():
-                        review = {
-                            'competitor': competitor_name,
-                            'category': category,
-                            'rating': row.get('평점', 0),
-                            'date': str(row.get('작성일', '')),
-                            'title': str(row.get('제목', '')),
-                            'content': str(row.get('내용', '')),
-                            'product': str(row.get('상품명', ''))
-                        }
-                        review_data.append(review)
-                        
-                except Exception as e:
-                    print(f"Error loading {csv_file}: {str(e)}")
-        
-        print(f"Loaded {len(review_data)} reviews from CSV files")
-        
+        if review_store is None:
+            review_store = ReviewStore(REVIEW_DATA_PATH, review_column_cache)
+        else:
+            review_store.refresh(changed_paths)
+        logger.info("Loaded %d reviews from CSV files", len(review_store))
     except Exception as e:
-        print(f"Error loading review data: {e}")
-        review_data = []
+        logger.error("Error loading review data: %s", e)
+        if strict:
+            raise
+    return review_store
+
+def load_review_analyzer(changed_paths=None, strict=False):
+    """
+    Load the process-wide review store, or refresh the files that changed
+
+    Args:
+        changed_paths: Paths reported by the review file watcher
+        strict: Re-raise load errors (initial load)
+    """
+    global review_analyzer, review_column_cache
+    from src.review_analyzer import ReviewAnalyzer
+    from src.review_cache import ReviewColumnCache
+    if review_column_cache is None:
+        review_column_cache = ReviewColumnCache(REVIEW_CACHE_PATH)
+    try:
+        if review_analyzer is None:
+            review_analyzer = ReviewAnalyzer(REVIEW_DATA_PATH, column_cache=review_column_cache)
+        else:
+            review_analyzer.refresh(changed_paths)
+        logger.info("Review store ready: %d competitor files",
+                    sum(len(c) for c in review_analyzer.review_data.values()))
+    except Exception as e:
+        logger.error("Error loading review analyzer: %s", e)
+        if strict:
+            raise
+    return review_analyzer
+
+def reload_reviews(changed_paths=None):
+    """Review file watcher callback: refresh the review index and the trend store"""
+    load_review_data(changed_paths)
+    load_review_analyzer(changed_paths)
+
+def init_review_data():
+    """Load the review index and trend store and start watching the review files"""
+    global review_watcher
+    load_review_data(strict=True)
+    load_review_analyzer(strict=True)
+    review_watcher = FileWatcher(REVIEW_DATA_PATH, reload_reviews, interval=10, debounce=0.5)
+    review_watcher.start()
+    logger.info("Watching directory: %s", REVIEW_DATA_PATH)
 
 def save_review_data():
     """Deprecated - review data is now loaded directly from CSV files"""
     pass
 
+@app.before_request
+def start_request_timing():
+    """Start timing (and, if asked for and allowed, profiling) the request"""
+    g.request_started = time.perf_counter()
+    request_metrics.request_started()
+    if PROFILE_REQUESTS and request.args.get('profile') == '1':
+        g.profiler = SamplingProfiler(threading.get_ident())
+        g.profiler.start()
+
+@app.after_request
+def record_request_metrics(response):
+    """
+    Record latency and size per route
+
+    Streamed bodies (/api/reviews) are timed up to the first byte and
+    their size is not recorded.
+    """
+    started = g.pop('request_started', None)
+    if started is None:
+        return response
+    route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    size = None if response.is_streamed else response.calculate_content_length()
+    request_metrics.observe(request.method, route, response.status_code,
+                            time.perf_counter() - started, size)
+
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.stop()
+        return Response(profiler.report(), mimetype='text/plain',
+                        headers={'X-Profiled-Status': str(response.status_code)})
+    return response
+
+def current_generations():
+    """Generations of the product snapshot and review index, without loading them"""
+    generations = {'products': 0, 'reviews': 0}
+    snapshot = shared_reader.current() if shared_reader is not None else None
+    if snapshot is None and product_store is not None:
+        snapshot = product_store.current()
+    if snapshot is not None:
+        generations['products'] = snapshot.generation
+    if review_store is not None:
+        generations['reviews'] = review_store.generation
+    return generations
+
+def products_version():
+    # Version of the parsed files, shared by every worker (the generation is per process)
+    return get_products().version
+
+def reviews_version():
+    datasets.ensure('reviews')
+    return review_store.version if review_store is not None else None
+
+def review_trends_version():
+    # Trends come from the analyzer, which is refreshed after the review index;
+    # its own version keeps them apart. Trend windows end today.
+    datasets.ensure('reviews')
+    version = review_analyzer.version if review_analyzer is not None else None
+    return f"{version}-{datetime.now().date()}"
+
+def live_version():
+    datasets.ensure('live')
+    return live_data_version
+
+def coupons_version():
+    datasets.ensure('coupons')
+    # Coupon statuses change at midnight
+    return f"{coupon_data_version}-{datetime.now().date()}"
+
+def cached_json_response(entry):
+    """Response for a cached body, in the best encoding the client accepts"""
+    encoding = entry.encoding_for(request.accept_encodings)
+    response = Response(entry.encodings[encoding], mimetype=entry.mimetype)
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.set_etag(entry.etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def cached_json(version):
+    """
+    Reuse a JSON view's serialized, compressed body while its data is unchanged
+
+    Args:
+        version: Callable returning the version of the data the view reads
+            (it may load the dataset first)
+
+    The ETag combines route, version and query parameters, so If-None-Match
+    is answered with 304 without running the view. Error responses are not
+    cached; streamed responses only get the ETag.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if 'profiler' in g:
+                return view(*args, **kwargs)
+            current = version()
+            etag = response_cache.etag(request.path, current, request.args)
+            if request.if_none_match.contains_weak(etag):
+                counters.incr('response_cache_not_modified')
+                response = Response(status=304)
+                response.set_etag(etag)
+                response.headers['Cache-Control'] = 'no-cache'
+                return response
+
+            entry = response_cache.get(etag)
+            if entry is not None:
+                counters.incr('response_cache_hits')
+                return cached_json_response(entry)
+
+            counters.incr('response_cache_misses')
+            response = app.make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            if response.is_streamed:
+                response.set_etag(etag)
+                response.headers['Cache-Control'] = 'no-cache'
+                return response
+            entry = response_cache.put(request.path, current, etag, response.get_data(), response.mimetype)
+            return cached_json_response(entry)
+        return wrapper
+    return decorator
+
 @app.route('/')
 def index():
     """Single main page: Dashboard (Heatmap)"""
@@ -398,122 +537,155 @@ def feed_page():
     """Single page app: redirect feed to main page"""
     return redirect('/')
 
+def parse_float_arg(name):
+    """Optional float query parameter; raises ValueError on bad input"""
+    value = request.args.get(name)
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"Invalid {name}: {value}")
+
+def parse_list_arg(name):
+    """Query parameter given repeatedly and/or comma-separated"""
+    values = []
+    for value in request.args.getlist(name):
+        values.extend(v.strip() for v in value.split(',') if v.strip())
+    return values
+
 @app.route('/api/data')
+@cached_json(products_version)
 def get_data():
-    """API endpoint to get processed data"""
-    if df_processed is None:
-        load_data()
+    """
+    API endpoint to get processed data
+
+    Query params:
+        category, product_type: Category filters
+        competitor: Competitor names (repeated or comma-separated)
+        thickness_min, thickness_max, width_min, width_max: Ranges in cm
+        sort: Column name, '-' prefix for descending
+        fields: Comma-separated columns to return
+        page, page_size or cursor: Paginate; the response becomes
+            {items, total, page_size, next_cursor, generation}.
+            Without them every matching row is returned as a list.
+    """
+    from src.snapshot import encode_cursor, decode_cursor
+    snapshot = get_products()
     
     # Get filters from query params
     category = request.args.get('category', None)
     product_type = request.args.get('product_type', None)
+    fields = parse_list_arg('fields')
     
-    # Import analysis functions
-    from src.analysis import filter_by_category
+    try:
+        df_filtered = snapshot.query(
+            category, product_type,
+            competitors=parse_list_arg('competitor'),
+            thickness_range=(parse_float_arg('thickness_min'), parse_float_arg('thickness_max')),
+            width_range=(parse_float_arg('width_min'), parse_float_arg('width_max')),
+            sort=request.args.get('sort')
+        )
+        unknown = [field for field in fields if field not in df_filtered.columns]
+        if unknown and not df_filtered.empty:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if fields and not df_filtered.empty:
+        df_filtered = df_filtered[fields]
     
-    # Filter by category if specified
-    df_filtered = filter_by_category(df_processed, category) if category else df_processed
+    paginate = any(name in request.args for name in ('page', 'page_size', 'cursor'))
+    if not paginate:
+        # Unpaginated: every matching row
+        return jsonify(df_filtered.to_dict('records'))
     
-    # Filter by product type (roll/puzzle/pet/folder)
-    if product_type and not df_filtered.empty:
-        if product_type == 'roll':
-            df_filtered = df_filtered[df_filtered['product_category'].str.contains('롤매트', na=False)]
-        elif product_type == 'puzzle':
-            df_filtered = df_filtered[df_filtered['product_category'].str.contains('퍼즐매트', na=False)]
-        elif product_type == 'pet':
-            df_filtered = df_filtered[df_filtered['product_category'].str.contains('강아지매트', na=False)]
-        elif product_type == 'folder':
-            df_filtered = df_filtered[df_filtered['product_category'].str.contains('폴더매트', na=False)]
+    try:
+        page_size = int(request.args.get('page_size', DEFAULT_PAGE_SIZE))
+        if not 1 <= page_size <= MAX_PAGE_SIZE:
+            raise ValueError(f"page_size must be between 1 and {MAX_PAGE_SIZE}")
+        cursor = request.args.get('cursor')
+        if cursor:
+            version, offset = decode_cursor(cursor)
+            if version != snapshot.version:
+                return jsonify({'error': 'Cursor expired: data was reloaded, restart from the first page'}), 409
+        else:
+            page = int(request.args.get('page', 1))
+            if page < 1:
+                raise ValueError("page must be >= 1")
+            offset = (page - 1) * page_size
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    # Always return all data without pagination
-    data = df_filtered.to_dict('records')
-    return jsonify(data)
+    total = len(df_filtered)
+    end = offset + page_size
+    page_rows = df_filtered.iloc[offset:end]
+    return jsonify({
+        'items': page_rows.to_dict('records'),
+        'total': total,
+        'page_size': page_size,
+        'next_cursor': encode_cursor(snapshot.version, end) if end < total else None,
+        'generation': snapshot.generation
+    })
 
 
 @app.route('/api/competitors')
+@cached_json(products_version)
 def get_competitors():
     """Get unique competitors"""
-    if df_processed is None:
-        load_data()
-    
-    competitors = df_processed['Competitor'].unique().tolist()
-    return jsonify(competitors)
+    snapshot = get_products()
+    return jsonify(snapshot.competitors)
 
 @app.route('/api/statistics')
+@cached_json(lambda: f"{products_version()}-{last_update}")
 def get_statistics():
     """Get data statistics"""
-    if df_processed is None or df_processed.empty:
+    snapshot = get_products()
+    if snapshot.empty and shared_reader is None:
         load_data()
+        snapshot = product_store.current()
+    updated = last_update or snapshot.loaded_at
     
     # Get filters from query params
     category = request.args.get('category', None)
     product_type = request.args.get('product_type', None)
     
-    # Import analysis functions
-    from src.analysis import filter_by_category, get_available_categories
-    
-    # Filter by category if specified
-    df_filtered = filter_by_category(df_processed, category) if category else df_processed
-    
-    # Filter by product type (roll/puzzle/pet/folder)
-    if product_type and not df_filtered.empty:
-        if product_type == 'roll':
-            df_filtered = df_filtered[df_filtered['product_category'].str.contains('롤매트', na=False)]
-        elif product_type == 'puzzle':
-            df_filtered = df_filtered[df_filtered['product_category'].str.contains('퍼즐매트', na=False)]
-        elif product_type == 'pet':
-            df_filtered = df_filtered[df_filtered['product_category'].str.contains('강아지매트', na=False)]
-        elif product_type == 'folder':
-            df_filtered = df_filtered[df_filtered['product_category'].str.contains('폴더매트', na=False)]
+    # Precomputed per-category statistics, filtered by product type (roll/puzzle/pet/folder)
+    summary = snapshot.summary(category, product_type)
     
-    if df_filtered.empty:
+    if summary is None:
         return jsonify({
             'total_products': 0,
             'competitors': 0,
             'avg_price_per_volume': 0,
             'price_range': {'min': 0, 'max': 0},
             'thickness_range': {'min': 0, 'max': 0},
-            'last_update': last_update.strftime('%Y-%m-%d %H:%M:%S') if last_update else 'Never',
-            'categories': get_available_categories(df_processed) if df_processed is not None else []
+            'last_update': updated.strftime('%Y-%m-%d %H:%M:%S') if updated else 'Never',
+            'categories': snapshot.categories
         })
     
-    stats = {
-        'total_products': len(df_filtered),
-        'competitors': df_filtered['Competitor'].nunique(),
-        'avg_price_per_volume': df_filtered['Price_per_Volume'].mean(),
-        'price_range': {
-            'min': df_filtered['Price'].min(),
-            'max': df_filtered['Price'].max()
-        },
-        'thickness_range': {
-            'min': df_filtered['Thickness_cm'].min(),
-            'max': df_filtered['Thickness_cm'].max()
-        },
-        'last_update': last_update.strftime('%Y-%m-%d %H:%M:%S') if last_update else 'Never',
-        'categories': get_available_categories(df_processed)
-    }
+    stats = dict(
+        summary,
+        last_update=updated.strftime('%Y-%m-%d %H:%M:%S') if updated else 'Never',
+        categories=snapshot.categories
+    )
     return jsonify(stats)
 
 @app.route('/api/competitor/<name>')
+@cached_json(products_version)
 def get_competitor_data(name):
     """Get data for specific competitor"""
-    if df_processed is None:
-        load_data()
+    snapshot = get_products()
     
     # Get category filter from query params
     category = request.args.get('category', None)
     
-    # Import analysis functions
-    from src.analysis import filter_by_category
-    
-    # Filter by category first if specified
-    df_filtered = filter_by_category(df_processed, category) if category else df_processed
-    
-    # Then filter by competitor
-    competitor_data = df_filtered[df_filtered['Competitor'] == name]
+    # Category partition, then the competitor by category code
+    competitor_data = snapshot.query(category, competitors=[name])
     return jsonify(competitor_data.to_dict('records'))
 
 @app.route('/api/price-comparison')
+@cached_json(products_version)
 def price_comparison():
     """Get price comparison data by thickness range"""
     thickness_min = float(request.args.get('thickness_min', 0))
@@ -521,73 +693,227 @@ def price_comparison():
     category = request.args.get('category', None)
     product_type = request.args.get('product_type', None)
     
-    if df_processed is None:
-        load_data()
-    
-    # Import analysis functions
-    from src.analysis import filter_by_category
-    
-    # Filter by category first if specified
-    df_filtered = filter_by_category(df_processed, category) if category else df_processed
+    snapshot = get_products()
     
-    # Filter by product type (roll/puzzle/pet/folder)
-    if product_type and not df_filtered.empty:
-        if product_type == 'roll':
-            df_filtered = df_filtered[df_filtered['product_category'].str.contains('롤매트', na=False)]
-        elif product_type == 'puzzle':
-            df_filtered = df_filtered[df_filtered['product_category'].str.contains('퍼즐매트', na=False)]
-        elif product_type == 'pet':
-            df_filtered = df_filtered[df_filtered['product_category'].str.contains('강아지매트', na=False)]
-        elif product_type == 'folder':
-            df_filtered = df_filtered[df_filtered['product_category'].str.contains('폴더매트', na=False)]
-    
-    # Then filter by thickness
-    filtered = df_filtered[
-        (df_filtered['Thickness_cm'] >= thickness_min) & 
-        (df_filtered['Thickness_cm'] <= thickness_max)
-    ]
+    # Category partition (roll/puzzle/pet/folder), then the thickness range
+    filtered = snapshot.query(category, product_type, thickness_range=(thickness_min, thickness_max))
     
     # Group by competitor and calculate average price per volume
-    comparison = filtered.groupby('Competitor')['Price_per_Volume'].mean().to_dict()
+    comparison = filtered.groupby('Competitor', observed=True)['Price_per_Volume'].mean().to_dict()
     
     return jsonify(comparison)
 
+@app.route('/api/match')
+@cached_json(products_version)
+def match_dimensions():
+    """
+    Each competitor's product closest in volume to a target size
+
+    Query params:
+        thickness, width, length: Target size in cm (required)
+        category, product_type: Limit to one category (default: every category)
+        competitor: Competitors to include (repeated or comma-separated)
+        tolerance: Maximum relative volume difference (default 0.2)
+    """
+    snapshot = get_products()
+    try:
+        size = {}
+        for name in ('thickness', 'width', 'length'):
+            value = parse_float_arg(name)
+            if value is None or not value > 0:
+                raise ValueError(f"{name} must be a positive number (cm)")
+            size[name] = value
+        tolerance = parse_float_arg('tolerance')
+        if tolerance is not None and not 0 <= tolerance <= 1:
+            raise ValueError("tolerance must be between 0 and 1")
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    options = {'tolerance': tolerance} if tolerance is not None else {}
+    matches = snapshot.match(
+        size['thickness'], size['width'], size['length'],
+        category=request.args.get('category'),
+        product_type=request.args.get('product_type'),
+        competitors=parse_list_arg('competitor'),
+        **options
+    )
+    return jsonify({
+        'target': dict(size, volume=size['thickness'] * size['width'] * size['length']),
+        'matches': matches,
+        'generation': snapshot.generation
+    })
+
+@app.route('/api/heatmap')
+@cached_json(products_version)
+def get_heatmap():
+    """
+    Heatmap matrix from the snapshot's precomputed price cube
+
+    Query params:
+        product_type: roll/puzzle/pet/folder (default roll) or category
+        competitor: Competitors to include (repeated or comma-separated; default all)
+        details: '0' to omit the per-product tooltip lists
+    """
+    snapshot = get_products()
+    category = request.args.get('category', None)
+    product_type = request.args.get('product_type', None)
+    if not category and not product_type:
+        product_type = 'roll'
+    
+    cube = snapshot.heatmap(category, product_type)
+    if cube is None:
+        return jsonify({'category': category, 'competitors': [], 'thicknesses': [], 'widths': [],
+                        'avg_range': None, 'cells': [], 'generation': snapshot.generation})
+    
+    competitors = parse_list_arg('competitor') if 'competitor' in request.args else None
+    result = cube.query(competitors, details=request.args.get('details', '1') != '0')
+    result['generation'] = snapshot.generation
+    return jsonify(result)
+
 ## Removed data center and file upload endpoints
 
 @app.route('/api/promotions', methods=['GET'])
+@cached_json(live_version)
 def get_promotions():
     """Get live calendar data (keeping endpoint name for compatibility)"""
+    datasets.ensure('live')
     return jsonify(live_data)
 
 ## Removed live data upload endpoint
 
 @app.route('/api/categories', methods=['GET'])
+@cached_json(products_version)
 def get_categories():
     """Get available product categories"""
-    if df_processed is None:
-        load_data()
-    
-    from src.analysis import get_available_categories
-    categories = get_available_categories(df_processed) if df_processed is not None else []
+    snapshot = get_products()
     
     # Add '전체' option at the beginning
-    return jsonify(['전체'] + categories)
+    return jsonify(['전체'] + snapshot.categories)
 
 @app.route('/api/coupons', methods=['GET'])
+@cached_json(coupons_version)
 def get_coupons():
-    """Get coupon data"""
-    return jsonify(coupon_data)
+    """
+    Get coupon data, each with its status as of today
+
+    Query params:
+        competitor: Competitor names (repeated or comma-separated)
+        category: Coupon categories: roll, puzzle, pet
+        status: active, upcoming, expired
+    """
+    datasets.ensure('coupons')
+    store = coupon_store
+    if store is None:
+        return jsonify([])
+    try:
+        coupons = store.query(
+            competitors=parse_list_arg('competitor'),
+            categories=parse_list_arg('category'),
+            statuses=parse_list_arg('status')
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(coupons)
 
 ## Removed coupon upload endpoint
 
+def stream_json_array(rows):
+    """Chunks of a JSON array of rows, written REVIEW_STREAM_BATCH rows at a time"""
+    yield '['
+    batch = []
+    first = True
+    for row in rows:
+        batch.append(json.dumps(row, ensure_ascii=False))
+        if len(batch) >= REVIEW_STREAM_BATCH:
+            yield ('' if first else ',') + ','.join(batch)
+            first = False
+            batch = []
+    if batch:
+        yield ('' if first else ',') + ','.join(batch)
+    yield ']'
+
+def stream_ndjson(rows):
+    """Chunks of newline-delimited JSON, REVIEW_STREAM_BATCH rows at a time"""
+    batch = []
+    for row in rows:
+        batch.append(json.dumps(row, ensure_ascii=False))
+        if len(batch) >= REVIEW_STREAM_BATCH:
+            yield '\n'.join(batch) + '\n'
+            batch = []
+    if batch:
+        yield '\n'.join(batch) + '\n'
+
 @app.route('/api/reviews', methods=['GET'])
+@cached_json(reviews_version)
 def get_reviews():
-    """Get review data"""
-    return jsonify(review_data)
+    """
+    Get review data
+
+    Query params:
+        competitor, category: Names (repeated or comma-separated)
+        start_date, end_date: Inclusive date range (YYYY-MM-DD)
+        rating: Exact ratings (repeated or comma-separated)
+        min_rating, max_rating: Inclusive rating range
+        page_size or cursor: Paginate; the response becomes
+            {items, total, page_size, next_cursor, generation}
+        format=ndjson: Stream every matching review as one JSON object per line
+    Without pagination the matching reviews are streamed as a JSON list.
+    """
+    from src.snapshot import encode_cursor, decode_cursor
+    datasets.ensure('reviews')
+    store = review_store
+    if store is None:
+        return jsonify({'error': 'Review data unavailable'}), 503
+    
+    try:
+        index, positions = store.query(
+            competitors=parse_list_arg('competitor'),
+            categories=parse_list_arg('category'),
+            start_date=request.args.get('start_date'),
+            end_date=request.args.get('end_date'),
+            ratings=parse_list_arg('rating'),
+            min_rating=parse_float_arg('min_rating'),
+            max_rating=parse_float_arg('max_rating')
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if request.args.get('format') == 'ndjson':
+        return Response(stream_with_context(stream_ndjson(store.rows(index, positions))),
+                        mimetype='application/x-ndjson')
+    
+    paginate = any(name in request.args for name in ('page_size', 'cursor'))
+    if not paginate:
+        return Response(stream_with_context(stream_json_array(store.rows(index, positions))),
+                        mimetype='application/json')
+    
+    try:
+        page_size = int(request.args.get('page_size', DEFAULT_PAGE_SIZE))
+        if not 1 <= page_size <= MAX_PAGE_SIZE:
+            raise ValueError(f"page_size must be between 1 and {MAX_PAGE_SIZE}")
+        offset = 0
+        cursor = request.args.get('cursor')
+        if cursor:
+            version, offset = decode_cursor(cursor)
+            if version != index['version']:
+                return jsonify({'error': 'Cursor expired: data was reloaded, restart from the first page'}), 409
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    total = len(positions)
+    end = offset + page_size
+    return jsonify({
+        'items': list(store.rows(index, positions[offset:end])),
+        'total': total,
+        'page_size': page_size,
+        'next_cursor': encode_cursor(index['version'], end) if end < total else None,
+        'generation': index['generation']
+    })
 
 ## Removed review upload endpoint
 
 @app.route('/api/review-trends', methods=['GET'])
+@cached_json(review_trends_version)
 def get_review_trends():
     """Get review trends data using ReviewAnalyzer"""
     category = request.args.get('category', 'roll')
@@ -596,7 +922,8 @@ def get_review_trends():
     end_date = request.args.get('end_date')
     
     try:
-        analyzer = ReviewAnalyzer(REVIEW_DATA_PATH)
+        datasets.ensure('reviews')
+        analyzer = review_analyzer or load_review_analyzer()
         
         # period가 'custom'인 경우 기본값 사용, 아니면 int로 변환
         if period == 'custom':
@@ -722,38 +1049,41 @@ def get_macro(filename):
 
 @app.route('/api/feeds', methods=['GET'])
 def get_feeds():
-    """Get feed posts with pagination"""
+    """
+    Get feed posts with pagination (newest first)
+
+    Query params:
+        page, per_page: Offset pagination
+        cursor: next_cursor of the previous response; reads the next page
+            straight off the created_at index instead of skipping rows
+    """
     try:
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
+        cursor = request.args.get('cursor')
         
-        # Load feeds from JSON file
-        feeds_file = os.path.join(PROJECT_ROOT, 'data', 'feeds', 'feeds.json')
-        
-        if not os.path.exists(feeds_file):
-            return jsonify({'feeds': [], 'total': 0, 'page': page, 'per_page': per_page})
-        
-        with open(feeds_file, 'r', encoding='utf-8') as f:
-            all_feeds = json.load(f)
-        
-        # Sort by created_at (newest first)
-        all_feeds.sort(key=lambda x: x.get('created_at', ''), reverse=True)
+        try:
+            after = decode_feed_cursor(cursor) if cursor else None
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        # Paginate
-        total = len(all_feeds)
+        total = feed_store.count()
         start = (page - 1) * per_page
-        end = start + per_page
-        feeds = all_feeds[start:end]
+        # One extra row tells whether another page follows
+        rows = feed_store.page(per_page + 1, offset=start, after=after)
+        feeds = rows[:per_page]
+        has_more = len(rows) > per_page
         
         return jsonify({
             'feeds': feeds,
             'total': total,
             'page': page,
             'per_page': per_page,
-            'has_more': end < total
+            'has_more': has_more,
+            'next_cursor': encode_feed_cursor(feeds[-1].get('created_at', ''), feeds[-1]['id']) if has_more else None
         })
     except Exception as e:
-        print(f"Error getting feeds: {e}")
+        logger.error("Error getting feeds: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/feeds', methods=['POST'])
@@ -776,26 +1106,11 @@ def create_feed():
             'author': data.get('author', 'FollowScope')
         }
         
-        # Load existing feeds
-        feeds_file = os.path.join(PROJECT_ROOT, 'data', 'feeds', 'feeds.json')
-        
-        if os.path.exists(feeds_file):
-            with open(feeds_file, 'r', encoding='utf-8') as f:
-                feeds = json.load(f)
-        else:
-            feeds = []
-        
-        # Add new feed
-        feeds.append(feed)
-        
-        # Save feeds
-        os.makedirs(os.path.dirname(feeds_file), exist_ok=True)
-        with open(feeds_file, 'w', encoding='utf-8') as f:
-            json.dump(feeds, f, ensure_ascii=False, indent=2)
+        feed_store.insert(feed)
         
         return jsonify(feed), 201
     except Exception as e:
-        print(f"Error creating feed: {e}")
+        logger.error("Error creating feed: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/feeds/<feed_id>', methods=['PUT'])
@@ -804,59 +1119,64 @@ def update_feed(feed_id):
     try:
         data = request.get_json()
         
-        # Load existing feeds
-        feeds_file = os.path.join(PROJECT_ROOT, 'data', 'feeds', 'feeds.json')
+        def apply_changes(feed):
+            feed['content'] = data.get('content', feed['content'])
+            feed['tags'] = data.get('tags', feed['tags'])
+            feed['updated_at'] = datetime.now().isoformat()
         
-        if not os.path.exists(feeds_file):
+        if feed_store.update(feed_id, apply_changes) is None:
             return jsonify({'error': 'Feed not found'}), 404
         
-        with open(feeds_file, 'r', encoding='utf-8') as f:
-            feeds = json.load(f)
-        
-        # Find and update the feed
-        feed_updated = False
-        for feed in feeds:
-            if feed['id'] == feed_id:
-                # Update fields
-                feed['content'] = data.get('content', feed['content'])
-                feed['tags'] = data.get('tags', feed['tags'])
-                feed['updated_at'] = datetime.now().isoformat()
-                feed_updated = True
-                break
-        
-        if not feed_updated:
-            return jsonify({'error': 'Feed not found'}), 404
-        
-        # Save updated feeds
-        with open(feeds_file, 'w', encoding='utf-8') as f:
-            json.dump(feeds, f, ensure_ascii=False, indent=2)
-        
         return jsonify({'message': 'Feed updated successfully'}), 200
     except Exception as e:
-        print(f"Error updating feed: {e}")
+        logger.error("Error updating feed: %s", e)
         return jsonify({'error': str(e)}), 500
 
+def referenced_feed_images():
+    """Filenames of the feed images some feed still uses"""
+    referenced_images = set()
+    for feed in feed_store.all():
+        for image_url in feed.get('images', []):
+            if image_url.startswith('/api/feed-image/'):
+                referenced_images.add(image_url.replace('/api/feed-image/', '').split('?', 1)[0])
+    return referenced_images
+
 def delete_feed_images(image_urls):
-    """Delete image files associated with a feed"""
+    """
+    Delete image files associated with a deleted feed
+
+    Images are named by content hash, so the same upload in another post
+    shares the file; images other feeds still reference are kept.
+    """
     deleted_images = []
     failed_images = []
+    still_referenced = referenced_feed_images()
 
     for image_url in image_urls:
         try:
             # Extract filename from URL (e.g., "/api/feed-image/filename.webp" -> "filename.webp")
             if image_url.startswith('/api/feed-image/'):
-                filename = image_url.replace('/api/feed-image/', '')
-                image_path = os.path.join(PROJECT_ROOT, 'data', 'feeds', 'images', filename)
+                filename = image_url.replace('/api/feed-image/', '').split('?', 1)[0]
+                if filename in still_referenced:
+                    logger.info("Image still used by another feed, kept: %s", filename)
+                    continue
+                image_path = os.path.join(FEED_IMAGE_PATH, filename)
 
                 if os.path.exists(image_path):
+                    # Pre-rendered sizes go with the image
+                    for variant in sized_variants(filename):
+                        variant_path = os.path.join(FEED_IMAGE_PATH, variant)
+                        image_cache.discard(variant_path)
+                        if variant != filename and os.path.exists(variant_path):
+                            os.remove(variant_path)
                     os.remove(image_path)
                     deleted_images.append(filename)
-                    print(f"Deleted image: {filename}")
+                    logger.info("Deleted image: %s", filename)
                 else:
-                    print(f"Image not found: {filename}")
+                    logger.info("Image not found: %s", filename)
                     failed_images.append(filename)
         except Exception as e:
-            print(f"Error deleting image {image_url}: {e}")
+            logger.error("Error deleting image %s: %s", image_url, e)
             failed_images.append(image_url)
 
     return deleted_images, failed_images
@@ -865,21 +1185,7 @@ def delete_feed_images(image_urls):
 def delete_feed(feed_id):
     """Delete a feed post and its associated images"""
     try:
-        feeds_file = os.path.join(PROJECT_ROOT, 'FollowScope', 'data', 'feeds', 'feeds.json')
-
-        if not os.path.exists(feeds_file):
-            return jsonify({'error': 'Feed not found'}), 404
-
-        with open(feeds_file, 'r', encoding='utf-8') as f:
-            feeds = json.load(f)
-
-        # Find the feed to delete and get its images
-        feed_to_delete = None
-        for feed in feeds:
-            if feed.get('id') == feed_id:
-                feed_to_delete = feed
-                break
-
+        feed_to_delete = feed_store.delete(feed_id)
         if feed_to_delete is None:
             return jsonify({'error': 'Feed not found'}), 404
 
@@ -891,13 +1197,6 @@ def delete_feed(feed_id):
         if images_to_delete:
             deleted_images, failed_images = delete_feed_images(images_to_delete)
 
-        # Filter out the feed to delete
-        feeds = [f for f in feeds if f.get('id') != feed_id]
-
-        # Save updated feeds
-        with open(feeds_file, 'w', encoding='utf-8') as f:
-            json.dump(feeds, f, ensure_ascii=False, indent=2)
-
         response_message = 'Feed deleted successfully'
         if deleted_images:
             response_message += f' (removed {len(deleted_images)} image(s))'
@@ -910,29 +1209,20 @@ def delete_feed(feed_id):
             'failed_images': failed_images
         }), 200
     except Exception as e:
-        print(f"Error deleting feed: {e}")
+        logger.error("Error deleting feed: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/feeds/cleanup-images', methods=['POST'])
 def cleanup_orphaned_images():
     """Clean up orphaned images that are no longer referenced by any feed"""
     try:
-        feeds_file = os.path.join(PROJECT_ROOT, 'data', 'feeds', 'feeds.json')
-        images_dir = os.path.join(PROJECT_ROOT, 'data', 'feeds', 'images')
+        images_dir = FEED_IMAGE_PATH
 
-        if not os.path.exists(feeds_file) or not os.path.exists(images_dir):
+        if not os.path.exists(images_dir):
             return jsonify({'message': 'No feeds or images directory found'}), 200
 
         # Get all referenced images from feeds
-        with open(feeds_file, 'r', encoding='utf-8') as f:
-            feeds = json.load(f)
-
-        referenced_images = set()
-        for feed in feeds:
-            for image_url in feed.get('images', []):
-                if image_url.startswith('/api/feed-image/'):
-                    filename = image_url.replace('/api/feed-image/', '')
-                    referenced_images.add(filename)
+        referenced_images = referenced_feed_images()
 
         # Get all image files in directory
         all_image_files = set()
@@ -941,7 +1231,9 @@ def cleanup_orphaned_images():
                 all_image_files.add(filename)
 
         # Find orphaned images
-        orphaned_images = all_image_files - referenced_images
+        # (pre-rendered sizes of a referenced image are referenced too)
+        referenced_files = {variant for filename in referenced_images for variant in sized_variants(filename)}
+        orphaned_images = all_image_files - referenced_files
 
         # Delete orphaned images
         deleted_count = 0
@@ -950,12 +1242,13 @@ def cleanup_orphaned_images():
             try:
                 image_path = os.path.join(images_dir, filename)
                 file_size = os.path.getsize(image_path)
+                image_cache.discard(image_path)
                 os.remove(image_path)
                 deleted_count += 1
                 deleted_size += file_size
-                print(f"Deleted orphaned image: {filename} ({file_size} bytes)")
+                logger.info("Deleted orphaned image: %s (%d bytes)", filename, file_size)
             except Exception as e:
-                print(f"Error deleting orphaned image {filename}: {e}")
+                logger.error("Error deleting orphaned image %s: %s", filename, e)
 
         # Convert bytes to human readable format
         if deleted_size < 1024:
@@ -974,60 +1267,18 @@ def cleanup_orphaned_images():
         }), 200
 
     except Exception as e:
-        print(f"Error cleaning up orphaned images: {e}")
+        logger.error("Error cleaning up orphaned images: %s", e)
         return jsonify({'error': str(e)}), 500
 
-def optimize_image(image_data, max_width=800, max_height=600, quality=75):
-    """Optimize image: resize and convert to WebP format"""
-    try:
-        # Open image from bytes
-        image = Image.open(io.BytesIO(image_data))
-
-        # Convert to RGB if necessary (for WebP compatibility)
-        if image.mode in ('RGBA', 'LA', 'P'):
-            # Create white background
-            background = Image.new('RGB', image.size, (255, 255, 255))
-            if image.mode == 'P':
-                image = image.convert('RGBA')
-            background.paste(image, mask=image.split()[-1] if image.mode in ('RGBA', 'LA') else None)
-            image = background
-        elif image.mode != 'RGB':
-            image = image.convert('RGB')
-
-        # Smart resize based on content type
-        width, height = image.size
-
-        # For screenshots/charts (usually wide), optimize more aggressively
-        aspect_ratio = width / height
-        if aspect_ratio > 1.5:  # Wide image (likely screenshot)
-            max_width, max_height = 700, 400
-            quality = 70
-        elif aspect_ratio < 0.7:  # Tall image (likely mobile screenshot)
-            max_width, max_height = 400, 700
-            quality = 70
-        else:  # Square-ish image (likely photo)
-            max_width, max_height = 600, 600
-            quality = 75
-
-        if width > max_width or height > max_height:
-            ratio = min(max_width / width, max_height / height)
-            new_width = int(width * ratio)
-            new_height = int(height * ratio)
-            image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-
-        # Save as WebP with maximum optimization
-        output = io.BytesIO()
-        image.save(output, format='WebP', quality=quality, optimize=True, method=6, lossless=False)
-        output.seek(0)
-
-        return output.getvalue(), image.size
-    except Exception as e:
-        print(f"Error optimizing image: {e}")
-        return None
-
 @app.route('/api/upload-image', methods=['POST'])
 def upload_image():
-    """Handle image upload for feeds with optimization"""
+    """
+    Accept an image upload for feeds; optimization runs in the background
+
+    Returns 202 with {job_id, status, url} while the image is processed
+    (url serves a placeholder until then; poll /api/upload-image/<job_id>),
+    or 200 with the optimization results if the same image was uploaded before.
+    """
     try:
         if 'image' not in request.files:
             return jsonify({'error': 'No image provided'}), 400
@@ -1050,88 +1301,117 @@ def upload_image():
         if file_ext not in allowed_extensions:
             return jsonify({'error': 'Invalid file type. Allowed: JPG, PNG, GIF, BMP, WebP'}), 400
 
-        # Read and optimize image
-        image_data = file.read()
-        result = optimize_image(image_data)
-
-        if result is None:
-            return jsonify({'error': 'Failed to process image'}), 500
-
-        optimized_data, final_size = result
-
-        # Generate unique filename with .webp extension
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        safe_filename = secure_filename(file.filename.rsplit('.', 1)[0])  # Remove original extension
-        filename = f"{timestamp}_{safe_filename}.webp"
-
-        # Save optimized image
-        upload_path = os.path.join(PROJECT_ROOT, 'data', 'feeds', 'images')
-        os.makedirs(upload_path, exist_ok=True)
-
-        filepath = os.path.join(upload_path, filename)
-        with open(filepath, 'wb') as f:
-            f.write(optimized_data)
-
-        # Return relative path
-        relative_path = f"/api/feed-image/{filename}"
-
-        # Log optimization results
-        original_size = len(image_data)
-        optimized_size = len(optimized_data)
-        compression_ratio = (1 - optimized_size / original_size) * 100
-        print(f"Image optimized: {original_size} -> {optimized_size} bytes ({compression_ratio:.1f}% reduction)")
-        print(f"Final dimensions: {final_size[0]}x{final_size[1]}")
+        # Hand off to the worker pool; identical uploads share one job
+        try:
+            job = image_pipeline.submit(file.read())
+        except RuntimeError as e:
+            return jsonify({'error': str(e)}), 503
 
-        return jsonify({
-            'url': relative_path,
-            'original_size': original_size,
-            'optimized_size': optimized_size,
-            'compression_ratio': f"{compression_ratio:.1f}%",
-            'dimensions': f"{final_size[0]}x{final_size[1]}"
-        }), 200
+        job['status_url'] = f"/api/upload-image/{job['job_id']}"
+        return jsonify(job), 200 if job['status'] == 'done' else 202
     except Exception as e:
-        print(f"Error uploading image: {e}")
+        logger.error("Error uploading image: %s", e)
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/upload-image/<job_id>', methods=['GET'])
+def get_upload_status(job_id):
+    """Status of a background image job: pending, done or failed"""
+    job = image_pipeline.status(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
 @app.route('/api/feed-image/<filename>')
 def serve_feed_image(filename):
-    """Serve feed images"""
+    """
+    Serve feed images
+
+    Query params:
+        size: 'thumb' for the pre-rendered thumbnail (falls back to full size)
+    Content-addressed images are sent with an immutable Cache-Control; all
+    responses carry an ETag and honour If-None-Match and Range.
+    """
     try:
-        image_path = os.path.join(PROJECT_ROOT, 'data', 'feeds', 'images', filename)
-        if os.path.exists(image_path):
-            from flask import send_file
-            return send_file(image_path)
-        else:
+        filename = os.path.basename(filename)
+        size = request.args.get('size', 'full')
+        if size != 'full' and size not in IMAGE_SIZES:
+            return jsonify({'error': f"Unknown size: {size}"}), 400
+        
+        cached = None
+        if size != 'full':
+            cached = image_cache.get(os.path.join(FEED_IMAGE_PATH, size_filename(filename, size)))
+        if cached is None:
+            cached = image_cache.get(os.path.join(FEED_IMAGE_PATH, filename))
+        
+        if cached is None:
+            if image_pipeline.is_pending(filename.rsplit('.', 1)[0]):
+                # Still being optimized: placeholder that must not be cached
+                return Response(PLACEHOLDER_SVG, mimetype='image/svg+xml', headers={'Cache-Control': 'no-store'})
             return jsonify({'error': 'Image not found'}), 404
+        
+        data, etag = cached
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        response = Response(data, mimetype=mimetype)
+        response.set_etag(etag)
+        if image_cache.is_immutable(filename):
+            response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+        else:
+            response.headers['Cache-Control'] = 'public, max-age=3600'
+        return response.make_conditional(request, accept_ranges=True, complete_length=len(data))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-# Initialize data on module load (for Gunicorn)
-print("Initializing FollowScope Web App...")
-load_data()
-load_live_data()
-load_coupon_data()
-load_review_data()
-
-# Start file watcher
-file_watcher = FileWatcher(PRODUCT_DATA_PATH, load_data, interval=10)
-file_watcher.start()
+@app.route('/api/metrics')
+def metrics():
+    """Request latency/size histograms and dataset state in Prometheus text format"""
+    dataset_status = datasets.status()
+    gauges = {
+        'snapshot_generation': (
+            'Generation of the data being served',
+            [({'dataset': name}, generation) for name, generation in current_generations().items()]
+        ),
+        'dataset_ready': (
+            '1 once a dataset has loaded',
+            [({'dataset': name}, int(status['state'] == 'ready')) for name, status in dataset_status.items()]
+        ),
+        'dataset_load_seconds': (
+            'Duration of the last load of a dataset',
+            [({'dataset': name}, status['load_seconds']) for name, status in dataset_status.items()
+             if status['load_seconds'] is not None]
+        )
+    }
+    return Response(request_metrics.render(gauges, counters.snapshot()), mimetype='text/plain; version=0.0.4')
+
+@app.route('/healthz')
+def healthz():
+    """Readiness per dataset; 503 until every dataset has loaded"""
+    ready = datasets.ready()
+    return jsonify({
+        'status': 'ready' if ready else 'starting',
+        'lazy_startup': LAZY_STARTUP,
+        'datasets': datasets.status()
+    }), 200 if ready else 503
+
+# Datasets, in warm-up order (init_product_data and init_review_data also
+# start the file watchers). Initial loads re-raise their errors, so a failed
+# load leaves the dataset failed and /healthz at 503.
+datasets.register('products', init_product_data)
+datasets.register('live', lambda: load_live_data(strict=True))
+datasets.register('coupons', lambda: load_coupon_data(strict=True))
+datasets.register('reviews', init_review_data)
 
-print(f"Watching directory: {PRODUCT_DATA_PATH}")
+# Initialize data on module load (for Gunicorn)
+logger.info("Initializing FollowScope Web App...")
+if LAZY_STARTUP:
+    # Serve right away; requests load the datasets they need first
+    if WARM_UP:
+        datasets.warm_up()
+else:
+    datasets.load_all()
 
 if __name__ == '__main__':
-    # Load data on startup
-    load_data()
-    load_live_data()
-    load_coupon_data()
-    load_review_data()
-    
-    # Start file watcher
-    file_watcher = FileWatcher(PRODUCT_DATA_PATH, load_data, interval=10)
-    file_watcher.start()
-    
-    print(f"Starting FollowScope Web App...")
-    print(f"Watching directory: {PRODUCT_DATA_PATH}")
+    # Data is loaded (or warming up) and the watchers are running (see above)
+    logger.info("Starting FollowScope Web App...")
     
     # Run Flask app
     app.run(debug=True, port=8080, host='0.0.0.0')
@@ -0,0 +1,92 @@
+"""
+Datasets loaded on first use or by a background warm-up
+
+Each dataset wraps the function that loads it. ensure() runs the loader at
+most once (concurrent callers wait for the same load), and the registry
+reports the state of every dataset for the /healthz readiness check.
+"""
+
+import threading
+import time
+
+from src.log import get_logger
+
+logger = get_logger(__name__)
+
+PENDING = 'pending'
+LOADING = 'loading'
+READY = 'ready'
+FAILED = 'failed'
+
+
+class Dataset:
+    """A named dataset and the function that loads it"""
+
+    def __init__(self, name, loader):
+        self.name = name
+        self.loader = loader
+        self.state = PENDING
+        self.error = None
+        self.load_seconds = None
+        self._lock = threading.Lock()
+
+    def ensure(self):
+        """Load the dataset if it is not loaded yet; True once it is ready"""
+        if self.state == READY:
+            return True
+        with self._lock:
+            if self.state == READY:
+                return True
+            self.state = LOADING
+            started = time.monotonic()
+            try:
+                self.loader()
+            except Exception as e:
+                self.state = FAILED
+                self.error = str(e)
+                logger.error("Failed to load %s: %s", self.name, e)
+                return False
+            finally:
+                self.load_seconds = round(time.monotonic() - started, 3)
+            self.state = READY
+            self.error = None
+            logger.info("%s ready in %ss", self.name, self.load_seconds)
+            return True
+
+    def status(self):
+        status = {'state': self.state, 'load_seconds': self.load_seconds}
+        if self.error:
+            status['error'] = self.error
+        return status
+
+
+class DatasetRegistry:
+    """Datasets of the app, in warm-up order"""
+
+    def __init__(self):
+        self._datasets = {}
+        self._warmup_thread = None
+
+    def register(self, name, loader):
+        self._datasets[name] = Dataset(name, loader)
+        return self._datasets[name]
+
+    def ensure(self, name):
+        return self._datasets[name].ensure()
+
+    def load_all(self):
+        """Load every dataset now, in registration order"""
+        for dataset in self._datasets.values():
+            dataset.ensure()
+
+    def warm_up(self):
+        """Load every dataset in a background thread; requests load what they need first"""
+        if self._warmup_thread is None:
+            self._warmup_thread = threading.Thread(target=self.load_all, name='dataset-warmup', daemon=True)
+            self._warmup_thread.start()
+
+    def ready(self):
+        return all(dataset.state == READY for dataset in self._datasets.values())
+
+    def status(self):
+        return {name: dataset.status() for name, dataset in self._datasets.items()}
@@ -1,71 +1,245 @@
 """
 File watcher for automatic data reload
+
+Watches a directory tree recursively. On Linux changes arrive through
+inotify; elsewhere (or if inotify is unavailable) the tree is stat-polled.
+Bursts of writes are debounced and the callback receives the set of paths
+that changed.
 """
 
-import time
+import ctypes
+import ctypes.util
+import fnmatch
 import os
+import select
+import struct
+import sys
+import time
 from pathlib import Path
-from datetime import datetime
 import threading
 
+from src.log import get_logger
+
+logger = get_logger(__name__)
+
+# Temporary files written by browsers/editors while a download is in progress
+DEFAULT_IGNORE_PATTERNS = ('.*', '*~', '*.tmp', '*.part', '*.crdownload', '~$*')
+
+# inotify event masks (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, 'O_CLOEXEC', 0o2000000)
+
+WATCH_MASK = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+              IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class PollingBackend:
+    """Recursive stat poller; reports paths whose size/mtime changed"""
+
+    name = 'poll'
+
+    def __init__(self, root, interval, is_ignored):
+        self.root = root
+        self.interval = interval
+        self.is_ignored = is_ignored
+        self.snapshot = self.scan()
+
+    def scan(self):
+        stats = {}
+        if not self.root.exists():
+            return stats
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if not self.is_ignored(d)]
+            for filename in filenames:
+                if self.is_ignored(filename):
+                    continue
+                file_path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    continue
+                stats[file_path] = (stat.st_mtime_ns, stat.st_size)
+        return stats
+
+    def read_changes(self, timeout):
+        time.sleep(min(timeout, self.interval) if timeout is not None else self.interval)
+        current = self.scan()
+        changed = {path for path, stat in current.items() if self.snapshot.get(path) != stat}
+        changed.update(path for path in self.snapshot if path not in current)
+        self.snapshot = current
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyBackend:
+    """Linux inotify watches on every directory of the tree"""
+
+    name = 'inotify'
+
+    def __init__(self, root, is_ignored):
+        libc_name = ctypes.util.find_library('c') or 'libc.so.6'
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.root = root
+        self.is_ignored = is_ignored
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.watches = {}
+        self.add_tree(root)
+
+    def add_watch(self, directory):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(str(directory)), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f'inotify_add_watch failed for {directory}')
+        self.watches[wd] = Path(directory)
+
+    def add_tree(self, directory):
+        """Watch a directory and its subdirectories; returns the files found in them"""
+        found = set()
+        self.add_watch(directory)
+        for dirpath, dirnames, filenames in os.walk(directory):
+            dirnames[:] = [d for d in dirnames if not self.is_ignored(d)]
+            for dirname in dirnames:
+                self.add_watch(os.path.join(dirpath, dirname))
+            found.update(os.path.join(dirpath, f) for f in filenames if not self.is_ignored(f))
+        return found
+
+    def read_changes(self, timeout):
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, name_len = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + name_len].rstrip(b'\0'))
+            offset += name_len
+
+            if mask & IN_Q_OVERFLOW:
+                # Events were lost; report the whole tree
+                changed.add(str(self.root))
+                continue
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+            directory = self.watches.get(wd)
+            if directory is None or not name or self.is_ignored(name):
+                continue
+
+            path = directory / name
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    try:
+                        changed.update(self.add_tree(path))
+                    except OSError:
+                        pass
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    changed.add(str(path))
+                continue
+            changed.add(str(path))
+        return changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
 class FileWatcher:
-    def __init__(self, watch_path, callback, interval=5):
+    """
+    Recursive directory watcher
+
+    Args:
+        watch_path: Directory tree to watch
+        callback: Called with the set of changed paths (added, modified or deleted)
+        interval: Poll interval in seconds for the stat-polling fallback
+        debounce: Quiet period in seconds before a burst of changes is reported
+        use_inotify: Use inotify when available (Linux)
+        ignore_patterns: fnmatch patterns of file/directory names to ignore
+    """
+
+    def __init__(self, watch_path, callback, interval=5, debounce=0.5,
+                 use_inotify=True, ignore_patterns=DEFAULT_IGNORE_PATTERNS):
         self.watch_path = Path(watch_path)
         self.callback = callback
         self.interval = interval
-        self.last_modified = {}
+        self.debounce = debounce
+        self.use_inotify = use_inotify
+        self.ignore_patterns = tuple(ignore_patterns)
+        self.backend = None
         self.running = False
         self.thread = None
-        
-    def get_file_stats(self):
-        """Get modification times for all files in watch directory"""
-        stats = {}
-        if self.watch_path.exists():
-            for file_path in self.watch_path.glob('*'):
-                if file_path.is_file():
-                    stats[str(file_path)] = file_path.stat().st_mtime
-        return stats
-    
-    def check_changes(self):
-        """Check if any files have been modified"""
-        current_stats = self.get_file_stats()
-        
-        # Check for new or modified files
-        for file_path, mtime in current_stats.items():
-            if file_path not in self.last_modified or self.last_modified[file_path] != mtime:
-                print(f"[FileWatcher] Detected change in: {Path(file_path).name}")
-                self.last_modified = current_stats
-                return True
-                
-        # Check for deleted files
-        for file_path in list(self.last_modified.keys()):
-            if file_path not in current_stats:
-                print(f"[FileWatcher] Detected deletion of: {Path(file_path).name}")
-                self.last_modified = current_stats
-                return True
-                
-        return False
-    
+
+    def is_ignored(self, name):
+        return any(fnmatch.fnmatch(name, pattern) for pattern in self.ignore_patterns)
+
+    def create_backend(self):
+        if self.use_inotify and sys.platform.startswith('linux') and self.watch_path.is_dir():
+            try:
+                return InotifyBackend(self.watch_path, self.is_ignored)
+            except (OSError, AttributeError) as e:
+                logger.warning("inotify unavailable (%s), falling back to polling", e)
+        return PollingBackend(self.watch_path, self.interval, self.is_ignored)
+
     def watch_loop(self):
-        """Main watch loop"""
-        print(f"[FileWatcher] Starting to watch: {self.watch_path}")
-        self.last_modified = self.get_file_stats()
-        
-        while self.running:
-            if self.check_changes():
-                print(f"[FileWatcher] Triggering reload at {datetime.now()}")
-                self.callback()
-            time.sleep(self.interval)
-    
+        """Main watch loop: collect changes until the tree is quiet, then report them"""
+        self.backend = self.create_backend()
+        logger.info("Starting to watch: %s (%s)", self.watch_path, self.backend.name)
+
+        pending = set()
+        last_change = 0.0
+        try:
+            while self.running:
+                if pending:
+                    timeout = max(0.0, last_change + self.debounce - time.monotonic())
+                else:
+                    timeout = self.interval
+                changes = self.backend.read_changes(timeout)
+                if changes:
+                    pending.update(changes)
+                    last_change = time.monotonic()
+                    continue
+                if pending and time.monotonic() - last_change >= self.debounce:
+                    changed, pending = pending, set()
+                    for file_path in sorted(changed):
+                        logger.info("Detected change in: %s", Path(file_path).name)
+                    logger.info("Triggering reload")
+                    try:
+                        self.callback(changed)
+                    except Exception as e:
+                        logger.error("Reload callback failed: %s", e)
+        finally:
+            self.backend.close()
+
     def start(self):
         """Start watching in a separate thread"""
         if not self.running:
             self.running = True
             self.thread = threading.Thread(target=self.watch_loop, daemon=True)
             self.thread.start()
-    
+
     def stop(self):
         """Stop watching"""
         self.running = False
         if self.thread:
-            self.thread.join()
\ No newline at end of file
+            self.thread.join()
@@ -0,0 +1,400 @@
+"""
+Background image processing and serving for feed uploads
+
+Uploads are hashed and handed to a small process pool that resizes and
+WebP-encodes them off the request thread. The output file is named after the
+SHA-256 of the uploaded bytes, so the same screenshot uploaded twice maps to
+the same job and is encoded only once. Until a job finishes its URL serves a
+placeholder. Pending and failed jobs are recorded as small marker files next
+to the output, so every worker process sees them, not just the one that
+accepted the upload. Each image is rendered in every size of IMAGE_SIZES; since the
+names are content-addressed, served bytes can be cached in memory and by
+browsers indefinitely.
+"""
+
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from src.log import get_logger
+
+logger = get_logger(__name__)
+
+PLACEHOLDER_SVG = (
+    '<svg xmlns="http://www.w3.org/2000/svg" width="160" height="120" viewBox="0 0 160 120">'
+    '<rect width="160" height="120" fill="#f1f3f5"/>'
+    '<text x="80" y="64" font-family="sans-serif" font-size="12" fill="#868e96" '
+    'text-anchor="middle">Processing...</text></svg>'
+)
+
+# Extra pre-rendered sizes: name -> (filename suffix, max width, max height, quality)
+IMAGE_SIZES = {
+    'thumb': ('.thumb', 480, 480, 65)
+}
+
+# Pending markers older than this belong to a worker that died mid-job
+PENDING_TIMEOUT = 10 * 60
+
+CONTENT_ADDRESSED_NAME = re.compile(r'^([0-9a-f]{32})((?:\.[a-z]+)?)\.webp$')
+
+
+def size_filename(filename, size):
+    """Filename of a pre-rendered size of an image ('full' is the image itself)"""
+    if size not in IMAGE_SIZES:
+        return filename
+    stem, ext = os.path.splitext(filename)
+    return f"{stem}{IMAGE_SIZES[size][0]}{ext}"
+
+
+def sized_variants(filename):
+    """Filenames of every pre-rendered size of an image, full size included"""
+    return [filename] + [size_filename(filename, size) for size in IMAGE_SIZES]
+
+
+def optimize_image(image_data, max_width=800, max_height=600, quality=75):
+    """Optimize image: resize and convert to WebP format"""
+    from PIL import Image
+    try:
+        # Open image from bytes
+        image = Image.open(io.BytesIO(image_data))
+
+        # Convert to RGB if necessary (for WebP compatibility)
+        if image.mode in ('RGBA', 'LA', 'P'):
+            # Create white background
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            if image.mode == 'P':
+                image = image.convert('RGBA')
+            background.paste(image, mask=image.split()[-1] if image.mode in ('RGBA', 'LA') else None)
+            image = background
+        elif image.mode != 'RGB':
+            image = image.convert('RGB')
+
+        # Smart resize based on content type
+        width, height = image.size
+
+        # For screenshots/charts (usually wide), optimize more aggressively
+        aspect_ratio = width / height
+        if aspect_ratio > 1.5:  # Wide image (likely screenshot)
+            max_width, max_height = 700, 400
+            quality = 70
+        elif aspect_ratio < 0.7:  # Tall image (likely mobile screenshot)
+            max_width, max_height = 400, 700
+            quality = 70
+        else:  # Square-ish image (likely photo)
+            max_width, max_height = 600, 600
+            quality = 75
+
+        if width > max_width or height > max_height:
+            ratio = min(max_width / width, max_height / height)
+            new_width = int(width * ratio)
+            new_height = int(height * ratio)
+            image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+
+        # Save as WebP with maximum optimization
+        output = io.BytesIO()
+        image.save(output, format='WebP', quality=quality, optimize=True, method=6, lossless=False)
+        output.seek(0)
+
+        return output.getvalue(), image.size
+    except Exception as e:
+        logger.error("Error optimizing image: %s", e)
+        return None
+
+
+def process_image(image_data, output_path):
+    """
+    Pool worker: optimize an upload and write it to output_path atomically
+
+    Returns:
+        (optimized_size, (width, height))
+
+    Raises:
+        ValueError: If the image could not be decoded or encoded
+    """
+    from PIL import Image
+    result = optimize_image(image_data)
+    if result is None:
+        raise ValueError('Failed to process image')
+    optimized_data, final_size = result
+
+    def write(path, data):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    # Smaller sizes first: once the full-size file exists the job counts as done
+    for size, (_, max_width, max_height, quality) in IMAGE_SIZES.items():
+        with Image.open(io.BytesIO(optimized_data)) as image:
+            image.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
+            output = io.BytesIO()
+            image.save(output, format='WebP', quality=quality, method=4)
+        write(os.path.join(os.path.dirname(output_path), size_filename(os.path.basename(output_path), size)),
+              output.getvalue())
+    write(output_path, optimized_data)
+    return len(optimized_data), final_size
+
+
+class ImagePipeline:
+    """
+    Content-hash deduplicated image jobs on a bounded process pool
+
+    Args:
+        output_dir: Directory the optimized images are written to
+        url_prefix: URL under which output_dir is served
+        max_workers: Worker processes
+        max_pending: Jobs allowed to wait or run at once; submit() refuses more
+    """
+
+    def __init__(self, output_dir, url_prefix, max_workers=2, max_pending=32):
+        self.output_dir = output_dir
+        self.url_prefix = url_prefix
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        # Created on first use so importing the app never forks. Workers are
+        # forked where possible: spawned workers would re-run the app module.
+        if self._executor is None:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+        return self._executor
+
+    @staticmethod
+    def job_id(image_data):
+        return hashlib.sha256(image_data).hexdigest()[:32]
+
+    def filename(self, job_id):
+        return f"{job_id}.webp"
+
+    def _output_path(self, job_id):
+        return os.path.join(self.output_dir, self.filename(job_id))
+
+    def _marker_path(self, job_id, status):
+        return f"{self._output_path(job_id)}.{status}"
+
+    def _write_marker(self, job_id, status, info):
+        path = self._marker_path(job_id, status)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(info, f)
+        os.replace(tmp_path, path)
+
+    def _remove_marker(self, job_id, status):
+        try:
+            os.remove(self._marker_path(job_id, status))
+        except OSError:
+            pass
+
+    def _marker_job(self, job_id):
+        """Job record of a pending or failed marker written by any worker, or None"""
+        for status in ('pending', 'failed'):
+            path = self._marker_path(job_id, status)
+            try:
+                if status == 'pending' and time.time() - os.path.getmtime(path) > PENDING_TIMEOUT:
+                    continue
+                with open(path, 'r', encoding='utf-8') as f:
+                    info = json.load(f)
+            except (OSError, ValueError):
+                continue
+            return {'id': job_id, 'status': status, **info}
+        return None
+
+    def _describe(self, job):
+        info = {
+            'job_id': job['id'],
+            'status': job['status'],
+            'url': self.url_prefix + self.filename(job['id']),
+            'original_size': job.get('original_size')
+        }
+        if job['status'] == 'done':
+            original_size, optimized_size = job.get('original_size'), job['optimized_size']
+            info['optimized_size'] = optimized_size
+            info['dimensions'] = f"{job['dimensions'][0]}x{job['dimensions'][1]}"
+            if original_size:
+                info['compression_ratio'] = f"{(1 - optimized_size / original_size) * 100:.1f}%"
+        elif job['status'] == 'failed':
+            info['error'] = job.get('error', 'Failed to process image')
+        return info
+
+    def _finished_job(self, job_id, original_size=None):
+        """Job record for an image already on disk, or None"""
+        from PIL import Image
+        output_path = self._output_path(job_id)
+        try:
+            optimized_size = os.path.getsize(output_path)
+            with Image.open(output_path) as image:
+                dimensions = image.size
+        except OSError:
+            return None
+        return {'id': job_id, 'status': 'done', 'original_size': original_size,
+                'optimized_size': optimized_size, 'dimensions': dimensions}
+
+    def submit(self, image_data):
+        """
+        Queue an upload for processing
+
+        Returns:
+            Job description dict (see status()); status is 'done' right away
+            when the same image was processed before
+
+        Raises:
+            RuntimeError: If max_pending jobs are already queued
+        """
+        job_id = self.job_id(image_data)
+        with self._lock:
+            # Only pending jobs are kept; finished ones are read back from disk
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return self._describe(job)
+
+            finished = self._finished_job(job_id, len(image_data))
+            if finished is not None:
+                return self._describe(finished)
+
+            marked = self._marker_job(job_id)
+            if marked is not None and marked['status'] == 'pending':
+                # Being processed by another worker process
+                return self._describe(marked)
+
+            if len(self._jobs) >= self.max_pending:
+                raise RuntimeError('Too many images are being processed, try again shortly')
+
+            os.makedirs(self.output_dir, exist_ok=True)
+            job = {'id': job_id, 'status': 'pending', 'original_size': len(image_data)}
+            self._write_marker(job_id, 'pending', {'original_size': len(image_data)})
+            self._remove_marker(job_id, 'failed')
+            self._jobs[job_id] = job
+            future = self._pool().submit(process_image, image_data, self._output_path(job_id))
+        future.add_done_callback(lambda f: self._complete(job, f))
+        return self._describe(job)
+
+    def _complete(self, job, future):
+        with self._lock:
+            self._jobs.pop(job['id'], None)
+            try:
+                optimized_size, dimensions = future.result()
+                original_size = job['original_size']
+                logger.info("Image optimized: %d -> %d bytes (%.1f%% reduction), %dx%d",
+                            original_size, optimized_size,
+                            (1 - optimized_size / original_size) * 100, *dimensions)
+            except Exception as e:
+                try:
+                    self._write_marker(job['id'], 'failed',
+                                       {'original_size': job['original_size'], 'error': str(e)})
+                except OSError as marker_error:
+                    logger.error("Error recording failed image %s: %s", job['id'], marker_error)
+                logger.error("Error processing image %s: %s", job['id'], e)
+            finally:
+                self._remove_marker(job['id'], 'pending')
+
+    def status(self, job_id):
+        """Job description dict, or None if the job is unknown"""
+        if not re.fullmatch(r'[0-9a-f]{32}', job_id):
+            return None
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            # Finished or still running in any worker process (or before a restart)
+            job = self._finished_job(job_id) or self._marker_job(job_id)
+        return self._describe(job) if job is not None else None
+
+    def is_pending(self, job_id):
+        """Whether any worker process is still processing job_id"""
+        if not re.fullmatch(r'[0-9a-f]{32}', job_id):
+            return False
+        if job_id in self._jobs:
+            return True
+        job = self._marker_job(job_id)
+        return job is not None and job['status'] == 'pending'
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ImageCache:
+    """
+    In-memory LRU of served image bytes, bounded by total size
+
+    Content-addressed files never change, so once cached they are served
+    without touching the disk. Other files are re-validated against their
+    mtime and size on every hit.
+
+    Args:
+        max_bytes: Total size of cached images
+        max_item_bytes: Larger files are served from disk and not cached
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, max_item_bytes=4 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.max_item_bytes = max_item_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_immutable(filename):
+        return CONTENT_ADDRESSED_NAME.match(filename) is not None
+
+    def get(self, path):
+        """
+        Bytes and ETag of an image file
+
+        Returns:
+            (data, etag), or None if the file does not exist
+        """
+        filename = os.path.basename(path)
+        immutable = self.is_immutable(filename)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and immutable:
+                self._entries.move_to_end(path)
+                return entry[0], entry[1]
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self.discard(path)
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if entry is not None and entry[2] == signature:
+            with self._lock:
+                if path in self._entries:
+                    self._entries.move_to_end(path)
+            return entry[0], entry[1]
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        if immutable:
+            etag = os.path.splitext(filename)[0]
+        else:
+            etag = f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+        if len(data) <= self.max_item_bytes:
+            with self._lock:
+                old = self._entries.pop(path, None)
+                if old is not None:
+                    self._size -= len(old[0])
+                self._entries[path] = (data, etag, signature)
+                self._size += len(data)
+                while self._size > self.max_bytes and self._entries:
+                    _, (evicted, _, _) = self._entries.popitem(last=False)
+                    self._size -= len(evicted)
+        return data, etag
+
+    def discard(self, path):
+        with self._lock:
+            entry = self._entries.pop(path, None)
+            if entry is not None:
+                self._size -= len(entry[0])
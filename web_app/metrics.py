@@ -0,0 +1,216 @@
+"""
+Per-request timing, payload and dataset metrics, plus a one-request profiler
+
+RequestMetrics keeps a latency histogram and a response size histogram per
+(method, route) and renders everything in the Prometheus text format for
+/api/metrics. Counters are per process: under gunicorn each worker reports
+its own, as with any multi-process Prometheus target without a shared store.
+
+SamplingProfiler samples the stack of one thread at a fixed interval while a
+single profiled request runs, and reports the hottest functions and the
+collapsed stacks (the input format of flame graph tools).
+"""
+
+import sys
+import threading
+import time
+from collections import Counter
+
+# Upper bounds of the latency (seconds) and response size (bytes) buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count of observed values"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def samples(self, name, labels):
+        """Prometheus sample lines (bucket counts are made cumulative here)"""
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f'{name}_sum{{{labels}}} {self.sum:.6f}')
+        lines.append(f'{name}_count{{{labels}}} {self.count}')
+        return lines
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class RequestMetrics:
+    """
+    Request latency and size per route, in Prometheus text format
+
+    Args:
+        prefix: Metric name prefix
+    """
+
+    def __init__(self, prefix='followscope'):
+        self.prefix = prefix
+        self.started_at = time.time()
+        self._latency = {}
+        self._sizes = {}
+        self._statuses = Counter()
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def request_started(self):
+        with self._lock:
+            self._in_flight += 1
+
+    def observe(self, method, route, status, seconds, size=None):
+        """
+        Record a finished request
+
+        Args:
+            method: HTTP method
+            route: URL rule (e.g. '/api/feeds/<feed_id>'), not the raw path,
+                so the number of series stays bounded
+            status: Response status code
+            seconds: Time spent in the handler
+            size: Response body size in bytes (None for streamed bodies)
+        """
+        key = (method, route)
+        with self._lock:
+            self._in_flight -= 1
+            latency = self._latency.get(key)
+            if latency is None:
+                latency = self._latency[key] = Histogram(LATENCY_BUCKETS)
+                self._sizes[key] = Histogram(SIZE_BUCKETS)
+            latency.observe(seconds)
+            if size is not None:
+                self._sizes[key].observe(size)
+            self._statuses[(method, route, status)] += 1
+
+    def render(self, gauges=None, events=None):
+        """
+        Prometheus text exposition of every metric
+
+        Args:
+            gauges: Extra gauges as {name: (help, [(labels dict, value), ...])}
+            events: Event counts ({name: count}, see src.log.counters)
+        """
+        p = self.prefix
+        lines = []
+        with self._lock:
+            lines += [f'# HELP {p}_request_duration_seconds Time spent handling requests',
+                      f'# TYPE {p}_request_duration_seconds histogram']
+            for (method, route), histogram in sorted(self._latency.items()):
+                labels = f'method="{method}",route="{_escape(route)}"'
+                lines += histogram.samples(f'{p}_request_duration_seconds', labels)
+
+            lines += [f'# HELP {p}_response_size_bytes Response body size (streamed bodies excluded)',
+                      f'# TYPE {p}_response_size_bytes histogram']
+            for (method, route), histogram in sorted(self._sizes.items()):
+                if histogram.count:
+                    labels = f'method="{method}",route="{_escape(route)}"'
+                    lines += histogram.samples(f'{p}_response_size_bytes', labels)
+
+            lines += [f'# HELP {p}_requests_total Requests by status code',
+                      f'# TYPE {p}_requests_total counter']
+            for (method, route, status), count in sorted(self._statuses.items()):
+                lines.append(f'{p}_requests_total{{method="{method}",route="{_escape(route)}",'
+                             f'status="{status}"}} {count}')
+
+            lines += [f'# HELP {p}_requests_in_flight Requests being handled',
+                      f'# TYPE {p}_requests_in_flight gauge',
+                      f'{p}_requests_in_flight {self._in_flight}']
+
+        lines += [f'# HELP {p}_process_start_time_seconds Start time of the process',
+                  f'# TYPE {p}_process_start_time_seconds gauge',
+                  f'{p}_process_start_time_seconds {self.started_at:.3f}']
+        if events:
+            lines += [f'# HELP {p}_events_total Events counted by the loaders',
+                      f'# TYPE {p}_events_total counter']
+            lines += [f'{p}_events_total{{event="{_escape(name)}"}} {count}'
+                      for name, count in sorted(events.items())]
+        for name, (help_text, values) in (gauges or {}).items():
+            lines += [f'# HELP {p}_{name} {help_text}', f'# TYPE {p}_{name} gauge']
+            for labels, value in values:
+                label_text = ','.join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+                lines.append(f'{p}_{name}{{{label_text}}} {value}' if label_text else f'{p}_{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+class SamplingProfiler:
+    """
+    Samples the stack of one thread from a background thread
+
+    Args:
+        thread_id: threading.get_ident() of the thread to sample
+        interval: Seconds between samples (the GIL switch interval, 5 ms,
+            is the practical minimum while the sampled thread runs Python code)
+    """
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._started = None
+        self.elapsed = 0.0
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.elapsed = time.perf_counter() - self._started
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+                frame = frame.f_back
+            self.stacks[tuple(reversed(stack))] += 1
+            self.samples += 1
+
+    def report(self, top=30):
+        """Plain-text report: hottest functions (self and total), then collapsed stacks"""
+        own = Counter()
+        total = Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for entry in set(stack):
+                total[entry] += count
+
+        def share(count):
+            return f"{count / self.samples * 100:5.1f}%" if self.samples else '  0.0%'
+
+        lines = [f"{self.samples} samples every {self.interval * 1000:g} ms over {self.elapsed:.3f}s", '',
+                 'Self time:']
+        lines += [f"  {share(count)}  {name}" for name, count in own.most_common(top)]
+        lines += ['', 'Total time (including callees):']
+        lines += [f"  {share(count)}  {name}" for name, count in total.most_common(top)]
+        lines += ['', 'Collapsed stacks:']
+        lines += [f"{';'.join(stack)} {count}" for stack, count in self.stacks.most_common()]
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,116 @@
+"""
+Serialized, pre-compressed JSON responses reused while the data is unchanged
+
+A JSON endpoint's body depends only on the version (generation) of the data
+it reads and on the query string. ResponseCache keys bodies by exactly that:
+the ETag is derived from route, version and query, so a conditional request
+is answered with 304 before the view runs, and a repeated request reuses the
+body serialized and compressed the first time. Entries of older versions of
+a route are dropped when a new version is stored.
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESS_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+class CachedBody:
+    """One response body in every encoding the client may accept"""
+
+    def __init__(self, route, version, etag, body, mimetype):
+        self.route = route
+        self.version = version
+        self.etag = etag
+        self.mimetype = mimetype
+        self.encodings = {'identity': body}
+        if len(body) >= MIN_COMPRESS_BYTES:
+            self.encodings['gzip'] = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+            if brotli is not None:
+                self.encodings['br'] = brotli.compress(body, quality=BROTLI_QUALITY)
+
+    @property
+    def size(self):
+        return sum(len(data) for data in self.encodings.values())
+
+    def encoding_for(self, accept_encodings):
+        """Smallest encoding the client accepts ('identity' if none)"""
+        for name in ('br', 'gzip'):
+            if name in self.encodings and accept_encodings[name] > 0:
+                return name
+        return 'identity'
+
+
+class ResponseCache:
+    """
+    LRU of CachedBody objects, bounded by total size
+
+    Args:
+        max_bytes: Total size of cached bodies (all encodings)
+        max_item_bytes: Larger bodies are served but not kept
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, max_item_bytes=16 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.max_item_bytes = max_item_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def etag(route, version, args):
+        """
+        ETag of a response
+
+        Args:
+            route: Request path
+            version: Version of the data the response is built from
+            args: Query parameters (MultiDict); order does not matter
+        """
+        query = sorted(args.items(multi=True))
+        key = json.dumps([route, str(version), query], ensure_ascii=False, separators=(',', ':'))
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()[:24]
+
+    def get(self, etag):
+        with self._lock:
+            entry = self._entries.get(etag)
+            if entry is not None:
+                self._entries.move_to_end(etag)
+            return entry
+
+    def put(self, route, version, etag, body, mimetype='application/json'):
+        """Compress body and keep it (unless too large); returns the CachedBody"""
+        entry = CachedBody(route, version, etag, body, mimetype)
+        size = entry.size
+        if size > self.max_item_bytes:
+            return entry
+        with self._lock:
+            # Responses of an older version of the route will not be asked for again
+            stale = [key for key, cached in self._entries.items()
+                     if cached.route == route and cached.version != version]
+            for key in stale + [etag]:
+                old = self._entries.pop(key, None)
+                if old is not None:
+                    self._size -= old.size
+            self._entries[etag] = entry
+            self._size += size
+            while self._size > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted.size
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
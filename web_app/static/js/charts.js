@@ -1,6 +1,11 @@
 // Global variables
 let allData = [];
 let filteredData = [];
+
+// Columns of /api/data the dashboard renders (table, charts, purchase simulation)
+const DATA_FIELDS = ['Competitor', 'Design', 'Thickness_cm', 'Width_cm', 'Length_cm', 'Price', 'Price_per_Volume'];
+// Product table filters applied by /api/data; allData is refetched when they change
+let dataQuery = { productType: '', competitor: '', sort: '' };
 let charts = {};
 let promotionData = [];
 let currentMonth = new Date();
@@ -105,10 +110,8 @@ async function loadData(tab, productType) {
         if (productType) params.append('product_type', productType);
         const queryParams = params.toString() ? `?${params.toString()}` : '';
         
-        // Fetch all data
-        const response = await fetch('/api/data' + queryParams);
-        allData = await response.json();
-        filteredData = [...allData];
+        // Fetch the rendered columns of the selected products
+        await fetchProducts(productType);
         
         // Fetch statistics with same filters
         const statsResponse = await fetch('/api/statistics' + queryParams);
@@ -167,6 +170,21 @@ async function loadData(tab, productType) {
     }
 }
 
+// Fetch the products matching dataQuery into allData (search stays client-side)
+async function fetchProducts(productType) {
+    dataQuery.productType = productType || '';
+    const params = new URLSearchParams();
+    if (dataQuery.productType) params.append('product_type', dataQuery.productType);
+    if (dataQuery.competitor) params.append('competitor', dataQuery.competitor);
+    if (dataQuery.sort) params.append('sort', dataQuery.sort);
+    params.append('fields', DATA_FIELDS.join(','));
+
+    const response = await fetch('/api/data?' + params.toString());
+    if (!response.ok) throw new Error(`/api/data returned ${response.status}`);
+    allData = await response.json();
+    filteredData = searchRows(allData);
+}
+
 // Initialize overview chart
 function initializeOverviewChart() {
     // Check if chart already exists
@@ -593,41 +611,33 @@ async function updateHeatmap() {
         return;
     }
 
-    // Filter data based on selected competitors and product type
-    let displayData = allData.filter(d => selectedCompetitors.includes(d.Competitor));
-
-    // Apply product type filter
-    if (productType) {
-        displayData = displayData.filter(d => {
-            // Check if product belongs to selected type based on category
-            if (productType === 'roll') {
-                return d.product_category && d.product_category.includes('롤매트');
-            } else if (productType === 'puzzle') {
-                return d.product_category && d.product_category.includes('퍼즐매트');
-            } else if (productType === 'pet') {
-                return d.product_category && d.product_category.includes('강아지매트');
-            } else if (productType === 'folder') {
-                return d.product_category && d.product_category.includes('폴더매트');
-            }
-            return true;
-        });
+    // Fetch the precomputed heatmap for the selected competitors
+    const params = new URLSearchParams();
+    if (productType) params.append('product_type', productType);
+    params.append('competitor', selectedCompetitors.join(','));
+
+    let heatmap;
+    try {
+        const response = await fetch('/api/heatmap?' + params.toString());
+        heatmap = await response.json();
+    } catch (error) {
+        console.error('Error loading heatmap:', error);
+        heatmapContent.innerHTML = '<p>데이터를 불러오는 중 오류가 발생했습니다.</p>';
+        return;
     }
 
-    if (displayData.length === 0) {
+    if (!heatmap.cells || heatmap.cells.length === 0) {
         heatmapContent.innerHTML = '<p>데이터가 없습니다.</p>';
         return;
     }
 
-    // Get all dimensions (no grid size filtering)
-    const uniqueThicknesses = [...new Set(displayData.map(d => d.Thickness_cm))].sort((a, b) => a - b);
-    const uniqueWidths = [...new Set(displayData.map(d => d.Width_cm))].sort((a, b) => a - b);
-
     // Always show all-competitors heatmap
-    createAllCompetitorsHeatmap(displayData, uniqueThicknesses, uniqueWidths);
+    createAllCompetitorsHeatmap(heatmap);
 }
 
 // Create heatmap showing all competitors' prices in each cell
-function createAllCompetitorsHeatmap(data, thicknesses, widths) {
+// (cells are aggregated server-side by /api/heatmap)
+function createAllCompetitorsHeatmap(heatmap) {
     const container = document.getElementById('heatmapContent');
     
     // Check product type for display title
@@ -651,71 +661,12 @@ function createAllCompetitorsHeatmap(data, thicknesses, widths) {
     title.style.marginBottom = '10px';
     container.appendChild(title);
     
-    // Create product map grouped by thickness/width
-    const productMap = {};
-    const cellAverages = {}; // Store average price per volume for each cell
-    
-    data.forEach(product => {
-        const key = `${product.Thickness_cm}_${product.Width_cm}`;
-        if (!productMap[key]) {
-            productMap[key] = [];
-            cellAverages[key] = [];
-        }
-        // Calculate display price based on product type
-        let displayPrice;
-        if (isPuzzle) {
-            // For puzzle mats, show price as-is (already 100x100)
-            displayPrice = product.Price;
-        } else if (isFolder) {
-            // 폴더매트는 제품 단위 가격을 그대로 사용
-            displayPrice = product.Price;
-        } else if (isPetMat) {
-            // For pet mats, show price for standard 110x50cm unit
-            if (typeof calculatePetPricePerUnit === 'function') {
-                displayPrice = product.Price; // Already normalized to unit price
-            } else {
-                displayPrice = (product.Price / product.Length_cm) * 50;
-            }
-        } else {
-            // For roll mats, calculate price per 50cm
-            displayPrice = (product.Price / product.Length_cm) * 50;
-        }
-        
-        const priceMetricRaw = Number(product.Price_per_Volume);
-        const priceMetric = Number.isFinite(priceMetricRaw) ? priceMetricRaw : null;
-
-        productMap[key].push({
-            competitor: product.Competitor,
-            displayPrice: displayPrice,
-            originalPrice: product.Price,
-            length: product.Length_cm,
-            width: product.Width_cm,
-            pricePerVolume: priceMetric
-        });
-        if (priceMetric !== null) {
-            cellAverages[key].push(priceMetric);
-        }
-    });
-    
-    // Calculate average price per volume for each cell
-    Object.keys(cellAverages).forEach(key => {
-        const prices = cellAverages[key];
-        cellAverages[key] = prices.length ? prices.reduce((a, b) => a + b, 0) / prices.length : null;
-    });
-    
-    // Sort products in each cell by price
-    Object.keys(productMap).forEach(key => {
-        productMap[key].sort((a, b) => {
-            const aMetric = a.pricePerVolume !== null ? a.pricePerVolume : Infinity;
-            const bMetric = b.pricePerVolume !== null ? b.pricePerVolume : Infinity;
-            return aMetric - bMetric;
-        });
-    });
+    const thicknesses = heatmap.thicknesses;
+    const widths = heatmap.widths;
     
-    // Find global min/max for cell background color scale (based on cell averages)
-    const allCellAverages = Object.values(cellAverages).filter(v => v !== null && Number.isFinite(v));
-    const minCellAvg = allCellAverages.length ? Math.min(...allCellAverages) : 0;
-    const maxCellAvg = allCellAverages.length ? Math.max(...allCellAverages) : 0;
+    // Global min/max for cell background color scale (based on cell averages)
+    const minCellAvg = heatmap.avg_range ? heatmap.avg_range[0] : 0;
+    const maxCellAvg = heatmap.avg_range ? heatmap.avg_range[1] : 0;
     const cellAvgRange = maxCellAvg - minCellAvg;
     
     // Create table
@@ -751,7 +702,7 @@ function createAllCompetitorsHeatmap(data, thicknesses, widths) {
     table.appendChild(headerRow);
     
     // Data rows
-    thicknesses.forEach(thickness => {
+    thicknesses.forEach((thickness, rowIdx) => {
         const row = document.createElement('tr');
         
         // Thickness label
@@ -765,19 +716,26 @@ function createAllCompetitorsHeatmap(data, thicknesses, widths) {
         row.appendChild(thicknessCell);
         
         // Data cells
-        widths.forEach(width => {
+        widths.forEach((width, colIdx) => {
             const cell = document.createElement('td');
             cell.style.padding = '10px';
             cell.style.border = '1px solid #e5e7eb';
             cell.style.fontSize = '10px';
             cell.style.verticalAlign = 'top';
             
-            const key = `${thickness}_${width}`;
-            const products = productMap[key] || [];
+            const heatmapCell = heatmap.cells[rowIdx][colIdx];
+            const products = heatmapCell && heatmapCell.products ? heatmapCell.products.map(p => ({
+                competitor: p[0],
+                displayPrice: p[1],
+                originalPrice: p[2],
+                length: p[3],
+                width: p[4],
+                pricePerVolume: p[5]
+            })) : [];
             
-            if (products.length > 0) {
+            if (heatmapCell) {
                 // Get cell average for background color
-                const cellAvg = cellAverages[key];
+                const cellAvg = heatmapCell.avg;
                 if (cellAvg !== null && cellAvgRange > 0) {
                     const clampedIntensity = Math.max(0, Math.min(1, (cellAvg - minCellAvg) / cellAvgRange));
                     // Color gradient: Green (cheap) -> Yellow -> Red (expensive)
@@ -813,37 +771,12 @@ function createAllCompetitorsHeatmap(data, thicknesses, widths) {
                 const maxCellPrice = cellPrices.length ? Math.max(...cellPrices) : null;
                 const cellPriceRange = minCellPrice !== null && maxCellPrice !== null ? maxCellPrice - minCellPrice : null;
                 
-                // Group by competitor and calculate averages
-                const competitorData = {};
-                products.forEach(product => {
-                    if (!competitorData[product.competitor]) {
-                        competitorData[product.competitor] = {
-                            displayPrices: [],
-                            pricesPerVolume: []
-                        };
-                    }
-                    competitorData[product.competitor].displayPrices.push(product.displayPrice);
-                    competitorData[product.competitor].pricesPerVolume.push(product.pricePerVolume);
-                });
-                
-                // Calculate averages and prepare display data
-                const competitorAvgs = Object.entries(competitorData).map(([comp, data]) => {
-                    const avgDisplayPrice = data.displayPrices.reduce((a, b) => a + b, 0) / data.displayPrices.length;
-                    const validVolume = data.pricesPerVolume.filter(v => v !== null && Number.isFinite(v));
-                    const avgPricePerVolume = validVolume.length ? validVolume.reduce((a, b) => a + b, 0) / validVolume.length : null;
-                    return {
-                        competitor: comp,
-                        avgDisplayPrice,
-                        avgPricePerVolume
-                    };
-                });
-                
-                // Sort by price per volume for display order
-                competitorAvgs.sort((a, b) => {
-                    const aMetric = a.avgPricePerVolume !== null ? a.avgPricePerVolume : Infinity;
-                    const bMetric = b.avgPricePerVolume !== null ? b.avgPricePerVolume : Infinity;
-                    return aMetric - bMetric;
-                });
+                // Competitor averages, cheapest price per volume first
+                const competitorAvgs = heatmapCell.competitors.map(([competitor, avgDisplayPrice, avgPricePerVolume]) => ({
+                    competitor,
+                    avgDisplayPrice,
+                    avgPricePerVolume
+                }));
                 
                 // Display all competitors with color coding
                 competitorAvgs.forEach((item, idx) => {
@@ -1274,18 +1207,29 @@ function addHeatmapLegend() {
 document.getElementById('searchInput')?.addEventListener('input', filterTable);
 document.getElementById('competitorFilter')?.addEventListener('change', filterTable);
 
-function filterTable() {
-    const searchTerm = document.getElementById('searchInput').value.toLowerCase();
-    const selectedCompetitor = document.getElementById('competitorFilter').value;
+// Rows matching the free-text search box (no server-side equivalent)
+function searchRows(rows) {
+    const searchTerm = (document.getElementById('searchInput')?.value || '').toLowerCase();
+    if (!searchTerm) return [...rows];
+    return rows.filter(item => Object.values(item).some(value =>
+        value !== null && value.toString().toLowerCase().includes(searchTerm)
+    ));
+}
+
+async function filterTable() {
+    const selectedCompetitor = document.getElementById('competitorFilter')?.value || '';
     
-    filteredData = allData.filter(item => {
-        const matchesSearch = Object.values(item).some(value => 
-            value.toString().toLowerCase().includes(searchTerm)
-        );
-        const matchesCompetitor = !selectedCompetitor || item.Competitor === selectedCompetitor;
-        
-        return matchesSearch && matchesCompetitor;
-    });
+    try {
+        // The competitor filter is applied by /api/data
+        if (selectedCompetitor !== dataQuery.competitor) {
+            dataQuery.competitor = selectedCompetitor;
+            await fetchProducts(dataQuery.productType);
+        } else {
+            filteredData = searchRows(allData);
+        }
+    } catch (error) {
+        console.error('Error filtering data:', error);
+    }
     
     initializeDataTable();
 }
@@ -1294,7 +1238,7 @@ function filterTable() {
 let sortColumn = '';
 let sortDirection = 'asc';
 
-function sortTable(column) {
+async function sortTable(column) {
     if (sortColumn === column) {
         sortDirection = sortDirection === 'asc' ? 'desc' : 'asc';
     } else {
@@ -1302,21 +1246,13 @@ function sortTable(column) {
         sortDirection = 'asc';
     }
     
-    filteredData.sort((a, b) => {
-        let aVal = a[column];
-        let bVal = b[column];
-        
-        if (typeof aVal === 'string') {
-            aVal = aVal.toLowerCase();
-            bVal = bVal.toLowerCase();
-        }
-        
-        if (sortDirection === 'asc') {
-            return aVal > bVal ? 1 : -1;
-        } else {
-            return aVal < bVal ? 1 : -1;
-        }
-    });
+    // Sorted by /api/data ('-' prefix for descending)
+    dataQuery.sort = (sortDirection === 'desc' ? '-' : '') + column;
+    try {
+        await fetchProducts(dataQuery.productType);
+    } catch (error) {
+        console.error('Error sorting data:', error);
+    }
     
     initializeDataTable();
 }